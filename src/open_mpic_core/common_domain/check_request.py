@@ -12,5 +12,11 @@ class CaaCheckRequest(BaseCheckRequest):
     caa_check_parameters: CaaCheckParameters | None = None
 
 
+# The same CAA check for several targets at once (e.g., all names of a certificate), sharing lookups of common ancestors.
+class CaaBatchCheckRequest(BaseModel):
+    domain_or_ip_targets: list[str]
+    caa_check_parameters: CaaCheckParameters | None = None
+
+
 class DcvCheckRequest(BaseCheckRequest):
     dcv_check_parameters: DcvCheckParameters
@@ -0,0 +1,9 @@
+from enum import StrEnum
+
+
+class PerspectiveCallOutcome(StrEnum):
+    PASSED = 'passed'  # the check passed (for combined calls: every check passed)
+    FAILED = 'failed'  # the perspective responded, but the check did not pass
+    ERROR = 'error'  # the call raised an exception
+    TIMED_OUT = 'timed_out'
+    CANCELLED = 'cancelled'
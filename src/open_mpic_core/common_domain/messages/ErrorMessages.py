@@ -4,6 +4,8 @@ from enum import Enum
 class ErrorMessages(Enum):
     CAA_LOOKUP_ERROR = ('mpic_error:caa_checker:lookup', 'There was an error looking up the CAA record.')
     COORDINATOR_COMMUNICATION_ERROR = ('mpic_error:coordinator:communication', 'Communication with the remote perspective failed.')
+    COORDINATOR_TIMEOUT_ERROR = ('mpic_error:coordinator:timeout', 'The remote perspective did not respond in time.')
+    COORDINATOR_CALL_CANCELLED = ('mpic_error:coordinator:call_cancelled', 'The call to the remote perspective was cancelled because the quorum outcome was already decided.')
 
     def __init__(self, key, message):
         self.key = key
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class RemotePerspective(BaseModel):
@@ -7,6 +7,8 @@ class RemotePerspective(BaseModel):
     name: str | None = None  # example: "US West (Oregon)"
     rir: str  # example: "ARIN"
     too_close_codes: list[str] | None = []
+    # relative capacity; perspectives with more get picked more often for cohorts (None counts as 1)
+    weight: float | None = Field(default=None, gt=0)
 
     def is_perspective_too_close(self, perspective):
         return perspective.code in self.too_close_codes
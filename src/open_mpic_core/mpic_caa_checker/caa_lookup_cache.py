@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+import dns.name
+import dns.rdatatype
+import dns.resolver
+from dns.rrset import RRset
+
+
+# Bounded, thread-safe LRU cache of CAA lookup results per DNS name: the CAA RRset found at the name, or None if there
+# is none there (a NoAnswer or NXDOMAIN). Entries expire after their DNS TTL (the lowest one along any CNAME chain),
+# capped at max_ttl_seconds (the CA/B Forum Baseline Requirements allow relying on CAA records for up to 8 hours). For
+# negative answers, the TTL is that of the SOA record in the response (RFC 2308), or default_negative_ttl_seconds if
+# there is none; a TTL of 0 isn't cached.
+# Cached RRsets are shared between callers and must not be modified.
+class CaaLookupCache:
+    DEFAULT_MAX_TTL_SECONDS = 8 * 60 * 60
+
+    def __init__(self, max_size, max_ttl_seconds=DEFAULT_MAX_TTL_SECONDS, default_negative_ttl_seconds=0,
+                 clock=time.monotonic):
+        self.max_size = max_size
+        self.max_ttl_seconds = max_ttl_seconds
+        self.default_negative_ttl_seconds = default_negative_ttl_seconds
+        self.clock = clock
+        self.entries_per_name = OrderedDict()  # name -> (expiration time, rrset or None)
+        self.hit_count = 0
+        self.miss_count = 0
+        self.eviction_count = 0
+        self.lock = threading.Lock()
+
+    # Returns whether there is a live entry for the name, and if so, its RRset (None for a negative answer).
+    def get(self, domain: dns.name.Name) -> tuple[bool, RRset | None]:
+        with self.lock:
+            entry = self.entries_per_name.get(domain)
+            if entry is not None:
+                expiration_time, rrset = entry
+                if self.clock() < expiration_time:
+                    self.entries_per_name.move_to_end(domain)
+                    self.hit_count += 1
+                    return True, rrset
+                del self.entries_per_name[domain]
+            self.miss_count += 1
+            return False, None
+
+    def store(self, domain: dns.name.Name, rrset: RRset | None, ttl_seconds: float):
+        ttl_seconds = min(ttl_seconds, self.max_ttl_seconds)
+        if ttl_seconds <= 0:
+            return
+        with self.lock:
+            self.entries_per_name[domain] = (self.clock() + ttl_seconds, rrset)
+            self.entries_per_name.move_to_end(domain)
+            while len(self.entries_per_name) > self.max_size:
+                self.entries_per_name.popitem(last=False)
+                self.eviction_count += 1
+
+    # A CNAME along the way can expire before the final RRset does, so the answer's minimum TTL counts.
+    def store_answer(self, domain: dns.name.Name, answer: dns.resolver.Answer):
+        self.store(domain, answer.rrset, answer.chaining_result.minimum_ttl)
+
+    # Stores a negative answer, given the NoAnswer or NXDOMAIN exception the lookup raised.
+    def store_negative_answer(self, domain: dns.name.Name, exception: dns.resolver.NoAnswer | dns.resolver.NXDOMAIN):
+        negative_ttl_seconds = CaaLookupCache.determine_negative_ttl(exception)
+        if negative_ttl_seconds is None:
+            negative_ttl_seconds = self.default_negative_ttl_seconds
+        self.store(domain, None, negative_ttl_seconds)
+
+    def invalidate(self):
+        with self.lock:
+            self.entries_per_name.clear()
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries_per_name)
+
+    # The negative caching TTL of a response, per RFC 2308: the lower of its SOA record's TTL and MINIMUM field.
+    @staticmethod
+    def determine_negative_ttl(exception: dns.resolver.NoAnswer | dns.resolver.NXDOMAIN) -> float | None:
+        if isinstance(exception, dns.resolver.NXDOMAIN):
+            responses = list((exception.kwargs.get('responses') or {}).values())
+        else:
+            responses = [exception.kwargs.get('response')]
+        for response in responses:
+            for rrset in getattr(response, 'authority', None) or ():
+                if rrset.rdtype == dns.rdatatype.SOA and len(rrset) > 0:
+                    return min(rrset.ttl, rrset[0].minimum)
+        return None
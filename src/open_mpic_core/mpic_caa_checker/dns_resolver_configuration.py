@@ -0,0 +1,60 @@
+import copy
+
+import dns.asyncresolver
+import dns.resolver
+
+
+# How to set up the DNS resolver a checker uses for its lookups. Anything left as None keeps dnspython's default
+# (which, for nameservers, means those of the system's resolver configuration, e.g., /etc/resolv.conf).
+# nameservers: IP addresses of the recursive resolvers to query (e.g., a local caching resolver).
+# port: port to query them on.
+# timeout_seconds: how long to wait for a response from any one nameserver.
+# lifetime_seconds: how long a whole lookup may take, across nameservers and retries.
+# edns_payload_size: EDNS0 UDP payload size to advertise (e.g., 1232); EDNS is only enabled if this is set.
+# always_use_tcp: query over TCP only; otherwise queries go over UDP, falling back to TCP for truncated responses.
+class DnsResolverConfiguration:
+    # what makes up a dnspython resolver's setup (besides its nameservers and cache)
+    RESOLVER_SETTING_NAMES = ['domain', 'nameserver_ports', 'port', 'search', 'use_search_by_default', 'timeout',
+                              'lifetime', 'keyring', 'keyname', 'keyalgorithm', 'edns', 'ednsflags', 'ednsoptions',
+                              'payload', 'flags', 'retry_servfail', 'rotate', 'ndots']
+
+    def __init__(self, nameservers: list[str] | None = None, port: int | None = None,
+                 timeout_seconds: float | None = None, lifetime_seconds: float | None = None,
+                 edns_payload_size: int | None = None, always_use_tcp=False):
+        self.nameservers = nameservers
+        self.port = port
+        self.timeout_seconds = timeout_seconds
+        self.lifetime_seconds = lifetime_seconds
+        self.edns_payload_size = edns_payload_size
+        self.always_use_tcp = always_use_tcp
+
+    def build_resolver(self) -> dns.resolver.Resolver:
+        return self.configure_resolver(dns.resolver.Resolver(configure=self.nameservers is None))
+
+    def build_async_resolver(self) -> dns.asyncresolver.Resolver:
+        return self.configure_resolver(dns.asyncresolver.Resolver(configure=self.nameservers is None))
+
+    def configure_resolver(self, resolver: dns.resolver.BaseResolver):
+        if self.nameservers is not None:
+            resolver.nameservers = list(self.nameservers)
+        if self.port is not None:
+            resolver.port = self.port
+        if self.timeout_seconds is not None:
+            resolver.timeout = self.timeout_seconds
+        if self.lifetime_seconds is not None:
+            resolver.lifetime = self.lifetime_seconds
+        if self.edns_payload_size is not None:
+            resolver.use_edns(0, 0, self.edns_payload_size)
+        return resolver
+
+    # Returns an async resolver set up like the given (sync) one, e.g., one injected into a checker for its blocking
+    # lookups, so that async lookups go to the same nameservers with the same timeouts and EDNS settings. The two
+    # share the given resolver's cache, if it has one.
+    @staticmethod
+    def build_async_resolver_like(resolver: dns.resolver.BaseResolver) -> dns.asyncresolver.Resolver:
+        async_resolver = dns.asyncresolver.Resolver(configure=False)
+        async_resolver.nameservers = list(resolver.nameservers)
+        for setting_name in DnsResolverConfiguration.RESOLVER_SETTING_NAMES:
+            setattr(async_resolver, setting_name, copy.copy(getattr(resolver, setting_name)))
+        async_resolver.cache = resolver.cache
+        return async_resolver
@@ -1,15 +1,21 @@
+import asyncio
+import concurrent.futures
 import time
+from itertools import chain
 from typing import Final
+import dns.asyncresolver
 import dns.resolver
 from dns.name import Name
 from dns.rrset import RRset
 
 from open_mpic_core.common_domain.remote_perspective import RemotePerspective
-from open_mpic_core.common_domain.check_request import CaaCheckRequest
+from open_mpic_core.common_domain.check_request import CaaBatchCheckRequest, CaaCheckRequest
 from open_mpic_core.common_domain.check_response import CaaCheckResponse, CaaCheckResponseDetails
 from open_mpic_core.common_domain.validation_error import MpicValidationError
 from open_mpic_core.common_domain.enum.certificate_type import CertificateType
 from open_mpic_core.common_domain.messages.ErrorMessages import ErrorMessages
+from open_mpic_core.mpic_caa_checker.caa_lookup_cache import CaaLookupCache
+from open_mpic_core.mpic_caa_checker.dns_resolver_configuration import DnsResolverConfiguration
 
 ISSUE_TAG: Final[str] = 'issue'
 ISSUEWILD_TAG: Final[str] = 'issuewild'
@@ -20,9 +26,50 @@ class MpicCaaLookupException(Exception):  # This is a python exception type used
 
 
 class MpicCaaChecker:
-    def __init__(self, default_caa_domain_list: list[str], perspective: RemotePerspective):
+    DEFAULT_TREE_CLIMB_MAX_WORKERS = 16
+
+    # dns_resolver: resolver to use for every CAA lookup (e.g., one pointed at a local caching recursive resolver).
+    # dns_resolver_configuration: alternatively, how to set up such a resolver (see DnsResolverConfiguration); it is
+    # built once, here (if both are given, only its always_use_tcp applies, to the given resolver). With neither, lookups
+    # go through dnspython's shared default resolver.
+    # dns_async_resolver: the same, for check_caa_async (a dns.asyncresolver.Resolver). If not given, it is set up like
+    # dns_resolver, if given (so both paths query the same nameservers the same way), or else built from
+    # dns_resolver_configuration.
+    # caa_lookup_cache: if set, CAA lookup results (including the absence of CAA records) per DNS name are reused from
+    # it for as long as their TTL allows (see CaaLookupCache).
+    # enable_concurrent_tree_climb: look up the CAA records of the target and all its ancestors at once (in threads),
+    # rather than one label after the other; the result is the same, since labels are still evaluated closest first.
+    # executor: optional executor to run those lookups in. If not given, the checker creates a thread pool of its own,
+    # released by shutdown(). An injected executor is never shut down by the checker.
+    def __init__(self, default_caa_domain_list: list[str], perspective: RemotePerspective,
+                 dns_resolver: dns.resolver.Resolver | None = None,
+                 dns_resolver_configuration: DnsResolverConfiguration | None = None,
+                 dns_async_resolver: dns.asyncresolver.Resolver | None = None,
+                 caa_lookup_cache: CaaLookupCache | None = None, enable_concurrent_tree_climb=False,
+                 executor: concurrent.futures.Executor | None = None):
         self.default_caa_domain_list = default_caa_domain_list
         self.perspective = perspective
+        if dns_async_resolver is None and dns_resolver is not None:
+            dns_async_resolver = DnsResolverConfiguration.build_async_resolver_like(dns_resolver)
+        if dns_resolver is None and dns_resolver_configuration is not None:
+            dns_resolver = dns_resolver_configuration.build_resolver()
+        self.dns_resolver = dns_resolver
+        if dns_async_resolver is None and dns_resolver_configuration is not None:
+            dns_async_resolver = dns_resolver_configuration.build_async_resolver()
+        self.dns_async_resolver = dns_async_resolver
+        self.always_use_tcp = dns_resolver_configuration is not None and dns_resolver_configuration.always_use_tcp
+        self.caa_lookup_cache = caa_lookup_cache
+        self.enable_concurrent_tree_climb = enable_concurrent_tree_climb
+        self.is_executor_owned = enable_concurrent_tree_climb and executor is None
+        if self.is_executor_owned:
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=MpicCaaChecker.DEFAULT_TREE_CLIMB_MAX_WORKERS,
+                                                             thread_name_prefix='mpic-caa-checker')
+        self.executor = executor
+
+    # Releases the checker's own thread pool, if it has one.
+    def shutdown(self, wait=True):
+        if self.is_executor_owned:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
 
     @staticmethod
     def does_value_list_permit_issuance(value_list: list, caa_domains):
@@ -37,24 +84,129 @@ class MpicCaaChecker:
         # If nothing matched, we cannot issue.
         return False
 
-    @staticmethod
-    def find_caa_record_and_domain(caa_request) -> tuple[RRset, Name]:
-        rrset = None
+    def find_caa_record_and_domain(self, caa_request) -> tuple[RRset, Name]:
         domain = dns.name.from_text(caa_request.domain_or_ip_target)
+        if self.enable_concurrent_tree_climb:
+            return self.find_caa_record_and_domain_concurrently(domain)
+        return MpicCaaChecker.climb_caa_tree(MpicCaaChecker.list_domains_to_climb(domain), self.lookup_caa_rrset)
 
-        while domain != dns.name.root:  # should we stop at TLD / Public Suffix? (e.g., .com, .ac.uk)
+    # Concurrent form of the tree climb in find_caa_record_and_domain: every label's lookup is started right away, but
+    # the results are still evaluated closest label first, so a lookup error at a label below the closest one with CAA
+    # records raises MpicCaaLookupException just as it would sequentially (errors above that label are ignored).
+    def find_caa_record_and_domain_concurrently(self, domain: Name) -> tuple[RRset, Name]:
+        domains = MpicCaaChecker.list_domains_to_climb(domain)
+        futures_per_domain = {domain: self.executor.submit(self.lookup_caa_rrset, domain) for domain in domains}
+        try:
+            return MpicCaaChecker.climb_caa_tree(domains, lambda domain: futures_per_domain[domain].result())
+        finally:
+            for future in futures_per_domain.values():
+                future.cancel()  # lookups of labels above the one found (if not already running)
+
+    # Evaluates the CAA lookups of the given domains (a name and its ancestors, closest first) in order, getting each
+    # one's RRset (or None) from get_caa_rrset, and returns the first RRset found and its domain. If there is none,
+    # returns None and the root domain. Any lookup error on the way raises MpicCaaLookupException.
+    @staticmethod
+    def climb_caa_tree(domains: list[Name], get_caa_rrset) -> tuple[RRset, Name]:
+        for domain in domains:
             try:
-                lookup = dns.resolver.resolve(domain, dns.rdatatype.CAA)
-                print(f'Found a CAA record for {domain}! Response: {lookup.rrset.to_text()}')
-                rrset = lookup.rrset
-                break
-            except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN):
-                print(f'No CAA record found for {domain}; trying parent domain...')
-                domain = domain.parent()
+                rrset = get_caa_rrset(domain)
             except Exception:
                 raise MpicCaaLookupException
+            if MpicCaaChecker.is_caa_rrset_found(domain, rrset):
+                return rrset, domain
+        return None, dns.name.root
+
+    # Non-blocking form of climb_caa_tree, for which get_caa_rrset returns an awaitable.
+    @staticmethod
+    async def climb_caa_tree_async(domains: list[Name], get_caa_rrset) -> tuple[RRset, Name]:
+        for domain in domains:
+            try:
+                rrset = await get_caa_rrset(domain)
+            except Exception:
+                raise MpicCaaLookupException
+            if MpicCaaChecker.is_caa_rrset_found(domain, rrset):
+                return rrset, domain
+        return None, dns.name.root
+
+    # Reports the outcome of a domain's lookup in the climb, returning whether it ends the climb.
+    @staticmethod
+    def is_caa_rrset_found(domain: Name, rrset: RRset | None) -> bool:
+        if rrset is not None:
+            print(f'Found a CAA record for {domain}! Response: {rrset.to_text()}')
+            return True
+        print(f'No CAA record found for {domain}; trying parent domain...')
+        return False
+
+    # Returns the name and all its ancestors (up to, but not including, the root domain), closest first.
+    # Should we stop at TLD / Public Suffix? (e.g., .com, .ac.uk)
+    @staticmethod
+    def list_domains_to_climb(domain: Name) -> list[Name]:
+        domains = []
+        while domain != dns.name.root:
+            domains.append(domain)
+            domain = domain.parent()
+        return domains
+
+    # Returns the CAA RRset at the name, or None if there is none (NoAnswer or NXDOMAIN); other errors are raised.
+    # Goes through the CAA lookup cache, if there is one.
+    def lookup_caa_rrset(self, domain: Name) -> RRset | None:
+        if self.caa_lookup_cache is not None:
+            is_cached, rrset = self.caa_lookup_cache.get(domain)
+            if is_cached:
+                return rrset
+        try:
+            lookup = self.resolve_caa(domain)
+        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN) as e:
+            if self.caa_lookup_cache is not None:
+                self.caa_lookup_cache.store_negative_answer(domain, e)
+            return None
+        if self.caa_lookup_cache is not None:
+            self.caa_lookup_cache.store_answer(domain, lookup)
+        return lookup.rrset
+
+    # Non-blocking form of find_caa_record_and_domain (in concurrent tree climb mode, with a task per label).
+    async def find_caa_record_and_domain_async(self, caa_request) -> tuple[RRset, Name]:
+        domain = dns.name.from_text(caa_request.domain_or_ip_target)
+        if self.enable_concurrent_tree_climb:
+            return await self.find_caa_record_and_domain_concurrently_async(domain)
+        return await MpicCaaChecker.climb_caa_tree_async(MpicCaaChecker.list_domains_to_climb(domain),
+                                                         self.lookup_caa_rrset_async)
+
+    async def find_caa_record_and_domain_concurrently_async(self, domain: Name) -> tuple[RRset, Name]:
+        domains = MpicCaaChecker.list_domains_to_climb(domain)
+        tasks_per_domain = {domain: asyncio.create_task(self.lookup_caa_rrset_async(domain)) for domain in domains}
+        try:
+            return await MpicCaaChecker.climb_caa_tree_async(domains, lambda domain: tasks_per_domain[domain])
+        finally:
+            for task in tasks_per_domain.values():
+                task.cancel()  # lookups of labels above the one found
+            # no task left behind with an unretrieved exception
+            await asyncio.gather(*tasks_per_domain.values(), return_exceptions=True)
+
+    async def lookup_caa_rrset_async(self, domain: Name) -> RRset | None:
+        if self.caa_lookup_cache is not None:
+            is_cached, rrset = self.caa_lookup_cache.get(domain)
+            if is_cached:
+                return rrset
+        try:
+            lookup = await self.resolve_caa_async(domain)
+        except (dns.resolver.NoAnswer, dns.resolver.NXDOMAIN) as e:
+            if self.caa_lookup_cache is not None:
+                self.caa_lookup_cache.store_negative_answer(domain, e)
+            return None
+        if self.caa_lookup_cache is not None:
+            self.caa_lookup_cache.store_answer(domain, lookup)
+        return lookup.rrset
+
+    async def resolve_caa_async(self, domain: Name) -> dns.resolver.Answer:
+        if self.dns_async_resolver is None:
+            return await dns.asyncresolver.resolve(domain, dns.rdatatype.CAA)
+        return await self.dns_async_resolver.resolve(domain, dns.rdatatype.CAA, tcp=self.always_use_tcp)
 
-        return rrset, domain
+    def resolve_caa(self, domain: Name) -> dns.resolver.Answer:
+        if self.dns_resolver is None:
+            return dns.resolver.resolve(domain, dns.rdatatype.CAA)
+        return self.dns_resolver.resolve(domain, dns.rdatatype.CAA, tcp=self.always_use_tcp)
 
     @staticmethod
     def is_valid_for_issuance(caa_domains, is_wc_domain, rrset):
@@ -87,6 +239,73 @@ class MpicCaaChecker:
         return valid_for_issuance
 
     def check_caa(self, caa_request: CaaCheckRequest) -> CaaCheckResponse:
+        caa_lookup_error = False
+        domain = None
+        rrset = None
+        try:
+            rrset, domain = self.find_caa_record_and_domain(caa_request)
+        except MpicCaaLookupException:
+            caa_lookup_error = True
+        return self.build_caa_check_response(caa_request, rrset, domain, caa_lookup_error)
+
+    # Checks CAA for several targets at once, returning a response per target (in order), each the same as check_caa
+    # would return for it. Each distinct name is looked up at most once across all targets' tree climbs (in concurrent
+    # tree climb mode, every distinct name is looked up, all at once).
+    def check_caa_batch(self, caa_batch_request: CaaBatchCheckRequest) -> list[CaaCheckResponse]:
+        caa_requests = [CaaCheckRequest(domain_or_ip_target=domain_or_ip_target,
+                                        caa_check_parameters=caa_batch_request.caa_check_parameters)
+                        for domain_or_ip_target in caa_batch_request.domain_or_ip_targets]
+        domains_per_request = [MpicCaaChecker.list_domains_to_climb(dns.name.from_text(caa_request.domain_or_ip_target))
+                               for caa_request in caa_requests]
+        futures_per_domain = {}
+        if self.enable_concurrent_tree_climb:
+            for domain in dict.fromkeys(chain.from_iterable(domains_per_request)):
+                futures_per_domain[domain] = self.executor.submit(self.lookup_caa_rrset, domain)
+
+        lookup_results_per_domain = {}  # domain -> (rrset, error)
+
+        def get_caa_rrset(domain):
+            if domain in futures_per_domain:
+                return futures_per_domain[domain].result()
+            if domain not in lookup_results_per_domain:
+                try:
+                    lookup_results_per_domain[domain] = (self.lookup_caa_rrset(domain), None)
+                except Exception as e:
+                    lookup_results_per_domain[domain] = (None, e)
+            rrset, error = lookup_results_per_domain[domain]
+            if error is not None:
+                raise error
+            return rrset
+
+        caa_responses = []
+        try:
+            for caa_request, domains in zip(caa_requests, domains_per_request):
+                caa_lookup_error = False
+                domain = None
+                rrset = None
+                try:
+                    rrset, domain = MpicCaaChecker.climb_caa_tree(domains, get_caa_rrset)
+                except MpicCaaLookupException:
+                    caa_lookup_error = True
+                caa_responses.append(self.build_caa_check_response(caa_request, rrset, domain, caa_lookup_error))
+        finally:
+            for future in futures_per_domain.values():
+                future.cancel()
+        return caa_responses
+
+    # Non-blocking form of check_caa, with lookups made through dns.asyncresolver on the running event loop.
+    async def check_caa_async(self, caa_request: CaaCheckRequest) -> CaaCheckResponse:
+        caa_lookup_error = False
+        domain = None
+        rrset = None
+        try:
+            rrset, domain = await self.find_caa_record_and_domain_async(caa_request)
+        except MpicCaaLookupException:
+            caa_lookup_error = True
+        return self.build_caa_check_response(caa_request, rrset, domain, caa_lookup_error)
+
+    def build_caa_check_response(self, caa_request: CaaCheckRequest, rrset: RRset | None, domain: Name | None,
+                                 caa_lookup_error: bool) -> CaaCheckResponse:
         # Assume the default system configured validation targets and override if sent in the API call.
         caa_domains = self.default_caa_domain_list
         is_wc_domain = False
@@ -99,16 +318,7 @@ class MpicCaaChecker:
             if certificate_type is not None and certificate_type == CertificateType.TLS_SERVER_WILDCARD:
                 is_wc_domain = True
 
-        caa_lookup_error = False
-        caa_found = False
-        domain = None
-        rrset = None
-        try:
-            rrset, domain = MpicCaaChecker.find_caa_record_and_domain(caa_request)
-            caa_found = rrset is not None
-        except MpicCaaLookupException:
-            caa_lookup_error = True
-
+        caa_found = rrset is not None
         if caa_lookup_error:
             response = CaaCheckResponse(perspective_code=self.perspective.code, check_passed=False,
                                         errors=[MpicValidationError(error_type=ErrorMessages.CAA_LOOKUP_ERROR.key, error_message=ErrorMessages.CAA_LOOKUP_ERROR.message)],
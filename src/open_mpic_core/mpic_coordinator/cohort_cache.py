@@ -0,0 +1,49 @@
+import threading
+from collections import OrderedDict
+
+
+# Bounded, thread-safe LRU cache of perspective cohorts, keyed by target and perspective count (and optionally by
+# whatever else the cohorts depend on, e.g., which perspectives are demoted). Cohorts only depend on
+# those (given a hash secret and perspective configuration), so they can be reused across requests for the same target.
+# invalidate() drops everything, e.g., when the perspective configuration changes; cohorts still being computed at
+# that point are stored under the previous generation and so are never served.
+# Cached cohorts are shared between callers and must not be modified.
+class CohortCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.cohorts_per_key = OrderedDict()
+        self.generation = 0
+        self.hit_count = 0
+        self.miss_count = 0
+        self.eviction_count = 0
+        self.lock = threading.Lock()
+
+    # Returns the cached cohorts, or the ones create_cohorts() returns (caching them) if there are none.
+    def get_cohorts(self, domain_or_ip_target: str, perspective_count: int, create_cohorts, cohort_variant=None) -> list:
+        with self.lock:
+            key = (self.generation, domain_or_ip_target.lower(), perspective_count, cohort_variant)
+            cohorts = self.cohorts_per_key.get(key)
+            if cohorts is not None:
+                self.cohorts_per_key.move_to_end(key)
+                self.hit_count += 1
+                return cohorts
+            self.miss_count += 1
+
+        cohorts = create_cohorts()  # outside the lock; concurrent misses for the same key just compute the same cohorts
+
+        with self.lock:
+            self.cohorts_per_key[key] = cohorts
+            self.cohorts_per_key.move_to_end(key)
+            while len(self.cohorts_per_key) > self.max_size:
+                self.cohorts_per_key.popitem(last=False)
+                self.eviction_count += 1
+        return cohorts
+
+    def invalidate(self):
+        with self.lock:
+            self.cohorts_per_key.clear()
+            self.generation += 1
+
+    def __len__(self):
+        with self.lock:
+            return len(self.cohorts_per_key)
@@ -1,7 +1,11 @@
+from collections import deque
 from itertools import cycle, chain
+import concurrent.futures
+import hashlib
 import random
 
 from open_mpic_core.common_domain.remote_perspective import RemotePerspective
+from open_mpic_core.mpic_coordinator.perspective_catalog import PerspectiveCatalog
 
 
 class CohortCreator:
@@ -20,97 +24,193 @@ class CohortCreator:
         #         # TODO discuss: do we even need RIRs specified in the input? code should be unique enough
         #         remote_perspectives.append(fully_defined_perspective)
 
-        # first sort all perspectives deterministically
-        remote_perspectives.sort(key=lambda remote_perspective: remote_perspective.code)
-        local_random = random.Random(random_seed)
-        local_random.shuffle(remote_perspectives)
-        perspectives_per_rir = {}
-        for perspective in remote_perspectives:
-            if perspective.rir not in perspectives_per_rir:
-                perspectives_per_rir[perspective.rir] = []
-            perspectives_per_rir[perspective.rir].append(perspective)
+        # sort all perspectives deterministically and shuffle them (weighted, if their weights differ); see PerspectiveCatalog
+        return PerspectiveCatalog(remote_perspectives).build_randomly_shuffled_perspectives_per_rir(random_seed)
+
+    # The seed for a target's perspective shuffle: SHA-256 of the hash secret followed by the lowercased target.
+    @staticmethod
+    def build_random_seed(hash_secret: str, domain_or_ip_target: str) -> bytes:
+        return hashlib.sha256((hash_secret + domain_or_ip_target.lower()).encode('ASCII')).digest()
+
+    # Creates the cohorts of many targets at once, the same as creating them for one target at a time (seeded by
+    # build_random_seed), but with the perspectives sorted and indexed only once and the hash secret hashed only once.
+    # Returns the cohorts per (distinct) target. If an executor is given (e.g., a ProcessPoolExecutor), the targets are
+    # split into chunks of chunk_size that are processed in it.
+    @staticmethod
+    def create_perspective_cohorts_per_target(perspectives: list[RemotePerspective] | PerspectiveCatalog,
+                                              domain_or_ip_targets: list[str], cohort_size: int, hash_secret: str,
+                                              executor: concurrent.futures.Executor | None = None,
+                                              chunk_size=1000) -> dict[str, list[list[RemotePerspective]]]:
+        if cohort_size > len(perspectives):
+            raise ValueError(
+                f"Count ({cohort_size}) must be <= the number of available perspectives ({len(perspectives)})")
+        distinct_targets = list(dict.fromkeys(domain_or_ip_targets))
+        if executor is None:
+            return CohortCreator.create_perspective_cohorts_for_targets(perspectives, distinct_targets, cohort_size,
+                                                                        hash_secret)
+
+        if isinstance(perspectives, PerspectiveCatalog):
+            perspectives = list(perspectives.perspectives)  # catalogs can't be pickled; each chunk indexes its own
+        futures = [executor.submit(CohortCreator.create_perspective_cohorts_for_targets, perspectives,
+                                   distinct_targets[chunk_start:chunk_start + chunk_size], cohort_size, hash_secret)
+                   for chunk_start in range(0, len(distinct_targets), chunk_size)]
+        cohorts_per_target = {}
+        for future in futures:
+            cohorts_per_target.update(future.result())
+        return cohorts_per_target
 
-        return perspectives_per_rir
+    @staticmethod
+    def create_perspective_cohorts_for_targets(perspectives: list[RemotePerspective] | PerspectiveCatalog,
+                                               domain_or_ip_targets: list[str], cohort_size: int,
+                                               hash_secret: str) -> dict[str, list[list[RemotePerspective]]]:
+        if isinstance(perspectives, PerspectiveCatalog):
+            perspective_catalog = perspectives
+        else:
+            perspective_catalog = PerspectiveCatalog(perspectives)
+        hash_secret_digest = hashlib.sha256(hash_secret.encode('ASCII'))  # copied and continued with each target
+        cohorts_per_target = {}
+        for domain_or_ip_target in domain_or_ip_targets:
+            target_digest = hash_secret_digest.copy()
+            target_digest.update(domain_or_ip_target.lower().encode('ASCII'))
+            perspectives_per_rir = perspective_catalog.build_randomly_shuffled_perspectives_per_rir(target_digest.digest())
+            cohorts_per_target[domain_or_ip_target] = list(
+                CohortCreator.generate_perspective_cohorts(perspectives_per_rir, cohort_size, perspective_catalog))
+        return cohorts_per_target
+
+    # Orders cohorts by expected latency (that of their slowest member, per the given estimates; perspectives without
+    # one count as the average of the others), each scaled by a factor between 1 and 1 + jitter_fraction drawn from the
+    # seed, so that the order is deterministic per seed yet cohorts of similar latency still get shuffled. Stable, and
+    # returns a new list; without any estimates, the cohorts keep their order.
+    @staticmethod
+    def rank_perspective_cohorts(cohorts: list[list[RemotePerspective]], latency_estimate_per_code: dict[str, float],
+                                 random_seed: bytes, jitter_fraction=0.0) -> list[list[RemotePerspective]]:
+        if not latency_estimate_per_code:
+            return list(cohorts)
+        default_latency_estimate = sum(latency_estimate_per_code.values()) / len(latency_estimate_per_code)
+        local_random = random.Random(random_seed)
+        ranking_keys = []
+        for cohort in cohorts:
+            expected_latency = max(latency_estimate_per_code.get(perspective.code, default_latency_estimate)
+                                   for perspective in cohort)
+            ranking_keys.append(expected_latency * (1 + jitter_fraction * local_random.random()))
+        ranked_indices = sorted(range(len(cohorts)), key=lambda index: ranking_keys[index])
+        return [cohorts[index] for index in ranked_indices]
+
+    # Moves the perspectives with the given codes to the end of their RIR's list (keeping the relative order of both the
+    # moved and the other perspectives), so that cohorts are made of the others first. Returns new lists.
+    @staticmethod
+    def demote_perspectives(perspectives_per_rir: dict[str, list[RemotePerspective]],
+                            demoted_codes) -> dict[str, list[RemotePerspective]]:
+        demoted_perspectives_per_rir = {}
+        for rir, perspectives in perspectives_per_rir.items():
+            demoted_perspectives_per_rir[rir] = (
+                    [perspective for perspective in perspectives if perspective.code not in demoted_codes] +
+                    [perspective for perspective in perspectives if perspective.code in demoted_codes])
+        return demoted_perspectives_per_rir
+
+    # Distributes the perspectives (in the order given per RIR) into as many cohorts of the requested size as possible,
+    # each with at least 2 RIRs and no two perspectives too close to each other. The given lists are left unchanged.
+    # Runs in linear time in the number of perspectives (times the cost of the too-close checks): per-RIR queues are
+    # deques, the number of perspectives still available is kept as a running count, and the cohorts waiting for their
+    # second RIR are kept in a queue rotating round-robin.
+    # Too-close checks use the bitmasks of the given catalog of the perspectives (built from them if not given).
+    @staticmethod
+    def create_perspective_cohorts(perspectives_per_rir: dict, cohort_size: int,
+                                   perspective_catalog: PerspectiveCatalog | None = None):
+        return list(CohortCreator.generate_perspective_cohorts(perspectives_per_rir, cohort_size, perspective_catalog))
 
+    # Lazy form of create_perspective_cohorts, yielding the same cohorts in the same order. Only the (cheap) pairing of
+    # RIRs is done up front; each further cohort is completed when it is asked for.
     @staticmethod
-    def create_perspective_cohorts(perspectives_per_rir: dict, cohort_size: int):
+    def generate_perspective_cohorts(perspectives_per_rir: dict, cohort_size: int,
+                                     perspective_catalog: PerspectiveCatalog | None = None):
         if cohort_size == 1:
-            return [[region] for region in
-                    chain.from_iterable(perspectives_per_rir.values())]  # TODO limit cohort number in this case?
+            yield from ([region] for region in
+                        chain.from_iterable(perspectives_per_rir.values()))  # TODO limit cohort number in this case?
+            return
         elif len(perspectives_per_rir.keys()) < 2:  # else if only one rir, can't meet requirements
-            return []  # TODO throw an error? check this case in the validator?
+            return  # TODO throw an error? check this case in the validator?
+
+        if perspective_catalog is None:
+            perspective_catalog = PerspectiveCatalog(list(chain.from_iterable(perspectives_per_rir.values())))
+        available_per_rir = {rir: deque(perspectives) for rir, perspectives in perspectives_per_rir.items()}
+        available_count = sum(len(perspectives) for perspectives in available_per_rir.values())
 
         # the below is an upper bound for number of potential cohorts, assuming rir and distance rules can be met
-        number_of_potential_cohorts = len(list(chain.from_iterable(perspectives_per_rir.values()))) // cohort_size
-        new_cohorts, cohorts_with_two_rirs, full_cohorts = [], [], []
-        for cohort_number in range(number_of_potential_cohorts):
-            new_cohorts.append([])  # start with list of empty cohorts (list of lists)
-        # get set of unique rirs from available_perspectives
-        rirs_available = perspectives_per_rir.keys()
-        # cycle through rirs in available_perspectives
+        number_of_potential_cohorts = available_count // cohort_size
+        new_cohorts = [[] for _ in range(number_of_potential_cohorts)]
+        cohorts_with_two_rirs = []
+        rirs_available = available_per_rir.keys()
         rirs_cycle = cycle(rirs_available)
 
-        # first, try to fill up cohorts with 2 distinct rirs each
-        cohort_index = 0
+        # first, try to fill up cohorts with 2 distinct rirs each, handing out perspectives round-robin over the cohorts
+        # still waiting for their second rir (the current cohort is always at the front of the queue)
+        cohorts_to_fill = deque(new_cohorts)
         for current_rir in rirs_available:
-            while cohort_index < len(new_cohorts):
-                cohort = new_cohorts[cohort_index]
-
+            perspectives_for_rir = available_per_rir[current_rir]
+            while cohorts_to_fill:
+                cohort = cohorts_to_fill[0]
                 # if all out of perspectives for this rir, or already added this rir (looped back around)
-                # then move on to the next rir
-                if (len(perspectives_per_rir[current_rir]) == 0 or
-                        current_rir in [perspective.rir for perspective in cohort]):
-                    break  # break out of cohort loop to get next rir
-
-                cohort.append(perspectives_per_rir[current_rir].pop(0))
-
-                # if cohort has 2 rirs, move it to cohorts_with_two_rirs
+                # then move on to the next rir; until it has 2 rirs, a cohort holds a single perspective
+                if len(perspectives_for_rir) == 0 or (cohort and cohort[0].rir == current_rir):
+                    break
+                cohort.append(perspectives_for_rir.popleft())
+                available_count -= 1
                 if len(cohort) == 2:
-                    cohorts_with_two_rirs.append(new_cohorts.pop(cohort_index))
+                    cohorts_with_two_rirs.append(cohorts_to_fill.popleft())
                 else:
-                    cohort_index += 1
-                if cohort_index >= len(new_cohorts):
-                    cohort_index = 0
+                    cohorts_to_fill.rotate(-1)
 
-        # iterate over new_cohorts and remove the ones left at this point (failed to distribute 2 rirs to them)
+        # return the perspectives of cohorts that failed to get 2 rirs (in cohort creation order)
         for cohort in new_cohorts:
-            for perspective in cohort:
-                perspectives_per_rir[perspective.rir].append(perspective)
-        new_cohorts.clear()
+            if len(cohort) == 1:
+                available_per_rir[cohort[0].rir].append(cohort[0])
+                available_count += 1
 
-        # now we have a list of cohorts with 2 rirs; time to distribute the rest of the perspectives
-        # try to fill up one cohort at a time (seems like simpler logic) than trying to fill all cohorts at once
-        while len(cohorts_with_two_rirs) > 0:
+        # now we have a list of cohorts with 2 rirs; time to distribute the rest of the perspectives, one cohort at a time
+        for cohort in cohorts_with_two_rirs:
+            cohort_mask = perspective_catalog.build_mask(cohort)
             too_close_perspectives = []
-            cohort = cohorts_with_two_rirs[0]  # get the (next) cohort
             # while the cohort isn't at its required size and there are still enough potential perspectives to add
-            while len(cohort) < cohort_size and cohort_size - len(cohort) <= len(
-                    list(chain.from_iterable(perspectives_per_rir.values()))):
-                # get the next rir
+            while len(cohort) < cohort_size and cohort_size - len(cohort) <= available_count:
                 current_rir = next(rirs_cycle)
-
-                # if we are all out of perspectives for this rir, move on to the next rir
-                if len(perspectives_per_rir[current_rir]) == 0:
-                    continue  # continue to next rir
-
-                while len(perspectives_per_rir[current_rir]) > 0:
-                    candidate_perspective = perspectives_per_rir[current_rir].pop(0)
-                    if not any(candidate_perspective.is_perspective_too_close(perspective) for perspective in cohort):
+                perspectives_for_rir = available_per_rir[current_rir]
+                while perspectives_for_rir:
+                    candidate_perspective = perspectives_for_rir.popleft()
+                    available_count -= 1
+                    candidate_index = perspective_catalog.get_index(candidate_perspective)
+                    if perspective_catalog.too_close_masks[candidate_index] & cohort_mask == 0:
                         cohort.append(candidate_perspective)
+                        cohort_mask |= 1 << candidate_index
                         break
                     else:
                         too_close_perspectives.append(candidate_perspective)
 
-            # if cohort is full, move it to full_cohorts
-            if len(cohort) == cohort_size:
-                full_cohorts.append(cohorts_with_two_rirs[0])
-            else:  # otherwise, we ran out of perspectives to add to this cohort; it's a bad cohort so scrap it
+            is_cohort_full = len(cohort) == cohort_size
+            if not is_cohort_full:  # we ran out of perspectives to add to this cohort; it's a bad cohort so scrap it
                 for perspective in cohort:
-                    perspectives_per_rir[perspective.rir].append(perspective)
-            del cohorts_with_two_rirs[0]
-            # reset too_close_regions for next cohort
+                    available_per_rir[perspective.rir].append(perspective)
+                available_count += len(cohort)
+            # make the too close perspectives available again for the next cohort
             for perspective in too_close_perspectives:
-                perspectives_per_rir[perspective.rir].append(perspective)
-
-        # now we have a list of full cohorts
-        return full_cohorts
+                available_per_rir[perspective.rir].append(perspective)
+            available_count += len(too_close_perspectives)
+            if is_cohort_full:
+                yield cohort
+
+    # Returns the first candidate that can join the given cohort members without breaking the cohort rules (no two
+    # perspectives too close to each other; at least 2 RIRs in a cohort of more than one), or None if there is none.
+    # Candidates with excluded codes (e.g., ones already in use) are skipped.
+    @staticmethod
+    def find_substitute_perspective(cohort_members: list[RemotePerspective], candidates, excluded_codes: set[str]):
+        cohort_rirs = {perspective.rir for perspective in cohort_members}
+        for candidate in candidates:
+            if candidate.code in excluded_codes:
+                continue
+            if len(cohort_members) > 0 and len(cohort_rirs | {candidate.rir}) < 2:
+                continue
+            if any(candidate.is_perspective_too_close(member) or member.is_perspective_too_close(candidate)
+                   for member in cohort_members):
+                continue
+            return candidate
+        return None
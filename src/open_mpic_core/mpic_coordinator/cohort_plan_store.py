@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+from open_mpic_core.common_domain.remote_perspective import RemotePerspective
+from open_mpic_core.mpic_coordinator.perspective_catalog import PerspectiveCatalog
+
+
+# Persistent store of perspective cohorts ("cohort plans") in an SQLite database file, so that coordinator processes
+# on the same node can share the cohorts of hot targets instead of each computing them.
+# Plans are keyed by (hash secret digest, target, perspective count, catalog version): the hash secret itself is never
+# stored, and since the catalog version changes with any change to the perspectives, plans made for other perspective
+# configurations are never served (purge_other_catalog_versions() deletes them).
+# Only perspective codes are stored; they are mapped back to the catalog's perspectives when plans are read.
+# Safe to share across threads; each process (e.g., after a fork) opens a connection of its own.
+# The database holds the digest of the hash secret along with every stored target's cohorts, which is enough to tell
+# which perspectives will check a target, so database_path must be private to the coordinator's user: the file is
+# created with mode 0600 (SQLite gives its -wal and -shm files the same mode), but an existing file is used as is, and
+# the directory must not be writable by others.
+class CohortPlanStore:
+    BUSY_TIMEOUT_SECONDS = 5.0
+    DATABASE_FILE_MODE = 0o600
+
+    def __init__(self, database_path):
+        self.database_path = database_path
+        self.connection = None
+        self.connection_pid = None
+        self.hit_count = 0
+        self.miss_count = 0
+        self.lock = threading.Lock()
+
+    # Returns the stored cohorts, or the ones create_cohorts() returns (storing them) if there are none.
+    def get_cohorts(self, perspective_catalog: PerspectiveCatalog, hash_secret: str, domain_or_ip_target: str,
+                    perspective_count: int, create_cohorts) -> list[list[RemotePerspective]]:
+        key = (CohortPlanStore.build_hash_secret_digest(hash_secret), domain_or_ip_target.lower(), perspective_count,
+               perspective_catalog.version)
+        with self.lock:
+            row = self.get_connection().execute(
+                'SELECT cohort_codes FROM cohort_plans WHERE hash_secret_digest = ? AND domain_or_ip_target = ? '
+                'AND perspective_count = ? AND catalog_version = ?', key).fetchone()
+        if row is not None:
+            cohorts = CohortPlanStore.convert_codes_to_cohorts(json.loads(row[0]), perspective_catalog)
+            if cohorts is not None:
+                with self.lock:
+                    self.hit_count += 1
+                return cohorts
+
+        cohorts = create_cohorts()  # outside the lock; another process may store the same plan meanwhile, which is fine
+        cohort_codes = json.dumps([[perspective.code for perspective in cohort] for cohort in cohorts])
+        with self.lock:
+            self.miss_count += 1
+            with self.get_connection() as connection:
+                connection.execute('INSERT OR REPLACE INTO cohort_plans VALUES (?, ?, ?, ?, ?)', key + (cohort_codes,))
+        return cohorts
+
+    # Deletes the plans of every catalog version other than the given one.
+    def purge_other_catalog_versions(self, catalog_version: str):
+        with self.lock:
+            with self.get_connection() as connection:
+                connection.execute('DELETE FROM cohort_plans WHERE catalog_version != ?', (catalog_version,))
+
+    def close(self):
+        with self.lock:
+            if self.connection is not None and self.connection_pid == os.getpid():
+                self.connection.close()
+            self.connection = None
+
+    def __len__(self):
+        with self.lock:
+            return self.get_connection().execute('SELECT COUNT(*) FROM cohort_plans').fetchone()[0]
+
+    def get_connection(self) -> sqlite3.Connection:
+        if self.connection is None or self.connection_pid != os.getpid():  # connections mustn't cross a fork
+            # creates the file, if missing, with private permissions before SQLite creates it with umask-based ones
+            os.close(os.open(self.database_path, os.O_RDWR | os.O_CREAT, CohortPlanStore.DATABASE_FILE_MODE))
+            connection = sqlite3.connect(self.database_path, timeout=CohortPlanStore.BUSY_TIMEOUT_SECONDS,
+                                         check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')  # readers in other processes don't block on writers
+            connection.execute('CREATE TABLE IF NOT EXISTS cohort_plans (hash_secret_digest TEXT, domain_or_ip_target TEXT, '
+                               'perspective_count INTEGER, catalog_version TEXT, cohort_codes TEXT, PRIMARY KEY '
+                               '(hash_secret_digest, domain_or_ip_target, perspective_count, catalog_version))')
+            connection.commit()
+            self.connection = connection
+            self.connection_pid = os.getpid()
+        return self.connection
+
+    @staticmethod
+    def build_hash_secret_digest(hash_secret: str) -> str:
+        return hashlib.sha256(hash_secret.encode()).hexdigest()
+
+    # Returns None if any code isn't in the catalog (which a matching catalog version rules out, barring tampering).
+    @staticmethod
+    def convert_codes_to_cohorts(cohort_codes: list[list[str]],
+                                 perspective_catalog: PerspectiveCatalog) -> list[list[RemotePerspective]] | None:
+        cohorts = []
+        for codes in cohort_codes:
+            indices = [perspective_catalog.index_per_code.get(code) for code in codes]
+            if None in indices:
+                return None
+            cohorts.append([perspective_catalog.perspectives[index] for index in indices])
+        return cohorts
@@ -0,0 +1,13 @@
+# How to rank a target's cohorts so that the first ones used are those expected to respond fastest. A cohort's expected
+# latency is that of its slowest member, and cohorts are ordered by it (ties keep their shuffled order).
+# latency_estimates_seconds: configured latency estimate per perspective code.
+# use_live_latency_stats: prefer the perspective scoreboard's live latency averages, if there is a scoreboard, over the
+# configured estimates (perspectives without any estimate count as the average of those that have one).
+# jitter_fraction: each cohort's expected latency is scaled by a random factor between 1 and 1 + jitter_fraction,
+# seeded by the target, so cohorts within that margin of each other still come up in a per-target unpredictable order.
+class CohortRankingPolicy:
+    def __init__(self, latency_estimates_seconds: dict[str, float] | None = None, use_live_latency_stats=True,
+                 jitter_fraction=0.2):
+        self.latency_estimates_seconds = latency_estimates_seconds or {}
+        self.use_live_latency_stats = use_live_latency_stats
+        self.jitter_fraction = jitter_fraction
@@ -0,0 +1,13 @@
+# When to hedge a remote perspective call, i.e., send the same check to a spare perspective because the original one
+# is slower to respond than it usually is.
+# latency_percentile: hedge once a call has taken longer than this percentile (0-100) of the perspective's recent latencies.
+# min_latency_samples: don't hedge calls to perspectives with fewer recent latencies than this on record.
+# latency_window_size: number of recent latencies kept per perspective.
+# max_hedged_calls_per_attempt: cap on hedged calls per attempt (None: as many as there are compatible spares).
+class HedgingPolicy:
+    def __init__(self, latency_percentile=95, min_latency_samples=20, latency_window_size=100,
+                 max_hedged_calls_per_attempt=None):
+        self.latency_percentile = latency_percentile
+        self.min_latency_samples = min_latency_samples
+        self.latency_window_size = latency_window_size
+        self.max_hedged_calls_per_attempt = max_hedged_calls_per_attempt
@@ -9,7 +9,10 @@ class BaseMpicOrchestrationParameters(BaseModel, ABC):
 
 class MpicRequestOrchestrationParameters(BaseMpicOrchestrationParameters):
     max_attempts: int | None = None
+    perspective_call_timeout_seconds: float | None = None  # capped by the coordinator's configured value, if any
+    request_deadline_seconds: float | None = None  # capped by the coordinator's configured value, if any
 
 
 class MpicEffectiveOrchestrationParameters(BaseMpicOrchestrationParameters):
     attempt_count: int | None = 1
+    retained_perspective_codes: list[str] | None = None  # passed in an earlier attempt and kept by a partial retry
@@ -0,0 +1,15 @@
+from open_mpic_core.common_domain.enum.perspective_call_outcome import PerspectiveCallOutcome
+
+
+# What an MpicCoordinatorObserver is told about a remote perspective call. outcome, latency_ns and exception are only
+# set once the call has ended; check_count is greater than 1 for combined calls carrying several checks.
+class PerspectiveCallEvent:
+    def __init__(self, perspective_code: str, attempt: int, check_count=1,
+                 outcome: PerspectiveCallOutcome | None = None, latency_ns: int | None = None,
+                 exception: BaseException | None = None):
+        self.perspective_code = perspective_code
+        self.attempt = attempt
+        self.check_count = check_count
+        self.outcome = outcome
+        self.latency_ns = latency_ns
+        self.exception = exception
@@ -3,8 +3,21 @@ from open_mpic_core.common_domain.enum.check_type import CheckType
 from open_mpic_core.common_domain.remote_perspective import RemotePerspective
 
 
+# serialized_check_request: the check request as JSON, for transports that take bytes; shared by all calls of an attempt.
 class RemoteCheckCallConfiguration:
-    def __init__(self, check_type: CheckType, perspective: RemotePerspective, check_request: BaseCheckRequest):
+    def __init__(self, check_type: CheckType, perspective: RemotePerspective, check_request: BaseCheckRequest,
+                 serialized_check_request: bytes | None = None):
         self.check_type = check_type
         self.perspective = perspective
         self.check_request = check_request
+        self.serialized_check_request = serialized_check_request
+
+
+# All checks sent to one perspective in a single combined call (see MpicCoordinator.coordinate_mpic_batch).
+# call_timeout_seconds: how long to wait for the call (None: no limit); the same for all of its checks.
+class RemoteCheckBatchCallConfiguration:
+    def __init__(self, perspective: RemotePerspective, call_configurations: list[RemoteCheckCallConfiguration],
+                 call_timeout_seconds: float | None = None):
+        self.perspective = perspective
+        self.call_configurations = call_configurations
+        self.call_timeout_seconds = call_timeout_seconds
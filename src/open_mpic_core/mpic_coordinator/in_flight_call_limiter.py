@@ -0,0 +1,53 @@
+import asyncio
+import threading
+from collections import deque
+
+
+# Caps how many remote perspective calls are in flight at once, across all the event loops (and threads) of concurrent
+# requests. Waiters get slots first come, first served, and are woken by release() rather than polling for a slot.
+class InFlightCallLimiter:
+    def __init__(self, max_in_flight_calls):
+        self.max_in_flight_calls = max_in_flight_calls
+        self.available_slot_count = max_in_flight_calls
+        self.waiters = deque()  # (event loop, future) of each waiting call, in arrival order
+        self.lock = threading.Lock()
+
+    # Waits (without blocking the event loop) until the call can have a slot.
+    async def acquire(self):
+        with self.lock:
+            if self.available_slot_count > 0 and not self.waiters:
+                self.available_slot_count -= 1
+                return
+            waiter = (asyncio.get_running_loop(), asyncio.get_running_loop().create_future())
+            self.waiters.append(waiter)
+
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self.lock:
+                is_waiting = waiter in self.waiters
+                if is_waiting:
+                    self.waiters.remove(waiter)
+            # a slot already handed over is passed on (if the hand-over is still pending, grant_slot passes it on)
+            if not is_waiting and waiter[1].done() and not waiter[1].cancelled():
+                self.release()
+            raise
+
+    # Frees a slot, handing it straight to the longest-waiting call, if any. Can be called from any thread.
+    def release(self):
+        with self.lock:
+            while self.waiters:
+                loop, future = self.waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(self.grant_slot, future)
+                    return
+                except RuntimeError:  # the waiter's event loop is closed
+                    continue
+            self.available_slot_count += 1
+
+    # Runs on the waiter's event loop.
+    def grant_slot(self, future):
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
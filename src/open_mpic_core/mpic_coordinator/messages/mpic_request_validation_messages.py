@@ -8,6 +8,8 @@ class MpicRequestValidationMessages(Enum):
     INVALID_PERSPECTIVE_LIST = ('invalid-perspective-list', 'Invalid perspective list specified.')
     PERSPECTIVES_NOT_IN_DIAGNOSTIC_MODE = ('perspectives-not-in-diagnostic-mode', 'Explicitly listing perspectives is only allowed in diagnostics mode.')
     INVALID_QUORUM_COUNT = ('invalid-quorum-count', 'Invalid quorum count: {0}')
+    INVALID_PERSPECTIVE_CALL_TIMEOUT = ('invalid-perspective-call-timeout', 'Invalid perspective call timeout: {0}')
+    INVALID_REQUEST_DEADLINE = ('invalid-request-deadline', 'Invalid request deadline: {0}')
     INVALID_CERTIFICATE_TYPE = ('invalid-certificate-type', "Invalid 'certificate-type' specified: {0}")
     INVALID_VALIDATION_METHOD = ('invalid-validation-method', "Invalid 'validation-method' specified: {0}")
     REQUEST_VALIDATION_FAILED = ('request-validation-failed', 'Request validation failed.')
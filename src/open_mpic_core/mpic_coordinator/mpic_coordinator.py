@@ -1,109 +1,474 @@
+import asyncio
+import inspect
 import json
-import traceback
 from itertools import cycle
 
 import time
 import concurrent.futures
-from datetime import datetime
-import hashlib
+
+from pydantic import TypeAdapter
 
 from open_mpic_core.common_domain.check_response import CaaCheckResponse, \
-    CaaCheckResponseDetails, DcvCheckResponse, DcvCheckResponseDetails
+    CaaCheckResponseDetails, DcvCheckResponse, DcvCheckResponseDetails, CheckResponse
 from open_mpic_core.common_domain.check_request import CaaCheckRequest, DcvCheckRequest
 from open_mpic_core.common_domain.check_response_details import DcvCheckResponseDetailsBuilder
 from open_mpic_core.common_domain.validation_error import MpicValidationError
 from open_mpic_core.common_domain.enum.check_type import CheckType
+from open_mpic_core.common_domain.enum.perspective_call_outcome import PerspectiveCallOutcome
 from open_mpic_core.common_domain.messages.ErrorMessages import ErrorMessages
+from open_mpic_core.mpic_coordinator.cohort_cache import CohortCache
+from open_mpic_core.mpic_coordinator.cohort_plan_store import CohortPlanStore
+from open_mpic_core.mpic_coordinator.in_flight_call_limiter import InFlightCallLimiter
 from open_mpic_core.mpic_coordinator.cohort_creator import CohortCreator
+from open_mpic_core.mpic_coordinator.domain.cohort_ranking_policy import CohortRankingPolicy
+from open_mpic_core.mpic_coordinator.domain.hedging_policy import HedgingPolicy
 from open_mpic_core.mpic_coordinator.domain.mpic_request import MpicCaaRequest, MpicRequest, MpicDcvRequest
 from open_mpic_core.mpic_coordinator.domain.mpic_request_validation_error import MpicRequestValidationError
 from open_mpic_core.mpic_coordinator.domain.mpic_response import MpicResponse
-from open_mpic_core.mpic_coordinator.domain.remote_check_call_configuration import RemoteCheckCallConfiguration
+from open_mpic_core.mpic_coordinator.domain.perspective_call_event import PerspectiveCallEvent
+from open_mpic_core.mpic_coordinator.domain.remote_check_call_configuration import RemoteCheckCallConfiguration, \
+    RemoteCheckBatchCallConfiguration
 from open_mpic_core.common_domain.remote_perspective import RemotePerspective
 from open_mpic_core.mpic_coordinator.messages.mpic_request_validation_messages import MpicRequestValidationMessages
+from open_mpic_core.mpic_coordinator.mpic_coordinator_observer import MpicCoordinatorObserver
 from open_mpic_core.mpic_coordinator.mpic_request_validator import MpicRequestValidator
 from open_mpic_core.mpic_coordinator.mpic_response_builder import MpicResponseBuilder
+from open_mpic_core.mpic_coordinator.perspective_catalog import PerspectiveCatalog
+from open_mpic_core.mpic_coordinator.perspective_latency_tracker import PerspectiveLatencyTracker
+from open_mpic_core.mpic_coordinator.perspective_scoreboard import PerspectiveScoreboard
+
+check_response_adapter = TypeAdapter(CheckResponse)  # built once; parses serialized responses of either check type
 
 
 class MpicCoordinatorConfiguration:
+    # enable_early_quorum_decision: stop waiting for the remaining perspectives of an attempt as soon as quorum has
+    # been reached or can no longer be reached; the calls still outstanding at that point are cancelled (or, for
+    # blocking transports, abandoned) and reported with a COORDINATOR_CALL_CANCELLED error.
+    # perspective_call_timeout_seconds: how long to wait for any single remote perspective call (None: no limit).
+    # request_deadline_seconds: how long a whole coordinate_mpic call, including retries, may take (None: no limit).
+    # Timed out calls are reported with a COORDINATOR_TIMEOUT_ERROR. Requests can ask for lower values, but not higher.
+    # executor_max_workers: size of the thread pool the coordinator creates for a blocking transport (if not injected).
+    # max_in_flight_calls: cap on remote perspective calls in flight at once across all concurrent requests (None: no cap).
+    # hedging_policy: if set, a call that is slow by the perspective's own latency history is hedged with the same call
+    # to a compatible spare perspective from the next cohorts; the first passing response of the two counts, and the
+    # other call is cancelled. Only applies to coordinate_mpic (not to batches).
+    # enable_partial_retries: retry a failed attempt by keeping the perspectives that passed and replacing only the
+    # others with compatible perspectives from the next cohorts (falling back to a whole new cohort if that's not
+    # possible). The kept perspectives are listed in the response's retained_perspective_codes. Only applies to
+    # coordinate_mpic (not to batches).
+    # cohort_cache_size: how many targets' cohorts to keep for reuse across requests (None: don't cache cohorts).
+    # perspective_scoreboard: if set, it is fed the outcome of every remote perspective call, and the perspectives it
+    # considers unhealthy are only used in cohorts after all the healthy ones of their RIR (the cohort rules still
+    # apply). While every perspective is healthy, cohorts are the same as without it.
+    # cohort_ranking_policy: if set, a target's cohorts are used fastest first, by per-perspective latency estimates
+    # (see CohortRankingPolicy), rather than in their plain random order.
+    # cohort_plan_store: if set, cohorts are read from (or, the first time, written to) this CohortPlanStore, which
+    # coordinator processes on a node can share; behind the cohort cache, if that is enabled too. Not used for cohorts
+    # with demoted perspectives. The async entry points access it in the coordinator's executor, off the event loop.
     def __init__(self, target_perspectives, default_perspective_count,
-                 enforce_distinct_rir_regions, global_max_attempts, hash_secret):
+                 enforce_distinct_rir_regions, global_max_attempts, hash_secret,
+                 enable_early_quorum_decision=False, perspective_call_timeout_seconds=None, request_deadline_seconds=None,
+                 executor_max_workers=None, max_in_flight_calls=None, hedging_policy: HedgingPolicy | None = None,
+                 enable_partial_retries=False, cohort_cache_size=None,
+                 perspective_scoreboard: PerspectiveScoreboard | None = None,
+                 cohort_ranking_policy: CohortRankingPolicy | None = None,
+                 cohort_plan_store: CohortPlanStore | None = None):
         self.target_perspectives = target_perspectives
+        self.perspective_catalog = PerspectiveCatalog(target_perspectives)  # shared (read-only) by all requests
         self.default_perspective_count = default_perspective_count
         self.enforce_distinct_rir_regions = enforce_distinct_rir_regions
         self.global_max_attempts = global_max_attempts
         self.hash_secret = hash_secret
+        self.enable_early_quorum_decision = enable_early_quorum_decision
+        self.perspective_call_timeout_seconds = perspective_call_timeout_seconds
+        self.request_deadline_seconds = request_deadline_seconds
+        self.executor_max_workers = executor_max_workers
+        self.max_in_flight_calls = max_in_flight_calls
+        self.hedging_policy = hedging_policy
+        self.enable_partial_retries = enable_partial_retries
+        self.cohort_cache_size = cohort_cache_size
+        self.perspective_scoreboard = perspective_scoreboard
+        self.cohort_ranking_policy = cohort_ranking_policy
+        self.cohort_plan_store = cohort_plan_store
 
 
 class MpicCoordinator:
+    DEFAULT_EXECUTOR_MAX_WORKERS = 64
+
     # call_remote_perspective_function: a "dumb" transport for serialized data to a remote perspective and a serialized response from the remote perspective. MPIC Coordinator is tasked with ensuring the data from this function is sane and handling the serialization/deserialization of the data. This function may raise an exception if something goes wrong.
-    def __init__(self, call_remote_perspective_function, mpic_coordinator_configuration: MpicCoordinatorConfiguration):
+    # It may be either a regular (blocking) function or a coroutine function. Awaitable transports are fanned out as tasks
+    # on the running event loop; blocking transports are run in worker threads.
+    # executor: optional executor to run a blocking transport (and cohort plan store lookups) in. If not given, and there
+    # is such blocking work, the coordinator creates a long-lived thread pool of its own (sized by executor_max_workers),
+    # which is shared by all concurrent requests and released by shutdown(). An injected executor is never shut down by
+    # the coordinator.
+    # call_remote_perspective_batch_function: optional transport used by coordinate_mpic_batch to send several checks to
+    # one perspective in a single call. It is called with the perspective and a list of (check type, check request)
+    # pairs, and must return a list of check responses in the same order. It may be blocking or awaitable, like
+    # call_remote_perspective_function. Without it, batched checks are sent one per call.
+    # observer: optional MpicCoordinatorObserver to notify of the start and end of every remote perspective call.
+    # is_transport_serialized: if true, the transport functions get the check request as JSON bytes instead of a model
+    # (serialized once per attempt, the same bytes object for every perspective), and return check responses as JSON
+    # (bytes or str), which the coordinator parses.
+    def __init__(self, call_remote_perspective_function, mpic_coordinator_configuration: MpicCoordinatorConfiguration,
+                 executor: concurrent.futures.Executor | None = None, call_remote_perspective_batch_function=None,
+                 observer: MpicCoordinatorObserver | None = None, is_transport_serialized=False):
         self.target_perspectives = mpic_coordinator_configuration.target_perspectives
+        self.perspective_catalog = mpic_coordinator_configuration.perspective_catalog
         self.default_perspective_count = mpic_coordinator_configuration.default_perspective_count
         self.enforce_distinct_rir_regions = mpic_coordinator_configuration.enforce_distinct_rir_regions
         self.global_max_attempts = mpic_coordinator_configuration.global_max_attempts
         self.hash_secret = mpic_coordinator_configuration.hash_secret
+        self.enable_early_quorum_decision = mpic_coordinator_configuration.enable_early_quorum_decision
+        self.perspective_call_timeout_seconds = mpic_coordinator_configuration.perspective_call_timeout_seconds
+        self.request_deadline_seconds = mpic_coordinator_configuration.request_deadline_seconds
+        self.hedging_policy = mpic_coordinator_configuration.hedging_policy
+        self.enable_partial_retries = mpic_coordinator_configuration.enable_partial_retries
+        cohort_cache_size = mpic_coordinator_configuration.cohort_cache_size
+        self.cohort_cache = CohortCache(cohort_cache_size) if cohort_cache_size else None
+        self.perspective_scoreboard = mpic_coordinator_configuration.perspective_scoreboard
+        self.cohort_ranking_policy = mpic_coordinator_configuration.cohort_ranking_policy
+        self.cohort_plan_store = mpic_coordinator_configuration.cohort_plan_store
+        self.perspective_latency_tracker = None
+        if self.hedging_policy is not None:
+            self.perspective_latency_tracker = PerspectiveLatencyTracker(self.hedging_policy.latency_window_size)
+        self.observer = observer if observer is not None else MpicCoordinatorObserver()
+        self.is_transport_serialized = is_transport_serialized
         self.call_remote_perspective_function = call_remote_perspective_function
+        self.is_transport_awaitable = MpicCoordinator.is_awaitable_transport(call_remote_perspective_function)
+        self.call_remote_perspective_batch_function = call_remote_perspective_batch_function
+        self.is_batch_transport_awaitable = MpicCoordinator.is_awaitable_transport(call_remote_perspective_batch_function)
+
+        is_any_transport_blocking = not self.is_transport_awaitable or (
+                call_remote_perspective_batch_function is not None and not self.is_batch_transport_awaitable)
+        self.is_executor_owned = executor is None and (is_any_transport_blocking or self.cohort_plan_store is not None)
+        if self.is_executor_owned:
+            executor_max_workers = mpic_coordinator_configuration.executor_max_workers or MpicCoordinator.DEFAULT_EXECUTOR_MAX_WORKERS
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=executor_max_workers,
+                                                             thread_name_prefix='mpic-coordinator')
+        self.executor = executor
+
+        max_in_flight_calls = mpic_coordinator_configuration.max_in_flight_calls
+        # shared across threads, since concurrent requests may each be running on an event loop of their own
+        self.in_flight_call_limiter = None if max_in_flight_calls is None else InFlightCallLimiter(max_in_flight_calls)
+
+    # Switches to a new set of target perspectives for subsequent requests, dropping any cached cohorts.
+    def update_target_perspectives(self, target_perspectives):
+        self.perspective_catalog = PerspectiveCatalog(target_perspectives)
+        self.target_perspectives = target_perspectives
+        if self.cohort_cache is not None:
+            self.cohort_cache.invalidate()
 
+    # Releases the coordinator's own thread pool, if it has one. Pending calls that haven't started yet are cancelled.
+    def shutdown(self, wait=True):
+        if self.is_executor_owned:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    # Blocking entry point. Runs the asyncio-based coordinator to completion on a private event loop. If called from a
+    # thread that is already running an event loop, that loop is blocked until the request completes on a private loop
+    # in another thread (coordinate_mpic_async avoids blocking it).
     def coordinate_mpic(self, mpic_request: MpicRequest) -> MpicResponse:
-        is_request_valid, validation_issues = MpicRequestValidator.is_request_valid(mpic_request, self.target_perspectives)
+        return MpicCoordinator.run_to_completion(self.coordinate_mpic_async, mpic_request)
 
-        if not is_request_valid:
-            error = MpicRequestValidationError(MpicRequestValidationMessages.REQUEST_VALIDATION_FAILED.key)
-            validation_issues_as_string = json.dumps([vars(issue) for issue in validation_issues])
-            error.add_note(validation_issues_as_string)
-            raise error
+    async def coordinate_mpic_async(self, mpic_request: MpicRequest) -> MpicResponse:
+        self.validate_request(mpic_request)
 
         orchestration_parameters = mpic_request.orchestration_parameters
 
-        perspective_count = self.default_perspective_count
-        if orchestration_parameters is not None and orchestration_parameters.perspective_count is not None:
-            perspective_count = orchestration_parameters.perspective_count
+        perspective_count = self.determine_perspective_count(orchestration_parameters)
 
-        perspective_cohorts = self.create_cohorts_of_randomly_selected_perspectives(self.target_perspectives,
-                                                                                    perspective_count,
-                                                                                    mpic_request.domain_or_ip_target)
+        # hedging and partial retries pick spares from the following cohorts, so they need all of them up front
+        is_every_cohort_needed = self.hedging_policy is not None or self.enable_partial_retries
+        perspective_cohorts = await self.get_perspective_cohorts_async(perspective_count, mpic_request.domain_or_ip_target,
+                                                                       is_every_cohort_needed)
 
         quorum_count = self.determine_required_quorum_count(orchestration_parameters, perspective_count)
 
-        if orchestration_parameters is not None and orchestration_parameters.max_attempts is not None:
-            max_attempts = orchestration_parameters.max_attempts
-            if self.global_max_attempts is not None and max_attempts > self.global_max_attempts:
-                max_attempts = self.global_max_attempts
-        else:
-            max_attempts = 1
+        max_attempts = self.determine_max_attempts(orchestration_parameters)
+
+        perspective_call_timeout_seconds, request_deadline_seconds = self.determine_timeouts(orchestration_parameters)
+        loop = asyncio.get_running_loop()
+        request_deadline = None if request_deadline_seconds is None else loop.time() + request_deadline_seconds
+
         attempts = 1
         cohort_cycle = cycle(perspective_cohorts)
+        cohort_number = 0  # of the cohort in use, counting on across cycles
+        perspectives_to_use = next(cohort_cycle)
+        retained_responses = []  # passing responses kept from earlier attempts by partial retries
+        retained_perspectives = []  # ...and their perspectives
+        used_perspective_codes = set()
         while attempts <= max_attempts:
-            perspectives_to_use = next(cohort_cycle)
+            attempt_begin = loop.time()
+            call_timeout_seconds = MpicCoordinator.determine_call_timeout(perspective_call_timeout_seconds,
+                                                                          request_deadline, attempt_begin)
 
             # Collect async calls to invoke for each perspective.
-            async_calls_to_issue = MpicCoordinator.collect_async_calls_to_issue(mpic_request, perspectives_to_use)
+            async_calls_to_issue = MpicCoordinator.collect_async_calls_to_issue(mpic_request, perspectives_to_use,
+                                                                                self.is_transport_serialized)
+
+            spare_perspectives = None
+            if self.hedging_policy is not None or self.enable_partial_retries:
+                spare_perspectives = MpicCoordinator.collect_spare_perspectives(
+                    perspective_cohorts, cohort_number % len(perspective_cohorts))
 
             perspective_responses, validity_per_perspective = (
-                self.issue_async_calls_and_collect_responses(perspectives_to_use, async_calls_to_issue))
+                await self.issue_async_calls_and_collect_responses(perspectives_to_use, async_calls_to_issue,
+                                                                   quorum_count - len(retained_responses),
+                                                                   call_timeout_seconds, spare_perspectives, attempts,
+                                                                   retained_perspectives, used_perspective_codes))
+            used_perspective_codes.update(validity_per_perspective.keys())
 
-            valid_perspective_count = sum(validity_per_perspective.values())
+            valid_perspective_count = len(retained_responses) + sum(validity_per_perspective.values())
             is_valid_result = valid_perspective_count >= quorum_count
 
-            if is_valid_result or attempts == max_attempts:
+            # don't start another attempt if it likely can't finish before the deadline (judging by this attempt)
+            now = loop.time()
+            is_deadline_too_close = request_deadline is not None and request_deadline - now < now - attempt_begin
+
+            if is_valid_result or attempts == max_attempts or is_deadline_too_close:
+                retained_perspective_codes = [response.perspective_code for response in retained_responses] or None
                 response = MpicResponseBuilder.build_response(mpic_request, perspective_count, quorum_count, attempts,
-                                                              perspective_responses, is_valid_result)
+                                                              retained_responses + perspective_responses,
+                                                              is_valid_result, retained_perspective_codes)
                 return response
             else:
                 attempts += 1
+                substitute_perspectives = None
+                if self.enable_partial_retries:
+                    retained_responses += [response for response in perspective_responses
+                                           if response.check_passed and validity_per_perspective[response.perspective_code]]
+                    retained_perspectives = [self.find_target_perspective(response.perspective_code)
+                                             for response in retained_responses]
+                    substitute_perspectives = MpicCoordinator.select_substitute_perspectives(
+                        retained_perspectives, perspective_count - len(retained_perspectives), spare_perspectives,
+                        used_perspective_codes)
+                if substitute_perspectives is not None:
+                    perspectives_to_use = substitute_perspectives
+                else:  # retry with the whole next cohort
+                    retained_responses = []
+                    retained_perspectives = []
+                    cohort_number += 1
+                    perspectives_to_use = next(cohort_cycle)
+
+    # Blocking entry point for coordinate_mpic_batch_async; see coordinate_mpic regarding event loops.
+    def coordinate_mpic_batch(self, mpic_requests: list[MpicRequest]) -> list[MpicResponse]:
+        return MpicCoordinator.run_to_completion(self.coordinate_mpic_batch_async, mpic_requests)
+
+    # Coordinates several MPIC requests at once, e.g., the CAA or DCV checks for every SAN of a certificate.
+    # All requests go through their attempts in lockstep. In each attempt, every perspective used by any request that is
+    # still undecided gets one combined call (if a batch transport is configured) carrying all of its checks, so the
+    # number of round trips grows with the number of perspectives rather than with perspectives times targets. Each
+    # check is only held to its own request's call timeout and deadline: checks with different limits go in separate
+    # combined calls.
+    # Returns one response per request, in request order. Early quorum decision does not apply to batches, since a
+    # combined call generally serves requests whose outcome is decided along with ones whose outcome is not.
+    async def coordinate_mpic_batch_async(self, mpic_requests: list[MpicRequest]) -> list[MpicResponse]:
+        for mpic_request in mpic_requests:
+            self.validate_request(mpic_request)
+
+        perspective_count_per_request = [self.determine_perspective_count(mpic_request.orchestration_parameters)
+                                         for mpic_request in mpic_requests]
+        perspective_cohorts_per_request = await asyncio.gather(*(
+            self.get_perspective_cohorts_async(perspective_count, mpic_request.domain_or_ip_target,
+                                               is_every_cohort_needed=False)
+            for mpic_request, perspective_count in zip(mpic_requests, perspective_count_per_request)))
+
+        loop = asyncio.get_running_loop()
+        batch_begin = loop.time()
+        undecided_requests = []
+        for request_index, mpic_request in enumerate(mpic_requests):
+            orchestration_parameters = mpic_request.orchestration_parameters
+            perspective_count = perspective_count_per_request[request_index]
+            perspective_cohorts = perspective_cohorts_per_request[request_index]
+            perspective_call_timeout_seconds, request_deadline_seconds = self.determine_timeouts(orchestration_parameters)
+            undecided_requests.append(BatchedMpicRequestState(
+                request_index, mpic_request, perspective_count,
+                self.determine_required_quorum_count(orchestration_parameters, perspective_count),
+                self.determine_max_attempts(orchestration_parameters), perspective_call_timeout_seconds,
+                None if request_deadline_seconds is None else batch_begin + request_deadline_seconds,
+                cycle(perspective_cohorts)))
+
+        mpic_responses = [None] * len(mpic_requests)
+        attempts = 1
+        while undecided_requests:
+            attempt_begin = loop.time()
+            call_configurations_to_requests = {}
+            call_timeout_per_call_configuration = {}
+            for request_state in undecided_requests:
+                perspectives_to_use = next(request_state.cohort_cycle)
+                request_call_timeout_seconds = MpicCoordinator.determine_call_timeout(
+                    request_state.perspective_call_timeout_seconds, request_state.request_deadline, attempt_begin)
+                for call_configuration in MpicCoordinator.collect_async_calls_to_issue(request_state.mpic_request,
+                                                                                       perspectives_to_use,
+                                                                                       self.is_transport_serialized):
+                    call_configurations_to_requests[call_configuration] = request_state
+                    call_timeout_per_call_configuration[call_configuration] = request_call_timeout_seconds
+
+            batch_calls_to_issue = self.collect_batch_calls_to_issue(list(call_configurations_to_requests.keys()),
+                                                                     call_timeout_per_call_configuration)
+            responses_per_call_configuration = await self.issue_batch_calls_and_collect_responses(batch_calls_to_issue,
+                                                                                                  attempts)
+            perspective_responses_per_request = {request_state.request_index: [] for request_state in undecided_requests}
+            for call_configuration, check_response in responses_per_call_configuration:
+                request_state = call_configurations_to_requests[call_configuration]
+                perspective_responses_per_request[request_state.request_index].append(check_response)
+
+            now = loop.time()
+            still_undecided_requests = []
+            for request_state in undecided_requests:
+                perspective_responses = perspective_responses_per_request[request_state.request_index]
+                valid_perspective_count = len({response.perspective_code for response in perspective_responses
+                                               if response.check_passed})
+                is_valid_result = valid_perspective_count >= request_state.quorum_count
+                is_deadline_too_close = (request_state.request_deadline is not None and
+                                         request_state.request_deadline - now < now - attempt_begin)
+                if is_valid_result or attempts == request_state.max_attempts or is_deadline_too_close:
+                    mpic_responses[request_state.request_index] = MpicResponseBuilder.build_response(
+                        request_state.mpic_request, request_state.perspective_count, request_state.quorum_count,
+                        attempts, perspective_responses, is_valid_result)
+                else:
+                    still_undecided_requests.append(request_state)
+            undecided_requests = still_undecided_requests
+            attempts += 1
+        return mpic_responses
+
+    # Raises an MpicRequestValidationError (listing the issues found in a note) if the request is not valid.
+    def validate_request(self, mpic_request: MpicRequest):
+        is_request_valid, validation_issues = MpicRequestValidator.is_request_valid(mpic_request, self.target_perspectives)
+
+        if not is_request_valid:
+            error = MpicRequestValidationError(MpicRequestValidationMessages.REQUEST_VALIDATION_FAILED.key)
+            validation_issues_as_string = json.dumps([vars(issue) for issue in validation_issues])
+            error.add_note(validation_issues_as_string)
+            raise error
+
+    def determine_perspective_count(self, orchestration_parameters) -> int:
+        perspective_count = self.default_perspective_count
+        if orchestration_parameters is not None and orchestration_parameters.perspective_count is not None:
+            perspective_count = orchestration_parameters.perspective_count
+        return perspective_count
+
+    def determine_max_attempts(self, orchestration_parameters) -> int:
+        if orchestration_parameters is not None and orchestration_parameters.max_attempts is not None:
+            max_attempts = orchestration_parameters.max_attempts
+            if self.global_max_attempts is not None and max_attempts > self.global_max_attempts:
+                max_attempts = self.global_max_attempts
+        else:
+            max_attempts = 1
+        return max_attempts
+
+    # Returns the cohorts of target perspectives for the target, from the cohort cache if enabled. Otherwise, unless
+    # every cohort is needed (or they are to be ranked), returns an iterator creating them as they are used.
+    # Ranking by latency happens after the cache lookup, since it depends on live latency stats.
+    def get_perspective_cohorts(self, perspective_count, domain_or_ip_target, is_every_cohort_needed=True):
+        if self.cohort_ranking_policy is not None:
+            perspective_cohorts = self.get_unranked_perspective_cohorts(perspective_count, domain_or_ip_target, True)
+            return self.rank_perspective_cohorts(perspective_cohorts, domain_or_ip_target)
+        return self.get_unranked_perspective_cohorts(perspective_count, domain_or_ip_target, is_every_cohort_needed)
+
+    # Non-blocking form of get_perspective_cohorts. The cohort plan store, if any, does file I/O (and may wait up to its
+    # BUSY_TIMEOUT_SECONDS for a locked database), so then the cohorts are fetched in the coordinator's executor.
+    async def get_perspective_cohorts_async(self, perspective_count, domain_or_ip_target, is_every_cohort_needed=True):
+        if self.cohort_plan_store is None:
+            return self.get_perspective_cohorts(perspective_count, domain_or_ip_target, is_every_cohort_needed)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self.get_perspective_cohorts,
+                                                                perspective_count, domain_or_ip_target,
+                                                                is_every_cohort_needed)
+
+    def get_unranked_perspective_cohorts(self, perspective_count, domain_or_ip_target, is_every_cohort_needed):
+        demoted_perspective_codes = frozenset()
+        if self.perspective_scoreboard is not None:
+            demoted_perspective_codes = self.perspective_scoreboard.get_unhealthy_perspective_codes()
+
+        # target perspectives are read only after the cache lookup, so cohorts for perspectives replaced in the meantime
+        # can't end up cached under the current generation (update_target_perspectives invalidates after replacing them)
+        def create_cohorts():
+            perspective_catalog = self.perspective_catalog
+
+            def compute_cohorts():
+                return self.create_cohorts_of_randomly_selected_perspectives(perspective_catalog, perspective_count,
+                                                                             domain_or_ip_target, demoted_perspective_codes)
+
+            if self.cohort_plan_store is None or demoted_perspective_codes:  # demotions are this process's own view
+                return compute_cohorts()
+            return self.cohort_plan_store.get_cohorts(perspective_catalog, self.hash_secret, domain_or_ip_target,
+                                                      perspective_count, compute_cohorts)
+
+        if self.cohort_cache is None:
+            if is_every_cohort_needed or self.cohort_plan_store is not None:
+                return create_cohorts()
+            return self.generate_cohorts_of_randomly_selected_perspectives(self.perspective_catalog, perspective_count,
+                                                                           domain_or_ip_target, demoted_perspective_codes)
+        return self.cohort_cache.get_cohorts(domain_or_ip_target, perspective_count, create_cohorts,
+                                             demoted_perspective_codes)
 
     # Returns a random subset of perspectives with a goal of maximum RIR diversity to increase diversity.
     # Perspectives must be of the form 'RIR.AWS-region'.
-    def create_cohorts_of_randomly_selected_perspectives(self, target_perspectives, count, domain_or_ip_target):
+    # Perspectives with demoted codes are only used after all others of their RIR.
+    def create_cohorts_of_randomly_selected_perspectives(self, target_perspectives, count, domain_or_ip_target,
+                                                         demoted_perspective_codes=frozenset()):
+        return list(self.generate_cohorts_of_randomly_selected_perspectives(target_perspectives, count, domain_or_ip_target,
+                                                                            demoted_perspective_codes))
+
+    # Lazy form of create_cohorts_of_randomly_selected_perspectives (the count is still checked right away).
+    # target_perspectives may be a list of perspectives or a PerspectiveCatalog of them.
+    def generate_cohorts_of_randomly_selected_perspectives(self, target_perspectives, count, domain_or_ip_target,
+                                                           demoted_perspective_codes=frozenset()):
         if count > len(target_perspectives):
             raise ValueError(
                 f"Count ({count}) must be <= the number of available perspectives ({len(target_perspectives)})")
 
-        random_seed = hashlib.sha256((self.hash_secret + domain_or_ip_target.lower()).encode('ASCII')).digest()
-        perspectives_per_rir = CohortCreator.build_randomly_shuffled_available_perspectives_per_rir(target_perspectives, random_seed)
-        cohorts = CohortCreator.create_perspective_cohorts(perspectives_per_rir, count)
-        return cohorts
+        if isinstance(target_perspectives, PerspectiveCatalog):
+            perspective_catalog = target_perspectives
+        else:
+            perspective_catalog = PerspectiveCatalog(target_perspectives)
+        random_seed = self.determine_random_seed(domain_or_ip_target)
+        perspectives_per_rir = perspective_catalog.build_randomly_shuffled_perspectives_per_rir(random_seed)
+        if demoted_perspective_codes:
+            perspectives_per_rir = CohortCreator.demote_perspectives(perspectives_per_rir, demoted_perspective_codes)
+        return CohortCreator.generate_perspective_cohorts(perspectives_per_rir, count, perspective_catalog)
+
+    # Orders the cohorts by expected latency per the cohort ranking policy, with jitter seeded by the target.
+    def rank_perspective_cohorts(self, perspective_cohorts, domain_or_ip_target):
+        latency_estimate_per_code = dict(self.cohort_ranking_policy.latency_estimates_seconds)
+        if self.cohort_ranking_policy.use_live_latency_stats and self.perspective_scoreboard is not None:
+            latency_estimate_per_code.update(self.perspective_scoreboard.get_latency_estimates())
+        return CohortCreator.rank_perspective_cohorts(perspective_cohorts, latency_estimate_per_code,
+                                                      self.determine_random_seed(domain_or_ip_target),
+                                                      self.cohort_ranking_policy.jitter_fraction)
+
+    def determine_random_seed(self, domain_or_ip_target) -> bytes:
+        return CohortCreator.build_random_seed(self.hash_secret, domain_or_ip_target)
+
+    # Determines the per-call timeout and whole-request deadline (in seconds) to use; None means no limit.
+    # Values requested in the orchestration parameters are used only if they don't exceed the configured ones.
+    def determine_timeouts(self, orchestration_parameters) -> tuple[float | None, float | None]:
+        perspective_call_timeout_seconds = self.perspective_call_timeout_seconds
+        request_deadline_seconds = self.request_deadline_seconds
+        if orchestration_parameters is not None:
+            perspective_call_timeout_seconds = MpicCoordinator.cap_requested_limit(
+                orchestration_parameters.perspective_call_timeout_seconds, perspective_call_timeout_seconds)
+            request_deadline_seconds = MpicCoordinator.cap_requested_limit(
+                orchestration_parameters.request_deadline_seconds, request_deadline_seconds)
+        return perspective_call_timeout_seconds, request_deadline_seconds
+
+    # Returns the timeout for calls starting at the given (event loop) time; no call may outlive the request deadline.
+    @staticmethod
+    def determine_call_timeout(perspective_call_timeout_seconds, request_deadline, now) -> float | None:
+        call_timeout_seconds = perspective_call_timeout_seconds
+        if request_deadline is not None:
+            remaining_seconds = request_deadline - now
+            if call_timeout_seconds is None or remaining_seconds < call_timeout_seconds:
+                call_timeout_seconds = remaining_seconds
+        return call_timeout_seconds
+
+    @staticmethod
+    def cap_requested_limit(requested_limit, configured_limit):
+        if requested_limit is None:
+            return configured_limit
+        if configured_limit is not None and requested_limit > configured_limit:
+            return configured_limit
+        return requested_limit
 
     # Determines the minimum required quorum size if none is specified in the request.
     @staticmethod
@@ -115,90 +480,405 @@ class MpicCoordinator:
         return required_quorum_count
 
     # Configures the async remote perspective calls to issue for the check request.
+    # With serialize_check_request, the check request is also serialized (once) for transports that take bytes.
     @staticmethod
-    def collect_async_calls_to_issue(mpic_request, perspectives_to_use: list[RemotePerspective]) -> list[RemoteCheckCallConfiguration]:
+    def collect_async_calls_to_issue(mpic_request, perspectives_to_use: list[RemotePerspective],
+                                     serialize_check_request=False) -> list[RemoteCheckCallConfiguration]:
         domain_or_ip_target = mpic_request.domain_or_ip_target
         async_calls_to_issue = []
 
         # check if mpic_request is an instance of MpicCaaRequest or MpicDcvRequest
         if isinstance(mpic_request, MpicCaaRequest):
             check_parameters = CaaCheckRequest(domain_or_ip_target=domain_or_ip_target, caa_check_parameters=mpic_request.caa_check_parameters)
+            serialized_check_parameters = check_parameters.model_dump_json().encode() if serialize_check_request else None
             for perspective in perspectives_to_use:
-                call_config = RemoteCheckCallConfiguration(CheckType.CAA, perspective, check_parameters)
+                call_config = RemoteCheckCallConfiguration(CheckType.CAA, perspective, check_parameters,
+                                                           serialized_check_parameters)
                 async_calls_to_issue.append(call_config)
 
         elif isinstance(mpic_request, MpicDcvRequest):
             check_parameters = DcvCheckRequest(domain_or_ip_target=domain_or_ip_target, dcv_check_parameters=mpic_request.dcv_check_parameters)
+            serialized_check_parameters = check_parameters.model_dump_json().encode() if serialize_check_request else None
             for perspective in perspectives_to_use:
-                call_config = RemoteCheckCallConfiguration(CheckType.DCV, perspective, check_parameters)
+                call_config = RemoteCheckCallConfiguration(CheckType.DCV, perspective, check_parameters,
+                                                           serialized_check_parameters)
                 async_calls_to_issue.append(call_config)
 
         return async_calls_to_issue
 
+    # Returns the perspectives of the cohorts following the given one (in the order they would be used for retries),
+    # which can stand in for a cohort member as hedges.
+    @staticmethod
+    def collect_spare_perspectives(perspective_cohorts, cohort_index) -> list[RemotePerspective]:
+        following_cohorts = perspective_cohorts[cohort_index + 1:] + perspective_cohorts[:cohort_index]
+        return [perspective for cohort in following_cohorts for perspective in cohort]
+
+    # Picks a compatible substitute for each perspective that didn't pass, leaving out perspectives used before; returns
+    # None if there aren't enough of them.
+    @staticmethod
+    def select_substitute_perspectives(retained_perspectives, substitute_count, spare_perspectives,
+                                       used_perspective_codes) -> list[RemotePerspective] | None:
+        substitute_perspectives = []
+        excluded_perspective_codes = set(used_perspective_codes)
+        for _ in range(substitute_count):
+            substitute_perspective = CohortCreator.find_substitute_perspective(
+                retained_perspectives + substitute_perspectives, spare_perspectives, excluded_perspective_codes)
+            if substitute_perspective is None:
+                return None
+            substitute_perspectives.append(substitute_perspective)
+            excluded_perspective_codes.add(substitute_perspective.code)
+        return substitute_perspectives
+
+    def find_target_perspective(self, perspective_code) -> RemotePerspective:
+        perspective_catalog = self.perspective_catalog
+        return perspective_catalog.perspectives[perspective_catalog.index_per_code[perspective_code]]
+
+    # Groups the calls by perspective and call timeout (per call_timeout_per_call_configuration; None: no limit), one
+    # combined call per group. Without a batch transport, every call stays on its own.
+    def collect_batch_calls_to_issue(self, call_configurations: list[RemoteCheckCallConfiguration],
+                                     call_timeout_per_call_configuration=None) -> list[RemoteCheckBatchCallConfiguration]:
+        call_timeout_per_call_configuration = call_timeout_per_call_configuration or {}
+        if self.call_remote_perspective_batch_function is None:
+            return [RemoteCheckBatchCallConfiguration(call_configuration.perspective, [call_configuration],
+                                                      call_timeout_per_call_configuration.get(call_configuration))
+                    for call_configuration in call_configurations]
+        call_configurations_per_group = {}
+        for call_configuration in call_configurations:
+            call_timeout_seconds = call_timeout_per_call_configuration.get(call_configuration)
+            group = (call_configuration.perspective.code, call_timeout_seconds)
+            call_configurations_per_group.setdefault(group, []).append(call_configuration)
+        return [RemoteCheckBatchCallConfiguration(group_call_configurations[0].perspective, group_call_configurations,
+                                                  call_timeout_seconds)
+                for (_, call_timeout_seconds), group_call_configurations in call_configurations_per_group.items()]
+
+    # Issues the combined calls and returns a (call configuration, check response) pair for every call configuration.
+    # A combined call that fails or times out (after its own call_timeout_seconds) yields an error response for each of
+    # the checks it carried.
+    async def issue_batch_calls_and_collect_responses(self, batch_calls_to_issue: list[RemoteCheckBatchCallConfiguration],
+                                                      attempt=1) -> list[tuple]:
+        tasks_to_batch_calls = {
+            asyncio.create_task(self.observe_perspective_call(
+                batch_call.perspective.code, attempt, len(batch_call.call_configurations),
+                asyncio.wait_for(self.call_remote_perspective_batch(batch_call), batch_call.call_timeout_seconds))): batch_call
+            for batch_call in batch_calls_to_issue
+        }
+        if tasks_to_batch_calls:
+            await asyncio.wait(tasks_to_batch_calls.keys())
+
+        responses_per_call_configuration = []
+        for task, batch_call in tasks_to_batch_calls.items():
+            try:
+                check_responses = task.result()
+                if len(check_responses) != len(batch_call.call_configurations):
+                    raise ValueError(f"Expected {len(batch_call.call_configurations)} check responses from "
+                                     f"{batch_call.perspective.code}, got {len(check_responses)}")
+                responses_per_call_configuration.extend(zip(batch_call.call_configurations, check_responses))
+            except TimeoutError:
+                responses_per_call_configuration.extend(
+                    (call_configuration, MpicCoordinator.build_error_check_response(call_configuration, ErrorMessages.COORDINATOR_TIMEOUT_ERROR))
+                    for call_configuration in batch_call.call_configurations)
+            except Exception:
+                responses_per_call_configuration.extend(
+                    (call_configuration, MpicCoordinator.build_error_check_response(call_configuration, ErrorMessages.COORDINATOR_COMMUNICATION_ERROR))
+                    for call_configuration in batch_call.call_configurations)
+        return responses_per_call_configuration
+
     # Issues the async calls to the remote perspectives and collects the responses.
-    def issue_async_calls_and_collect_responses(self, perspectives_to_use, async_calls_to_issue) -> tuple[list, dict]:
+    # If early quorum decision is enabled, stops collecting once the quorum outcome no longer depends on pending calls.
+    # Calls that take longer than call_timeout_seconds (if set) are reported as timed out.
+    # Each call fills a slot of the cohort. With hedging, a slow call's slot can also be filled by the same call to one of
+    # the spare perspectives; the slot is filled by the first passing response (the other call is cancelled), or failed
+    # once all of its calls failed. At most one response per slot counts toward quorum.
+    # With partial retries, retained_perspectives (those whose responses were kept from earlier attempts) still count
+    # as cohort members for the choice of hedges, and no hedge goes to them or to perspectives in used_perspective_codes.
+    async def issue_async_calls_and_collect_responses(self, perspectives_to_use, async_calls_to_issue,
+                                                      quorum_count=None, call_timeout_seconds=None,
+                                                      spare_perspectives=None, attempt=1, retained_perspectives=(),
+                                                      used_perspective_codes=frozenset()) -> tuple[list, dict]:
         perspective_responses = []
         validity_per_perspective = {perspective.code: False for perspective in perspectives_to_use}
 
-        perspective_count = len(perspectives_to_use)
+        loop = asyncio.get_running_loop()
+        attempt_begin = loop.time()
+        tasks_to_call_configs = {}
+        tasks_to_slots = {}
+        tasks_per_slot = []
+        for slot, call_config in enumerate(async_calls_to_issue):
+            task = asyncio.create_task(self.observe_perspective_call(
+                call_config.perspective.code, attempt, 1,
+                asyncio.wait_for(self.call_remote_perspective(call_config), call_timeout_seconds)))
+            tasks_to_call_configs[task] = call_config
+            tasks_to_slots[task] = slot
+            tasks_per_slot.append([task])
+        unfilled_slots = set(range(len(async_calls_to_issue)))
+        hedge_times_per_slot = self.determine_hedge_times(async_calls_to_issue, attempt_begin, spare_perspectives)
+        hedged_call_count = 0
 
-        # example code: https://docs.python.org/3/library/concurrent.futures.html
-        with concurrent.futures.ThreadPoolExecutor(max_workers=perspective_count) as executor:
-            exec_begin = time.perf_counter()
-            futures_to_call_configs = {executor.submit(self.call_remote_perspective, self.call_remote_perspective_function, call_config): call_config
-                                       for call_config in async_calls_to_issue}
-            for future in concurrent.futures.as_completed(futures_to_call_configs):
-                call_configuration = futures_to_call_configs[future]
+        pending_tasks = set(tasks_to_call_configs.keys())
+        outstanding_tasks = set(pending_tasks)  # not yet accounted for, whether done or not
+        while pending_tasks:
+            wait_timeout = None
+            if hedge_times_per_slot:
+                wait_timeout = max(0.0, min(hedge_times_per_slot.values()) - loop.time())
+            done_tasks, pending_tasks = await asyncio.wait(pending_tasks, timeout=wait_timeout,
+                                                           return_when=asyncio.FIRST_COMPLETED)
+            for task in done_tasks:
+                if task not in outstanding_tasks:
+                    continue  # cancelled along the way, already reported
+                outstanding_tasks.discard(task)
+                call_configuration = tasks_to_call_configs[task]
                 perspective: RemotePerspective = call_configuration.perspective
-                now = time.perf_counter()
-                print(
-                    f"Unpacking future result for {perspective.code} at time {str(datetime.now())}: {now - exec_begin:.2f} \
-                    seconds from beginning")
                 try:
-                    check_response = future.result()  # expecting a CheckResponse object
-                    validity_per_perspective[perspective.code] |= check_response.check_passed
+                    check_response = task.result()  # expecting a CheckResponse object
                     # TODO make sure responses per perspective match API spec...
-                    perspective_responses.append(check_response)
+                except TimeoutError:
+                    check_response = MpicCoordinator.build_error_check_response(
+                        call_configuration, ErrorMessages.COORDINATOR_TIMEOUT_ERROR)
                 except Exception:  # TODO what exceptions are we expecting here?
-                    print(traceback.format_exc())
-                    match call_configuration.check_type:
-                        case CheckType.CAA:
-                            check_error_response = CaaCheckResponse(
-                                perspective_code=perspective.code,
-                                check_passed=False,
-                                errors=[MpicValidationError(error_type=ErrorMessages.COORDINATOR_COMMUNICATION_ERROR.key,
-                                                            error_message=ErrorMessages.COORDINATOR_COMMUNICATION_ERROR.message)],
-                                details=CaaCheckResponseDetails(caa_record_present=False),  # TODO Possibly should None to indicate the lookup failed.
-                                timestamp_ns=time.time_ns()
-                            )
-                        case CheckType.DCV:
-                            dcv_check_request: DcvCheckRequest = call_configuration.check_request
-                            validation_method = dcv_check_request.dcv_check_parameters.validation_details.validation_method
-                            check_error_response = DcvCheckResponse(
-                                perspective_code=perspective.code,
-                                check_passed=False,
-                                errors=[MpicValidationError(error_type=ErrorMessages.COORDINATOR_COMMUNICATION_ERROR.key,
-                                                            error_message=ErrorMessages.COORDINATOR_COMMUNICATION_ERROR.message)],
-                                details=DcvCheckResponseDetailsBuilder.build_response_details(validation_method),  # TODO what should go here in this case?
-                                timestamp_ns=time.time_ns()
-                            )
-                    validity_per_perspective[perspective.code] |= check_error_response.check_passed
-                    perspective_responses.append(check_error_response)
+                    check_response = MpicCoordinator.build_error_check_response(
+                        call_configuration, ErrorMessages.COORDINATOR_COMMUNICATION_ERROR)
+                perspective_responses.append(check_response)
+
+                slot = tasks_to_slots[task]
+                if slot not in unfilled_slots:
+                    continue  # a hedged call that finished along with the one that filled its slot
+                validity_per_perspective[perspective.code] |= check_response.check_passed
+                slot_tasks_outstanding = [slot_task for slot_task in tasks_per_slot[slot] if slot_task in outstanding_tasks]
+                if check_response.check_passed or not slot_tasks_outstanding:
+                    unfilled_slots.discard(slot)
+                    hedge_times_per_slot.pop(slot, None)
+                    for slot_task in slot_tasks_outstanding:
+                        if not slot_task.done():
+                            self.cancel_call_task(slot_task, tasks_to_call_configs, perspective_responses)
+                            pending_tasks.discard(slot_task)
+                            outstanding_tasks.discard(slot_task)
+
+            now = loop.time()
+            for slot in [slot for slot, hedge_time in hedge_times_per_slot.items() if hedge_time <= now]:
+                del hedge_times_per_slot[slot]
+                max_hedged_call_count = self.hedging_policy.max_hedged_calls_per_attempt
+                if max_hedged_call_count is not None and hedged_call_count >= max_hedged_call_count:
+                    continue
+                hedged_call_config = MpicCoordinator.build_hedged_call(tasks_per_slot[slot][0], tasks_to_call_configs,
+                                                                       spare_perspectives, retained_perspectives,
+                                                                       used_perspective_codes)
+                if hedged_call_config is None:
+                    continue
+                hedged_call_timeout_seconds = None
+                if call_timeout_seconds is not None:  # the hedge doesn't get more time than the slot has left
+                    hedged_call_timeout_seconds = call_timeout_seconds - (now - attempt_begin)
+                hedged_task = asyncio.create_task(self.observe_perspective_call(
+                    hedged_call_config.perspective.code, attempt, 1,
+                    asyncio.wait_for(self.call_remote_perspective(hedged_call_config), hedged_call_timeout_seconds)))
+                tasks_to_call_configs[hedged_task] = hedged_call_config
+                tasks_to_slots[hedged_task] = slot
+                tasks_per_slot[slot].append(hedged_task)
+                pending_tasks.add(hedged_task)
+                outstanding_tasks.add(hedged_task)
+                validity_per_perspective[hedged_call_config.perspective.code] = False
+                hedged_call_count += 1
+
+            if (unfilled_slots and self.enable_early_quorum_decision and quorum_count is not None and
+                    MpicCoordinator.is_quorum_outcome_decided(validity_per_perspective, len(unfilled_slots), quorum_count)):
+                for task in pending_tasks:
+                    self.cancel_call_task(task, tasks_to_call_configs, perspective_responses)
+                break
         return perspective_responses, validity_per_perspective
 
+    # Stops awaiting a call and reports it as cancelled.
+    @staticmethod
+    def cancel_call_task(task, tasks_to_call_configs, perspective_responses):
+        task.cancel()  # a blocking transport call keeps running in its thread, but is no longer awaited
+        perspective_responses.append(MpicCoordinator.build_error_check_response(
+            tasks_to_call_configs[task], ErrorMessages.COORDINATOR_CALL_CANCELLED))
+
+    # Returns the (event loop) time at which to hedge each call that can be hedged, keyed by slot: once the call has
+    # taken longer than the configured percentile of the perspective's recent latencies.
+    def determine_hedge_times(self, async_calls_to_issue, attempt_begin, spare_perspectives) -> dict[int, float]:
+        hedge_times_per_slot = {}
+        if self.hedging_policy is None or not spare_perspectives:
+            return hedge_times_per_slot
+        for slot, call_config in enumerate(async_calls_to_issue):
+            hedge_delay_seconds = self.perspective_latency_tracker.get_latency_percentile(
+                call_config.perspective.code, self.hedging_policy.latency_percentile,
+                self.hedging_policy.min_latency_samples)
+            if hedge_delay_seconds is not None:
+                hedge_times_per_slot[slot] = attempt_begin + hedge_delay_seconds
+        return hedge_times_per_slot
+
+    # Configures the same call as the given one for the first spare perspective that can stand in for its perspective
+    # alongside every other perspective called in the attempt and every retained one, or returns None if there is no
+    # such spare. Perspectives already called (in this attempt or, per used_perspective_codes, before) are left out.
+    @staticmethod
+    def build_hedged_call(original_task, tasks_to_call_configs, spare_perspectives, retained_perspectives=(),
+                          used_perspective_codes=frozenset()) -> RemoteCheckCallConfiguration | None:
+        original_call_config = tasks_to_call_configs[original_task]
+        other_perspectives = list(retained_perspectives) + [call_config.perspective
+                                                            for task, call_config in tasks_to_call_configs.items()
+                                                            if task is not original_task]
+        excluded_perspective_codes = {call_config.perspective.code for call_config in tasks_to_call_configs.values()}
+        excluded_perspective_codes.update(used_perspective_codes)
+        excluded_perspective_codes.update(perspective.code for perspective in retained_perspectives)
+        spare_perspective = CohortCreator.find_substitute_perspective(other_perspectives, spare_perspectives,
+                                                                      excluded_perspective_codes)
+        if spare_perspective is None:
+            return None
+        return RemoteCheckCallConfiguration(original_call_config.check_type, spare_perspective,
+                                            original_call_config.check_request,
+                                            original_call_config.serialized_check_request)
+
+    # Returns true if quorum has been reached, or if it can't be reached even if every pending call succeeds.
     @staticmethod
-    def call_remote_perspective(call_remote_perspective_function, call_config: RemoteCheckCallConfiguration):
+    def is_quorum_outcome_decided(validity_per_perspective: dict, pending_call_count: int, quorum_count: int) -> bool:
+        valid_perspective_count = sum(validity_per_perspective.values())
+        return valid_perspective_count >= quorum_count or valid_perspective_count + pending_call_count < quorum_count
+
+    # Builds the failed check response reported for a perspective the coordinator did not get a usable response from.
+    @staticmethod
+    def build_error_check_response(call_configuration: RemoteCheckCallConfiguration, error_message: ErrorMessages):
+        perspective = call_configuration.perspective
+        errors = [MpicValidationError(error_type=error_message.key, error_message=error_message.message)]
+        match call_configuration.check_type:
+            case CheckType.CAA:
+                check_error_response = CaaCheckResponse(
+                    perspective_code=perspective.code,
+                    check_passed=False,
+                    errors=errors,
+                    details=CaaCheckResponseDetails(caa_record_present=False),  # TODO Possibly should None to indicate the lookup failed.
+                    timestamp_ns=time.time_ns()
+                )
+            case CheckType.DCV:
+                dcv_check_request: DcvCheckRequest = call_configuration.check_request
+                validation_method = dcv_check_request.dcv_check_parameters.validation_details.validation_method
+                check_error_response = DcvCheckResponse(
+                    perspective_code=perspective.code,
+                    check_passed=False,
+                    errors=errors,
+                    details=DcvCheckResponseDetailsBuilder.build_response_details(validation_method),  # TODO what should go here in this case?
+                    timestamp_ns=time.time_ns()
+                )
+        return check_error_response
+
+    # Awaits a remote perspective call (including its timeout), notifying the observer when it starts and ends.
+    async def observe_perspective_call(self, perspective_code, attempt, check_count, perspective_call):
+        self.observer.on_perspective_call_started(PerspectiveCallEvent(perspective_code, attempt, check_count))
+        call_begin_ns = time.perf_counter_ns()
+        outcome = PerspectiveCallOutcome.ERROR
+        exception = None
+        try:
+            response = await perspective_call
+            if isinstance(response, list):
+                is_passed = all(check_response.check_passed for check_response in response)
+            else:
+                is_passed = response.check_passed
+            outcome = PerspectiveCallOutcome.PASSED if is_passed else PerspectiveCallOutcome.FAILED
+            return response
+        except TimeoutError:
+            outcome = PerspectiveCallOutcome.TIMED_OUT
+            raise
+        except asyncio.CancelledError:
+            outcome = PerspectiveCallOutcome.CANCELLED
+            raise
+        except Exception as e:
+            exception = e
+            raise
+        finally:
+            call_ended_event = PerspectiveCallEvent(perspective_code, attempt, check_count, outcome,
+                                                    time.perf_counter_ns() - call_begin_ns, exception)
+            self.observer.on_perspective_call_ended(call_ended_event)
+            if self.perspective_scoreboard is not None:
+                self.perspective_scoreboard.on_perspective_call_ended(call_ended_event)
+
+    async def call_remote_perspective(self, call_config: RemoteCheckCallConfiguration):
         """
-        Issues a call to a remote perspective in a separate thread. This is a blocking call.
-        :param call_remote_perspective_function: function to call with arguments in call_config
+        Issues a call to a remote perspective. Awaitable transports are awaited on the running event loop; blocking
+        transports are run in the coordinator's executor. Waits for a free in-flight call slot first, if capped.
         :param call_config: object containing arguments to pass to the remote function call
         :return:
         """
-        print(f"Started remote perspective call for perspective {call_config.perspective} at {str(datetime.now())}")
         tic = time.perf_counter()
-        response = call_remote_perspective_function(call_config.perspective, call_config.check_type, call_config.check_request)
+        response = await self.call_transport(self.call_remote_perspective_function, self.is_transport_awaitable,
+                                             call_config.perspective, call_config.check_type,
+                                             MpicCoordinator.get_check_request_to_send(call_config, self.is_transport_serialized))
         toc = time.perf_counter()
-
-        print(f"Response in region {call_config.perspective.code} took {toc - tic:0.4f} seconds to get response; \
-              ended at {str(datetime.now())}\n")
+        if self.perspective_latency_tracker is not None:
+            self.perspective_latency_tracker.record_latency(call_config.perspective.code, toc - tic)
+        if self.is_transport_serialized:
+            response = check_response_adapter.validate_json(response)
         return response
+
+    # Issues a combined call to a remote perspective; a call carrying a single check goes through the regular transport.
+    async def call_remote_perspective_batch(self, batch_call: RemoteCheckBatchCallConfiguration) -> list:
+        if self.call_remote_perspective_batch_function is None or len(batch_call.call_configurations) == 1:
+            return [await self.call_remote_perspective(batch_call.call_configurations[0])]
+
+        check_calls = [(call_configuration.check_type,
+                        MpicCoordinator.get_check_request_to_send(call_configuration, self.is_transport_serialized))
+                       for call_configuration in batch_call.call_configurations]
+        responses = await self.call_transport(self.call_remote_perspective_batch_function, self.is_batch_transport_awaitable,
+                                              batch_call.perspective, check_calls)
+        if self.is_transport_serialized:
+            responses = [check_response_adapter.validate_json(response) for response in responses]
+        return responses
+
+    @staticmethod
+    def get_check_request_to_send(call_config: RemoteCheckCallConfiguration, is_transport_serialized):
+        return call_config.serialized_check_request if is_transport_serialized else call_config.check_request
+
+    # Calls a transport function once an in-flight call slot is free: awaitable ones on the running event loop, blocking
+    # ones in the executor. For the latter, the slot is held until the thread is done, even if the coordinator stops
+    # waiting for it (e.g., on timeout).
+    async def call_transport(self, transport_function, is_transport_function_awaitable, *args):
+        await self.acquire_in_flight_call_slot()
+        if is_transport_function_awaitable:
+            try:
+                return await transport_function(*args)
+            finally:
+                self.release_in_flight_call_slot()
+        try:
+            future = self.executor.submit(transport_function, *args)
+        except Exception:
+            self.release_in_flight_call_slot()
+            raise
+        future.add_done_callback(lambda _: self.release_in_flight_call_slot())
+        return await asyncio.wrap_future(future)
+
+    # Waits (without blocking the event loop) until fewer than max_in_flight_calls calls are in flight.
+    async def acquire_in_flight_call_slot(self):
+        if self.in_flight_call_limiter is not None:
+            await self.in_flight_call_limiter.acquire()
+
+    def release_in_flight_call_slot(self):
+        if self.in_flight_call_limiter is not None:
+            self.in_flight_call_limiter.release()
+
+    # Runs the coroutine function to completion on a private event loop: in this thread, unless it is already running an
+    # event loop (asyncio.run() can't be nested), in which case in a short-lived thread of its own.
+    @staticmethod
+    def run_to_completion(coroutine_function, *args):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine_function(*args))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='mpic-coordinator-sync') as executor:
+            return executor.submit(lambda: asyncio.run(coroutine_function(*args))).result()
+
+    # Returns true if the transport has to be awaited, including callable objects with an async __call__ method.
+    @staticmethod
+    def is_awaitable_transport(call_remote_perspective_function) -> bool:
+        return (inspect.iscoroutinefunction(call_remote_perspective_function) or
+                inspect.iscoroutinefunction(getattr(call_remote_perspective_function, '__call__', None)))
+
+
+# Where one request of a coordinate_mpic_batch call stands; request_deadline is in event loop time.
+class BatchedMpicRequestState:
+    def __init__(self, request_index, mpic_request, perspective_count, quorum_count, max_attempts,
+                 perspective_call_timeout_seconds, request_deadline, cohort_cycle):
+        self.request_index = request_index
+        self.mpic_request = mpic_request
+        self.perspective_count = perspective_count
+        self.quorum_count = quorum_count
+        self.max_attempts = max_attempts
+        self.perspective_call_timeout_seconds = perspective_call_timeout_seconds
+        self.request_deadline = request_deadline
+        self.cohort_cycle = cohort_cycle
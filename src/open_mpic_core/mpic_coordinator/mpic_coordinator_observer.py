@@ -0,0 +1,12 @@
+from open_mpic_core.mpic_coordinator.domain.perspective_call_event import PerspectiveCallEvent
+
+
+# Receives structured events about the remote perspective calls an MpicCoordinator makes, e.g., to feed metrics or logs.
+# This base class ignores them; override the methods of interest. They are called on the coordinator's event loop, so
+# they should return quickly and must not raise.
+class MpicCoordinatorObserver:
+    def on_perspective_call_started(self, event: PerspectiveCallEvent):
+        pass
+
+    def on_perspective_call_ended(self, event: PerspectiveCallEvent):
+        pass
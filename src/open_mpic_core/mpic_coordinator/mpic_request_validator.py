@@ -22,6 +22,12 @@ class MpicRequestValidator:
             if should_validate_quorum_count and mpic_request.orchestration_parameters.quorum_count is not None:
                 quorum_count = mpic_request.orchestration_parameters.quorum_count
                 MpicRequestValidator.validate_quorum_count(requested_perspective_count, quorum_count, request_validation_issues)
+            perspective_call_timeout_seconds = mpic_request.orchestration_parameters.perspective_call_timeout_seconds
+            if perspective_call_timeout_seconds is not None and not MpicRequestValidator.is_timeout_valid(perspective_call_timeout_seconds):
+                request_validation_issues.append(MpicRequestValidationIssue(MpicRequestValidationMessages.INVALID_PERSPECTIVE_CALL_TIMEOUT, perspective_call_timeout_seconds))
+            request_deadline_seconds = mpic_request.orchestration_parameters.request_deadline_seconds
+            if request_deadline_seconds is not None and not MpicRequestValidator.is_timeout_valid(request_deadline_seconds):
+                request_validation_issues.append(MpicRequestValidationIssue(MpicRequestValidationMessages.INVALID_REQUEST_DEADLINE, request_deadline_seconds))
 
         # returns true if no validation issues found, false otherwise; includes list of validation issues found
         return len(request_validation_issues) == 0, request_validation_issues
@@ -31,6 +37,11 @@ class MpicRequestValidator:
         # check if requested_perspective_count is an integer, at least 2, and at most the number of known_perspectives
         return isinstance(requested_perspective_count, int) and 2 <= requested_perspective_count <= len(target_perspectives)
 
+    @staticmethod
+    def is_timeout_valid(timeout_seconds) -> bool:
+        # check if timeout_seconds is a positive number of seconds (bool is an int subclass, so rule it out explicitly)
+        return isinstance(timeout_seconds, (int, float)) and not isinstance(timeout_seconds, bool) and timeout_seconds > 0
+
     @staticmethod
     def validate_quorum_count(requested_perspective_count, quorum_count, request_validation_issues) -> None:
         # quorum_count can be no less than perspectives-1 if perspectives <= 5
@@ -6,11 +6,12 @@ from open_mpic_core.mpic_coordinator.domain.mpic_response import MpicCaaResponse
 class MpicResponseBuilder:
     @staticmethod
     def build_response(request: BaseMpicRequest, perspective_count, quorum_count, attempts,
-                       perspective_responses, is_result_valid) -> MpicResponse:
+                       perspective_responses, is_result_valid, retained_perspective_codes=None) -> MpicResponse:
         actual_orchestration_parameters = MpicEffectiveOrchestrationParameters(
             perspective_count=perspective_count,
             quorum_count=quorum_count,
-            attempt_count=attempts
+            attempt_count=attempts,
+            retained_perspective_codes=retained_perspective_codes
         )
 
         if type(request) is MpicDcvRequest:  # type() instead of isinstance() because of inheritance
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import random
+from functools import cached_property
+from types import MappingProxyType
+
+from open_mpic_core.common_domain.remote_perspective import RemotePerspective
+
+
+# An indexed set of perspectives: each perspective gets a small integer index (by code order), and the "too close"
+# relations are precomputed as bitmasks over those indices, so checking a perspective against a whole group of them
+# (e.g., a cohort) takes a single bitwise AND.
+# Bit j of too_close_masks[i] is set if perspective i considers perspective j too close (as is_perspective_too_close
+# does, the relation is taken as listed, in one direction). Codes listed as too close that aren't in the catalog are
+# ignored.
+# A catalog is immutable once built, so it can be shared by concurrent requests; per-request work (like shuffling) is
+# done on lists of indices into it.
+class PerspectiveCatalog:
+    def __init__(self, perspectives: list[RemotePerspective]):
+        set_attribute = super().__setattr__
+        set_attribute('perspectives', tuple(sorted(perspectives, key=lambda perspective: perspective.code)))
+        set_attribute('index_per_code', MappingProxyType(
+            {perspective.code: index for index, perspective in enumerate(self.perspectives)}))
+        too_close_masks = []
+        for perspective in self.perspectives:
+            too_close_mask = 0
+            for too_close_code in perspective.too_close_codes or ():
+                too_close_index = self.index_per_code.get(too_close_code)
+                if too_close_index is not None:
+                    too_close_mask |= 1 << too_close_index
+            too_close_masks.append(too_close_mask)
+        set_attribute('too_close_masks', tuple(too_close_masks))
+        set_attribute('weights', tuple(1.0 if perspective.weight is None else perspective.weight
+                                       for perspective in self.perspectives))
+        set_attribute('is_weighted', len(set(self.weights)) > 1)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    # Identifies the catalog's content, e.g., for cohorts persisted outside the process (same perspectives, same
+    # version). Computed on first use, since most catalogs never need it.
+    @cached_property
+    def version(self) -> str:
+        perspective_dicts = [perspective.model_dump() for perspective in self.perspectives]
+        return hashlib.sha256(json.dumps(perspective_dicts, sort_keys=True).encode()).hexdigest()
+
+    # Shuffles the perspectives with the given seed (exactly as shuffling the code-sorted list of them would) and groups
+    # them by RIR, keeping the shuffled order.
+    # If the perspectives differ in weight, the shuffle is weighted instead (Efraimidis-Spirakis: each perspective gets
+    # the key u^(1/weight) for a seeded random u in [0, 1), and keys are sorted in descending order), so perspectives
+    # with more weight tend to come first and end up in the first cohorts, in proportion to their weight.
+    def build_randomly_shuffled_perspectives_per_rir(self, random_seed: bytes) -> dict[str, list[RemotePerspective]]:
+        local_random = random.Random(random_seed)
+        if self.is_weighted:
+            keys = [local_random.random() ** (1 / weight) for weight in self.weights]
+            shuffled_indices = sorted(range(len(self.perspectives)), key=lambda index: keys[index], reverse=True)
+        else:
+            shuffled_indices = list(range(len(self.perspectives)))
+            local_random.shuffle(shuffled_indices)
+        perspectives_per_rir = {}
+        for index in shuffled_indices:
+            perspective = self.perspectives[index]
+            if perspective.rir not in perspectives_per_rir:
+                perspectives_per_rir[perspective.rir] = []
+            perspectives_per_rir[perspective.rir].append(perspective)
+        return perspectives_per_rir
+
+    def get_index(self, perspective: RemotePerspective) -> int:
+        return self.index_per_code[perspective.code]
+
+    # Returns the bitmask of the given perspectives' indices.
+    def build_mask(self, perspectives) -> int:
+        mask = 0
+        for perspective in perspectives:
+            mask |= 1 << self.index_per_code[perspective.code]
+        return mask
+
+    def __len__(self):
+        return len(self.perspectives)
@@ -0,0 +1,28 @@
+import math
+import threading
+from collections import deque
+
+
+# Keeps the most recent call latencies (in seconds) per perspective. Safe to share across threads.
+class PerspectiveLatencyTracker:
+    def __init__(self, window_size=100):
+        self.window_size = window_size
+        self.latencies_per_perspective: dict[str, deque] = {}
+        self.lock = threading.Lock()
+
+    def record_latency(self, perspective_code: str, latency_seconds: float):
+        with self.lock:
+            if perspective_code not in self.latencies_per_perspective:
+                self.latencies_per_perspective[perspective_code] = deque(maxlen=self.window_size)
+            self.latencies_per_perspective[perspective_code].append(latency_seconds)
+
+    # Returns the given percentile (0-100, nearest-rank) of the perspective's recent latencies, or None if fewer than
+    # min_sample_count latencies were recorded for it.
+    def get_latency_percentile(self, perspective_code: str, percentile: float, min_sample_count=1) -> float | None:
+        with self.lock:
+            latencies = list(self.latencies_per_perspective.get(perspective_code, ()))
+        if len(latencies) == 0 or len(latencies) < min_sample_count:
+            return None
+        latencies.sort()
+        rank = max(1, math.ceil(percentile / 100 * len(latencies)))
+        return latencies[rank - 1]
@@ -0,0 +1,80 @@
+import threading
+import time
+
+from open_mpic_core.common_domain.enum.perspective_call_outcome import PerspectiveCallOutcome
+from open_mpic_core.mpic_coordinator.domain.perspective_call_event import PerspectiveCallEvent
+from open_mpic_core.mpic_coordinator.mpic_coordinator_observer import MpicCoordinatorObserver
+
+
+# Keeps track of how healthy each perspective is, as exponentially weighted moving averages (EWMA) of its call success
+# rate and latency. A call succeeds if the perspective responds (whether or not the check passes); errors and timeouts
+# count as failures, and cancelled calls are ignored. Fed by the coordinator's call events; safe to share across threads.
+# smoothing_factor: weight of the latest call in the averages (0-1).
+# min_success_rate: perspectives with a lower success rate are unhealthy...
+# min_call_count: ...once they have had at least this many calls (until then, they count as healthy).
+# recovery_half_life_seconds: the averages only move on calls, and an unhealthy perspective gets few (if any), so its
+# failure rate (1 - success rate) also halves every this many seconds without calls; a demoted perspective thus counts
+# as healthy again after a while, and is back in the cohorts to prove it.
+class PerspectiveScoreboard(MpicCoordinatorObserver):
+    def __init__(self, smoothing_factor=0.2, min_success_rate=0.5, min_call_count=5, recovery_half_life_seconds=60,
+                 clock=time.monotonic):
+        self.smoothing_factor = smoothing_factor
+        self.min_success_rate = min_success_rate
+        self.min_call_count = min_call_count
+        self.recovery_half_life_seconds = recovery_half_life_seconds
+        self.clock = clock
+        self.success_rate_per_perspective = {}  # as of the perspective's last call
+        self.last_call_time_per_perspective = {}
+        self.latency_seconds_per_perspective = {}
+        self.call_count_per_perspective = {}
+        self.lock = threading.Lock()
+
+    def on_perspective_call_ended(self, event: PerspectiveCallEvent):
+        if event.outcome == PerspectiveCallOutcome.CANCELLED:
+            return
+        is_success = event.outcome in (PerspectiveCallOutcome.PASSED, PerspectiveCallOutcome.FAILED)
+        latency_seconds = event.latency_ns / 1e9 if is_success and event.latency_ns is not None else None
+        self.record_call(event.perspective_code, is_success, latency_seconds)
+
+    def record_call(self, perspective_code: str, is_success: bool, latency_seconds: float | None = None):
+        with self.lock:
+            now = self.clock()
+            self.call_count_per_perspective[perspective_code] = self.call_count_per_perspective.get(perspective_code, 0) + 1
+            if perspective_code in self.success_rate_per_perspective:
+                self.success_rate_per_perspective[perspective_code] = self.get_success_rate(perspective_code, now)
+            self.last_call_time_per_perspective[perspective_code] = now
+            self.update_average(self.success_rate_per_perspective, perspective_code, 1.0 if is_success else 0.0)
+            if latency_seconds is not None:
+                self.update_average(self.latency_seconds_per_perspective, perspective_code, latency_seconds)
+
+    def update_average(self, averages: dict, perspective_code: str, value: float):
+        average = averages.get(perspective_code)
+        averages[perspective_code] = value if average is None else average + self.smoothing_factor * (value - average)
+
+    # The success rate as of now: the one as of the last call, with the failure rate decayed since then.
+    def get_success_rate(self, perspective_code: str, now: float) -> float:
+        idle_seconds = max(0.0, now - self.last_call_time_per_perspective[perspective_code])
+        failure_rate = 1.0 - self.success_rate_per_perspective[perspective_code]
+        return 1.0 - failure_rate * 0.5 ** (idle_seconds / self.recovery_half_life_seconds)
+
+    def is_healthy(self, perspective_code: str) -> bool:
+        with self.lock:
+            return (self.call_count_per_perspective.get(perspective_code, 0) < self.min_call_count or
+                    self.get_success_rate(perspective_code, self.clock()) >= self.min_success_rate)
+
+    def get_unhealthy_perspective_codes(self) -> frozenset[str]:
+        with self.lock:
+            now = self.clock()
+            return frozenset(perspective_code for perspective_code, call_count in self.call_count_per_perspective.items()
+                             if call_count >= self.min_call_count and
+                             self.get_success_rate(perspective_code, now) < self.min_success_rate)
+
+    # Returns the perspective's average latency in seconds (of successful calls), or None if it has none yet.
+    def get_latency_estimate(self, perspective_code: str) -> float | None:
+        with self.lock:
+            return self.latency_seconds_per_perspective.get(perspective_code)
+
+    # Returns the average latencies in seconds of all perspectives that have one, keyed by perspective code.
+    def get_latency_estimates(self) -> dict[str, float]:
+        with self.lock:
+            return dict(self.latency_seconds_per_perspective)
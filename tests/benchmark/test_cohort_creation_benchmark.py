@@ -0,0 +1,213 @@
+import json
+import os
+import random
+import statistics
+import time
+import tracemalloc
+import warnings
+from importlib import resources
+
+import pytest
+
+from open_mpic_core.common_domain.remote_perspective import RemotePerspective
+from open_mpic_core.mpic_coordinator.cohort_creator import CohortCreator
+from open_mpic_core.mpic_coordinator.mpic_coordinator import MpicCoordinator, MpicCoordinatorConfiguration
+from open_mpic_core.mpic_coordinator.perspective_catalog import PerspectiveCatalog
+
+# Benchmarks cohort creation over synthetic perspective catalogs, and fails on regressions against the stored baseline
+# (tests/resources/cohort_creation_benchmark_baseline.json). Run with `hatch run test:benchmark`.
+# Times are stored relative to a fixed calibration workload, so that the baseline carries over between machines: each
+# timing round times the calibration workload right before the scenario, and the median of the rounds' ratios counts,
+# so that load changes during a run affect both sides alike. Allocations (peak traced bytes per call) are stored as is;
+# they are deterministic, so their threshold is tight and always enforced. Timing stays at the mercy of other load on
+# the machine, so a time regression is only reported (as a warning) unless MPIC_ENFORCE_BENCHMARK_TIME=1, e.g., on a
+# quiet dedicated machine; even then, the threshold only catches clear slowdowns.
+# To record a new baseline (e.g., after an intended change), run with MPIC_UPDATE_BENCHMARK_BASELINE=1.
+BASELINE_FILE_NAME = 'cohort_creation_benchmark_baseline.json'
+UPDATE_BASELINE_ENV_VAR = 'MPIC_UPDATE_BENCHMARK_BASELINE'
+ENFORCE_TIME_ENV_VAR = 'MPIC_ENFORCE_BENCHMARK_TIME'
+MAX_TIME_RATIO_TO_BASELINE = 2.5  # timing is noisy even so, so only a clear slowdown counts as a regression
+MAX_ALLOCATION_RATIO_TO_BASELINE = 1.1
+MIN_TIMED_SECONDS = 0.01  # per round, for each of the scenario and the calibration workload
+TIMING_ROUNDS = 9
+
+# (perspective count, RIR count, too-close density, cohort size); density is the chance of any two perspectives in the
+# same RIR being too close to each other
+SCENARIOS = [
+    (perspective_count, rir_count, too_close_density, cohort_size)
+    for perspective_count in (6, 100, 1000)
+    for rir_count in (2, 5)
+    for too_close_density in (0.0, 0.2)
+    for cohort_size in (2, 6)
+    if rir_count <= perspective_count and cohort_size <= perspective_count
+]
+
+
+# A fixed mix of the kind of work cohort creation does (list, dict and set operations on small objects).
+def calibration_workload():
+    local_random = random.Random(0)
+    items = list(range(2000))
+    local_random.shuffle(items)
+    groups = {}
+    for item in items:
+        groups.setdefault(item % 7, []).append(item)
+    return sorted(sum(1 for item in group if item & 1) for group in groups.values())
+
+
+def scenario_id(scenario):
+    perspective_count, rir_count, too_close_density, cohort_size = scenario
+    return f'{perspective_count}p-{rir_count}rir-{too_close_density}close-{cohort_size}size'
+
+
+class BenchmarkTimeWarning(UserWarning):
+    pass
+
+
+# noinspection PyMethodMayBeStatic
+@pytest.mark.benchmark
+class TestCohortCreationBenchmark:
+    synthetic_perspectives = {}
+    measurements = {}
+
+    @classmethod
+    def setup_class(cls):
+        cls.is_baseline_update = os.environ.get(UPDATE_BASELINE_ENV_VAR) == '1'
+        cls.is_time_enforced = os.environ.get(ENFORCE_TIME_ENV_VAR) == '1'
+        cls.baseline = TestCohortCreationBenchmark.load_baseline()
+
+    @classmethod
+    def teardown_class(cls):
+        if cls.is_baseline_update:
+            baseline = dict(cls.baseline)
+            baseline.update(cls.measurements)
+            with open(TestCohortCreationBenchmark.get_baseline_path(), 'w') as baseline_file:
+                json.dump(dict(sorted(baseline.items())), baseline_file, indent=2)
+                baseline_file.write('\n')
+
+    @pytest.mark.parametrize('scenario', SCENARIOS, ids=scenario_id)
+    def create_perspective_cohorts__should_not_regress_against_baseline(self, scenario):
+        perspective_count, rir_count, too_close_density, cohort_size = scenario
+        perspectives = self.get_synthetic_perspectives(perspective_count, rir_count, too_close_density)
+        perspective_catalog = PerspectiveCatalog(perspectives)
+        perspectives_per_rir = perspective_catalog.build_randomly_shuffled_perspectives_per_rir(b'benchmarkSeed')
+        self.measure_and_compare(f'create_perspective_cohorts:{scenario_id(scenario)}',
+                                 lambda: CohortCreator.create_perspective_cohorts(perspectives_per_rir, cohort_size,
+                                                                                  perspective_catalog))
+
+    @pytest.mark.parametrize('scenario', SCENARIOS, ids=scenario_id)
+    def create_cohorts_of_randomly_selected_perspectives__should_not_regress_against_baseline(self, scenario):
+        perspective_count, rir_count, too_close_density, cohort_size = scenario
+        perspectives = self.get_synthetic_perspectives(perspective_count, rir_count, too_close_density)
+        mpic_coordinator = MpicCoordinator(lambda *args: None, MpicCoordinatorConfiguration(
+            perspectives, cohort_size, True, None, 'benchmark_secret'))
+        try:
+            self.measure_and_compare(
+                f'create_cohorts_of_randomly_selected_perspectives:{scenario_id(scenario)}',
+                lambda: mpic_coordinator.create_cohorts_of_randomly_selected_perspectives(
+                    mpic_coordinator.perspective_catalog, cohort_size, 'benchmark.example.com'))
+        finally:
+            mpic_coordinator.shutdown()
+
+    def measure_and_compare(self, benchmark_name, function_to_measure):
+        measurement = {
+            'relative_time_per_call': round(TestCohortCreationBenchmark.relative_time_per_call(function_to_measure), 4),
+            'allocated_bytes_per_call': self.allocated_bytes_per_call(function_to_measure)
+        }
+        TestCohortCreationBenchmark.measurements[benchmark_name] = measurement
+        if self.is_baseline_update:
+            return
+        baseline_measurement = self.baseline.get(benchmark_name)
+        assert baseline_measurement is not None, \
+            f"No baseline for {benchmark_name}; run with {UPDATE_BASELINE_ENV_VAR}=1 to record one"
+        time_ratio = measurement['relative_time_per_call'] / baseline_measurement['relative_time_per_call']
+        allocation_ratio = measurement['allocated_bytes_per_call'] / max(baseline_measurement['allocated_bytes_per_call'], 1)
+        time_regression_message = \
+            f"{benchmark_name} took {time_ratio:.2f}x its baseline time ({measurement} vs. {baseline_measurement})"
+        if self.is_time_enforced:
+            assert time_ratio <= MAX_TIME_RATIO_TO_BASELINE, time_regression_message
+        elif time_ratio > MAX_TIME_RATIO_TO_BASELINE:
+            warnings.warn(BenchmarkTimeWarning(time_regression_message))
+        assert allocation_ratio <= MAX_ALLOCATION_RATIO_TO_BASELINE, \
+            f"{benchmark_name} allocated {allocation_ratio:.2f}x its baseline ({measurement} vs. {baseline_measurement})"
+
+    # Returns the median, over the timing rounds, of the function's time per call relative to the calibration workload's
+    # time per call, both timed within the round.
+    @staticmethod
+    def relative_time_per_call(function_to_measure) -> float:
+        calibration_call_count = TestCohortCreationBenchmark.determine_call_count(calibration_workload)
+        call_count = TestCohortCreationBenchmark.determine_call_count(function_to_measure)
+        relative_times = []
+        for _ in range(TIMING_ROUNDS):
+            calibration_seconds = TestCohortCreationBenchmark.time_per_call(calibration_workload, calibration_call_count)
+            relative_times.append(TestCohortCreationBenchmark.time_per_call(function_to_measure, call_count) /
+                                  calibration_seconds)
+        return statistics.median(relative_times)
+
+    # Returns how many calls (a power of 2) take long enough to time reliably; also warms the function up.
+    @staticmethod
+    def determine_call_count(function_to_measure) -> int:
+        call_count = 1
+        while TestCohortCreationBenchmark.time_per_call(function_to_measure, call_count) * call_count < MIN_TIMED_SECONDS:
+            call_count *= 2
+        return call_count
+
+    @staticmethod
+    def time_per_call(function_to_measure, call_count) -> float:
+        started = time.perf_counter()
+        for _ in range(call_count):
+            function_to_measure()
+        return (time.perf_counter() - started) / call_count
+
+    @staticmethod
+    def allocated_bytes_per_call(function_to_measure) -> int:
+        function_to_measure()  # warm up (lazy imports, caches) outside of the trace
+        tracemalloc.start()
+        try:
+            traced_before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            function_to_measure()
+            _, traced_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return traced_peak - traced_before
+
+    @classmethod
+    def get_synthetic_perspectives(cls, perspective_count, rir_count, too_close_density) -> list[RemotePerspective]:
+        key = (perspective_count, rir_count, too_close_density)
+        if key not in cls.synthetic_perspectives:
+            cls.synthetic_perspectives[key] = TestCohortCreationBenchmark.create_synthetic_perspectives(*key)
+        return cls.synthetic_perspectives[key]
+
+    # Perspectives spread evenly over the RIRs, with symmetric too-close relations between random pairs in the same RIR.
+    @staticmethod
+    def create_synthetic_perspectives(perspective_count, rir_count, too_close_density) -> list[RemotePerspective]:
+        local_random = random.Random(f'{perspective_count}-{rir_count}-{too_close_density}')
+        codes_per_rir = {f'rir{rir_number}': [] for rir_number in range(rir_count)}
+        for perspective_number in range(perspective_count):
+            codes_per_rir[f'rir{perspective_number % rir_count}'].append(f'region-{perspective_number:04d}')
+        too_close_codes_per_code = {}
+        for codes in codes_per_rir.values():
+            for first_index, first_code in enumerate(codes):
+                too_close_codes_per_code.setdefault(first_code, [])
+                for second_code in codes[first_index + 1:]:
+                    if local_random.random() < too_close_density:
+                        too_close_codes_per_code[first_code].append(second_code)
+                        too_close_codes_per_code.setdefault(second_code, []).append(first_code)
+        return [RemotePerspective(rir=rir, code=code, too_close_codes=too_close_codes_per_code[code])
+                for rir, codes in codes_per_rir.items() for code in codes]
+
+    @staticmethod
+    def get_baseline_path():
+        return str(resources.files('tests.resources').joinpath(BASELINE_FILE_NAME))
+
+    @staticmethod
+    def load_baseline() -> dict:
+        baseline_path = TestCohortCreationBenchmark.get_baseline_path()
+        if not os.path.exists(baseline_path):
+            return {}
+        with open(baseline_path) as baseline_file:
+            return json.load(baseline_file)
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,115 @@
+import dns.message
+import dns.name
+import dns.rdata
+import dns.rdataclass
+import dns.rdatatype
+import dns.resolver
+import dns.rrset
+import pytest
+
+from open_mpic_core.mpic_caa_checker.caa_lookup_cache import CaaLookupCache
+
+
+# noinspection PyMethodMayBeStatic
+class TestCaaLookupCache:
+    def get__should_return_stored_rrset_until_its_ttl_expires(self):
+        clock = FakeClock()
+        caa_lookup_cache = CaaLookupCache(max_size=10, clock=clock)
+        answer = self.create_caa_answer(ttl=300)
+        caa_lookup_cache.store_answer(dns.name.from_text('example.com'), answer)
+        assert caa_lookup_cache.get(dns.name.from_text('EXAMPLE.com')) == (True, answer.rrset)
+        clock.now += 300
+        assert caa_lookup_cache.get(dns.name.from_text('example.com')) == (False, None)
+        assert (caa_lookup_cache.hit_count, caa_lookup_cache.miss_count) == (1, 1)
+        assert len(caa_lookup_cache) == 0
+
+    def store_answer__should_expire_entry_with_shortest_ttl_along_cname_chain(self):
+        clock = FakeClock()
+        caa_lookup_cache = CaaLookupCache(max_size=10, clock=clock)
+        caa_lookup_cache.store_answer(dns.name.from_text('example.com'), self.create_caa_answer(ttl=3600, cname_ttl=60))
+        clock.now += 59
+        assert caa_lookup_cache.get(dns.name.from_text('example.com'))[0] is True
+        clock.now += 1
+        assert caa_lookup_cache.get(dns.name.from_text('example.com'))[0] is False
+
+    def store__should_cap_ttl_at_max_ttl(self):
+        clock = FakeClock()
+        caa_lookup_cache = CaaLookupCache(max_size=10, clock=clock)
+        caa_lookup_cache.store_answer(dns.name.from_text('example.com'), self.create_caa_answer(ttl=86400))
+        clock.now += CaaLookupCache.DEFAULT_MAX_TTL_SECONDS - 1
+        assert caa_lookup_cache.get(dns.name.from_text('example.com'))[0] is True
+        clock.now += 1
+        assert caa_lookup_cache.get(dns.name.from_text('example.com'))[0] is False
+
+    def store__should_not_cache_zero_ttl(self):
+        caa_lookup_cache = CaaLookupCache(max_size=10)
+        caa_lookup_cache.store_answer(dns.name.from_text('example.com'), self.create_caa_answer(ttl=0))
+        assert len(caa_lookup_cache) == 0
+
+    def store__should_evict_least_recently_used_name_given_full_cache(self):
+        caa_lookup_cache = CaaLookupCache(max_size=2)
+        for label in ['a', 'b']:
+            caa_lookup_cache.store_answer(dns.name.from_text(f'{label}.example.com'), self.create_caa_answer(ttl=60))
+        caa_lookup_cache.get(dns.name.from_text('a.example.com'))
+        caa_lookup_cache.store_answer(dns.name.from_text('c.example.com'), self.create_caa_answer(ttl=60))
+        assert caa_lookup_cache.get(dns.name.from_text('b.example.com'))[0] is False
+        assert caa_lookup_cache.get(dns.name.from_text('a.example.com'))[0] is True
+        assert caa_lookup_cache.eviction_count == 1
+
+    @pytest.mark.parametrize('soa_ttl, expected_negative_ttl', [(3600, 300), (120, 120)])
+    def store_negative_answer__should_use_soa_negative_ttl_given_no_answer(self, soa_ttl, expected_negative_ttl):
+        clock = FakeClock()
+        caa_lookup_cache = CaaLookupCache(max_size=10, clock=clock)
+        domain = dns.name.from_text('example.com')
+        caa_lookup_cache.store_negative_answer(domain, dns.resolver.NoAnswer(response=self.create_negative_response(soa_ttl)))
+        assert caa_lookup_cache.get(domain) == (True, None)
+        clock.now += expected_negative_ttl
+        assert caa_lookup_cache.get(domain) == (False, None)
+
+    def store_negative_answer__should_use_soa_negative_ttl_given_nxdomain(self):
+        domain = dns.name.from_text('example.com')
+        exception = dns.resolver.NXDOMAIN(qnames=[domain], responses={domain: self.create_negative_response(3600)})
+        assert CaaLookupCache.determine_negative_ttl(exception) == 300
+
+    @pytest.mark.parametrize('default_negative_ttl_seconds, expected_entry_count', [(0, 0), (60, 1)])
+    def store_negative_answer__should_use_default_negative_ttl_given_no_soa(self, default_negative_ttl_seconds,
+                                                                           expected_entry_count):
+        caa_lookup_cache = CaaLookupCache(max_size=10, default_negative_ttl_seconds=default_negative_ttl_seconds)
+        caa_lookup_cache.store_negative_answer(dns.name.from_text('example.com'), dns.resolver.NXDOMAIN())
+        assert len(caa_lookup_cache) == expected_entry_count
+
+    # An answer for example.com, optionally as an alias (with a CNAME record of the given TTL) of caa.example.net.
+    @staticmethod
+    def create_caa_answer(ttl, cname_ttl=None):
+        qname = dns.name.from_text('example.com')
+        response = dns.message.make_response(dns.message.make_query(qname, 'CAA'))
+        caa_name = qname
+        if cname_ttl is not None:
+            caa_name = dns.name.from_text('caa.example.net')
+            TestCaaLookupCache.add_answer_record(response, qname, cname_ttl, 'CNAME', caa_name.to_text())
+        TestCaaLookupCache.add_answer_record(response, caa_name, ttl, 'CAA', '0 issue "ca1.org"')
+        return dns.resolver.Answer(qname, dns.rdatatype.CAA, dns.rdataclass.IN, response)
+
+    @staticmethod
+    def add_answer_record(response, name, ttl, rdtype, rdata_text):
+        rrset = response.find_rrset(response.answer, name, dns.rdataclass.IN, dns.rdatatype.from_text(rdtype), create=True)
+        rrset.add(dns.rdata.from_text(dns.rdataclass.IN, rdtype, rdata_text), ttl)
+
+    @staticmethod
+    def create_negative_response(soa_ttl):
+        response = dns.message.make_response(dns.message.make_query('example.com', 'CAA'))
+        response.authority.append(dns.rrset.from_text('example.com.', soa_ttl, 'IN', 'SOA',
+                                                      'ns1.example.com. hostmaster.example.com. 1 7200 3600 1209600 300'))
+        return response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,50 @@
+import pytest
+
+from open_mpic_core.mpic_coordinator.cohort_cache import CohortCache
+
+
+# noinspection PyMethodMayBeStatic
+class TestCohortCache:
+    def get_cohorts__should_create_cohorts_once_and_count_hits_and_misses(self):
+        cohort_cache = CohortCache(max_size=10)
+        created_cohorts = []
+
+        def create_cohorts():
+            created_cohorts.append([['p1', 'p2']])
+            return created_cohorts[-1]
+
+        first_cohorts = cohort_cache.get_cohorts('example.com', 2, create_cohorts)
+        second_cohorts = cohort_cache.get_cohorts('EXAMPLE.com', 2, create_cohorts)
+        assert first_cohorts is second_cohorts
+        assert len(created_cohorts) == 1
+        assert cohort_cache.hit_count == 1
+        assert cohort_cache.miss_count == 1
+
+    def get_cohorts__should_cache_cohorts_per_perspective_count(self):
+        cohort_cache = CohortCache(max_size=10)
+        cohort_cache.get_cohorts('example.com', 2, lambda: [['p1', 'p2']])
+        cohorts = cohort_cache.get_cohorts('example.com', 3, lambda: [['p1', 'p2', 'p3']])
+        assert cohorts == [['p1', 'p2', 'p3']]
+        assert cohort_cache.miss_count == 2
+
+    def get_cohorts__should_evict_least_recently_used_target_given_full_cache(self):
+        cohort_cache = CohortCache(max_size=2)
+        cohort_cache.get_cohorts('a.example.com', 2, lambda: [['a']])
+        cohort_cache.get_cohorts('b.example.com', 2, lambda: [['b']])
+        cohort_cache.get_cohorts('a.example.com', 2, lambda: [['not used']])  # a is now the most recently used
+        cohort_cache.get_cohorts('c.example.com', 2, lambda: [['c']])
+        assert len(cohort_cache) == 2
+        assert cohort_cache.eviction_count == 1
+        assert cohort_cache.get_cohorts('a.example.com', 2, lambda: [['a again']]) == [['a']]
+        assert cohort_cache.get_cohorts('b.example.com', 2, lambda: [['b again']]) == [['b again']]
+
+    def invalidate__should_drop_cached_cohorts(self):
+        cohort_cache = CohortCache(max_size=10)
+        cohort_cache.get_cohorts('example.com', 2, lambda: [['old']])
+        cohort_cache.invalidate()
+        assert len(cohort_cache) == 0
+        assert cohort_cache.get_cohorts('example.com', 2, lambda: [['new']]) == [['new']]
+
+
+if __name__ == '__main__':
+    pytest.main()
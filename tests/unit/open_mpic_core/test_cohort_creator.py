@@ -1,3 +1,5 @@
+import concurrent.futures
+import copy
 import hashlib
 from importlib import resources
 from itertools import chain, cycle
@@ -8,7 +10,9 @@ import yaml
 from pydantic import TypeAdapter
 
 from open_mpic_core.mpic_coordinator.cohort_creator import CohortCreator
+from open_mpic_core.mpic_coordinator.perspective_catalog import PerspectiveCatalog
 from open_mpic_core.common_domain.remote_perspective import RemotePerspective
+from unit.test_util.reference_cohort_creator import ReferenceCohortCreator
 
 
 # noinspection PyMethodMayBeStatic
@@ -46,6 +50,12 @@ class TestCohortCreator:
                        for i in range(len(shuffled_perspectives_per_rir_1[rir])))
         assert any(shuffled_perspectives_per_rir_1[rir] != shuffled_perspectives_per_rir_3[rir] for rir in shuffled_perspectives_per_rir_1.keys())
 
+    def build_randomly_shuffled_available_perspectives_per_rir__should_not_reorder_given_list_of_perspectives(self):
+        perspectives = list(reversed(self.all_perspectives))
+        original_order = list(perspectives)
+        CohortCreator.build_randomly_shuffled_available_perspectives_per_rir(perspectives, b'testSeed')
+        assert perspectives == original_order
+
     def build_randomly_shuffled_available_perspectives_per_rir__should_return_empty_dict_given_empty_list_of_perspectives(self):
         shuffled_perspectives_per_rir = CohortCreator.build_randomly_shuffled_available_perspectives_per_rir([], b'testSeed')
         assert len(shuffled_perspectives_per_rir.keys()) == 0
@@ -121,6 +131,155 @@ class TestCohortCreator:
         cohorts = CohortCreator.create_perspective_cohorts(perspectives_per_rir, 3)
         assert len(cohorts) == 2
 
+    @pytest.mark.parametrize('cohort_size', [2, 3, 4, 5, 6, 9])
+    def create_perspective_cohorts__should_return_same_cohorts_as_reference_algorithm(self, cohort_size):
+        for seed_number in range(25):
+            perspectives_per_rir = CohortCreator.build_randomly_shuffled_available_perspectives_per_rir(
+                self.all_perspectives, f'seed{seed_number}'.encode())
+            expected_cohorts = ReferenceCohortCreator.create_perspective_cohorts(copy.deepcopy(perspectives_per_rir),
+                                                                                 cohort_size)
+            cohorts = CohortCreator.create_perspective_cohorts(perspectives_per_rir, cohort_size)
+            assert cohorts == expected_cohorts
+
+    @pytest.mark.parametrize('cohort_size', [3, 7, 20])
+    def create_perspective_cohorts__should_return_same_cohorts_as_reference_algorithm_given_hundreds_of_perspectives(
+            self, cohort_size):
+        perspectives = self.create_many_perspectives(rir_count=5, perspectives_per_rir=80)
+        perspectives_per_rir = CohortCreator.build_randomly_shuffled_available_perspectives_per_rir(perspectives, b'testSeed')
+        expected_cohorts = ReferenceCohortCreator.create_perspective_cohorts(copy.deepcopy(perspectives_per_rir),
+                                                                             cohort_size)
+        cohorts = CohortCreator.create_perspective_cohorts(perspectives_per_rir, cohort_size)
+        assert len(cohorts) > 0
+        assert cohorts == expected_cohorts
+
+    def create_perspective_cohorts__should_return_same_cohorts_given_catalog_of_more_perspectives(self):
+        perspectives = self.all_perspectives[:12]
+        perspectives_per_rir = CohortCreator.build_randomly_shuffled_available_perspectives_per_rir(perspectives, b'testSeed')
+        expected_cohorts = CohortCreator.create_perspective_cohorts(perspectives_per_rir, 3)
+        cohorts = CohortCreator.create_perspective_cohorts(perspectives_per_rir, 3, PerspectiveCatalog(self.all_perspectives))
+        assert cohorts == expected_cohorts
+
+    @pytest.mark.parametrize('cohort_size', [1, 2, 5])
+    def generate_perspective_cohorts__should_yield_same_cohorts_in_same_order_as_create_perspective_cohorts(self, cohort_size):
+        perspectives_per_rir = CohortCreator.build_randomly_shuffled_available_perspectives_per_rir(self.all_perspectives, b'testSeed')
+        expected_cohorts = CohortCreator.create_perspective_cohorts(perspectives_per_rir, cohort_size)
+        cohort_generator = CohortCreator.generate_perspective_cohorts(perspectives_per_rir, cohort_size)
+        assert next(cohort_generator) == expected_cohorts[0]
+        assert [expected_cohorts[0]] + list(cohort_generator) == expected_cohorts
+
+    def create_perspective_cohorts__should_not_modify_given_perspectives_per_rir(self):
+        perspectives_per_rir = CohortCreator.build_randomly_shuffled_available_perspectives_per_rir(self.all_perspectives, b'testSeed')
+        original_perspectives_per_rir = copy.deepcopy(perspectives_per_rir)
+        CohortCreator.create_perspective_cohorts(perspectives_per_rir, 4)
+        assert perspectives_per_rir == original_perspectives_per_rir
+
+    def demote_perspectives__should_move_demoted_perspectives_to_end_of_their_rir_list(self):
+        perspectives_per_rir = {'arin': self.convert_codes_to_remote_perspectives(
+                                    ['us-east-1', 'us-west-1', 'ca-west-1'], self.all_possible_perspectives_by_code),
+                                'ripe': self.convert_codes_to_remote_perspectives(
+                                    ['eu-west-1', 'eu-central-1'], self.all_possible_perspectives_by_code)}
+        demoted_perspectives_per_rir = CohortCreator.demote_perspectives(perspectives_per_rir, {'us-east-1', 'eu-central-1'})
+        assert [perspective.code for perspective in demoted_perspectives_per_rir['arin']] == ['us-west-1', 'ca-west-1', 'us-east-1']
+        assert [perspective.code for perspective in demoted_perspectives_per_rir['ripe']] == ['eu-west-1', 'eu-central-1']
+        assert perspectives_per_rir['arin'][0].code == 'us-east-1'  # given lists are unchanged
+
+    # Simulates cohort selection over many domains: the first cohort gets the calls, so its members carry the load.
+    def create_perspective_cohorts__should_spread_load_in_proportion_to_perspective_weight(self):
+        weights_per_code = {'r0-p0': 3, 'r0-p1': 1, 'r0-p2': 1, 'r0-p3': 1, 'r1-p0': 2, 'r1-p1': 2, 'r1-p2': 1, 'r1-p3': 1}
+        perspectives = [RemotePerspective(rir=code.split('-')[0], code=code, weight=weight)
+                        for code, weight in weights_per_code.items()]
+        perspective_catalog = PerspectiveCatalog(perspectives)
+        load_per_code = dict.fromkeys(weights_per_code, 0)
+        domain_count = 4000
+        for domain_number in range(domain_count):
+            random_seed = hashlib.sha256(f'secret-domain{domain_number}.example.com'.encode()).digest()
+            perspectives_per_rir = perspective_catalog.build_randomly_shuffled_perspectives_per_rir(random_seed)
+            first_cohort = next(CohortCreator.generate_perspective_cohorts(perspectives_per_rir, 2, perspective_catalog))
+            assert len({perspective.rir for perspective in first_cohort}) == 2
+            for perspective in first_cohort:
+                load_per_code[perspective.code] += 1
+        load_share_per_code = {code: load / (2 * domain_count) for code, load in load_per_code.items()}
+        pprint(load_share_per_code)
+        # each cohort has one perspective per RIR, so each RIR carries half the load, split by weight within the RIR
+        for code, weight in weights_per_code.items():
+            rir_weight = sum(other_weight for other_code, other_weight in weights_per_code.items()
+                             if other_code.split('-')[0] == code.split('-')[0])
+            assert load_share_per_code[code] == pytest.approx(weight / rir_weight / 2, abs=0.02)
+
+    def build_random_seed__should_hash_secret_and_lowercased_target(self):
+        expected_seed = hashlib.sha256('secretexample.com'.encode('ASCII')).digest()
+        assert CohortCreator.build_random_seed('secret', 'Example.COM') == expected_seed
+
+    def create_perspective_cohorts_per_target__should_return_same_cohorts_as_per_target_path(self):
+        domain_or_ip_targets = [f'domain{number}.example.com' for number in range(50)] + ['Domain1.example.com', '10.0.0.1']
+        cohorts_per_target = CohortCreator.create_perspective_cohorts_per_target(self.all_perspectives, domain_or_ip_targets,
+                                                                                 3, 'secret')
+        assert list(cohorts_per_target.keys()) == domain_or_ip_targets
+        for domain_or_ip_target in domain_or_ip_targets:
+            random_seed = CohortCreator.build_random_seed('secret', domain_or_ip_target)
+            perspectives_per_rir = CohortCreator.build_randomly_shuffled_available_perspectives_per_rir(self.all_perspectives,
+                                                                                                        random_seed)
+            expected_cohorts = CohortCreator.create_perspective_cohorts(perspectives_per_rir, 3)
+            assert cohorts_per_target[domain_or_ip_target] == expected_cohorts
+
+    def create_perspective_cohorts_per_target__should_return_same_cohorts_given_process_pool(self):
+        perspective_catalog = PerspectiveCatalog(self.all_perspectives)
+        domain_or_ip_targets = [f'domain{number}.example.com' for number in range(30)]
+        expected_cohorts_per_target = CohortCreator.create_perspective_cohorts_per_target(perspective_catalog,
+                                                                                          domain_or_ip_targets, 2, 'secret')
+        with concurrent.futures.ProcessPoolExecutor(max_workers=2) as executor:
+            cohorts_per_target = CohortCreator.create_perspective_cohorts_per_target(
+                perspective_catalog, domain_or_ip_targets + domain_or_ip_targets[:5], 2, 'secret', executor, chunk_size=7)
+        assert list(cohorts_per_target.keys()) == domain_or_ip_targets
+        assert cohorts_per_target == expected_cohorts_per_target
+
+    def create_perspective_cohorts_per_target__should_raise_error_given_cohort_size_above_perspective_count(self):
+        with pytest.raises(ValueError):
+            CohortCreator.create_perspective_cohorts_per_target(self.all_perspectives[:2], ['example.com'], 3, 'secret')
+
+    def rank_perspective_cohorts__should_order_cohorts_by_latency_of_slowest_member(self):
+        cohorts = [[RemotePerspective(rir='arin', code='a1'), RemotePerspective(rir='ripe', code='b1')],
+                   [RemotePerspective(rir='arin', code='a2'), RemotePerspective(rir='ripe', code='b2')],
+                   [RemotePerspective(rir='arin', code='a3'), RemotePerspective(rir='ripe', code='b3')]]
+        latency_estimate_per_code = {'a1': 0.1, 'b1': 0.9, 'a2': 0.3, 'b2': 0.2, 'a3': 0.5}  # b3 counts as the average
+        ranked_cohorts = CohortCreator.rank_perspective_cohorts(cohorts, latency_estimate_per_code, b'seed')
+        assert ranked_cohorts == [cohorts[1], cohorts[2], cohorts[0]]
+
+    def rank_perspective_cohorts__should_keep_order_given_no_latency_estimates(self):
+        perspectives_per_rir = CohortCreator.build_randomly_shuffled_available_perspectives_per_rir(self.all_perspectives, b'testSeed')
+        cohorts = CohortCreator.create_perspective_cohorts(perspectives_per_rir, 2)
+        assert CohortCreator.rank_perspective_cohorts(cohorts, {}, b'seed', 0.5) == cohorts
+
+    def rank_perspective_cohorts__should_only_reorder_cohorts_within_jitter_fraction_deterministically_per_seed(self):
+        cohorts = [[RemotePerspective(rir='arin', code=f'a{number}'), RemotePerspective(rir='ripe', code=f'b{number}')]
+                   for number in range(8)]
+        latency_estimate_per_code = {f'a{number}': 1.0 + number * 0.01 for number in range(4)}
+        latency_estimate_per_code.update({f'a{number}': 2.0 + number * 0.01 for number in range(4, 8)})
+        orders = set()
+        for seed_number in range(20):
+            random_seed = f'seed{seed_number}'.encode()
+            ranked_cohorts = CohortCreator.rank_perspective_cohorts(cohorts, latency_estimate_per_code, random_seed, 0.2)
+            assert ranked_cohorts == CohortCreator.rank_perspective_cohorts(cohorts, latency_estimate_per_code, random_seed, 0.2)
+            assert sorted(cohorts.index(cohort) for cohort in ranked_cohorts[:4]) == [0, 1, 2, 3]  # fast ones stay first
+            orders.add(tuple(cohorts.index(cohort) for cohort in ranked_cohorts))
+        assert len(orders) > 1
+
+    def find_substitute_perspective__should_return_first_candidate_keeping_cohort_rules(self):
+        cohort_members = [RemotePerspective(rir='arin', code='a1', too_close_codes=['b1']),
+                          RemotePerspective(rir='arin', code='a2')]
+        candidates = [RemotePerspective(rir='arin', code='a3'),  # would leave a single RIR
+                      RemotePerspective(rir='ripe', code='b1'),  # too close to a1
+                      RemotePerspective(rir='ripe', code='b2'),  # excluded
+                      RemotePerspective(rir='apnic', code='c1'),
+                      RemotePerspective(rir='ripe', code='b3')]
+        substitute = CohortCreator.find_substitute_perspective(cohort_members, candidates, {'b2'})
+        assert substitute.code == 'c1'
+
+    def find_substitute_perspective__should_return_none_given_no_compatible_candidate(self):
+        cohort_members = [RemotePerspective(rir='arin', code='a1'), RemotePerspective(rir='arin', code='a2')]
+        candidates = [RemotePerspective(rir='arin', code='a3'), RemotePerspective(rir='ripe', code='b1', too_close_codes=['a2'])]
+        assert CohortCreator.find_substitute_perspective(cohort_members, candidates, set()) is None
+
     @pytest.fixture
     def perspectives_per_rir(self, request):
         total_perspectives = request.param[0]
@@ -184,6 +343,18 @@ class TestCohortCreator:
 
         return perspectives_per_rir
 
+    # Perspectives in several RIRs, each too close to its neighbors within the RIR.
+    @staticmethod
+    def create_many_perspectives(rir_count, perspectives_per_rir) -> list[RemotePerspective]:
+        perspectives = []
+        for rir_number in range(rir_count):
+            for perspective_number in range(perspectives_per_rir):
+                too_close_codes = [f'r{rir_number}-p{neighbor}' for neighbor in (perspective_number - 1, perspective_number + 1)
+                                   if 0 <= neighbor < perspectives_per_rir]
+                perspectives.append(RemotePerspective(rir=f'rir{rir_number}', code=f'r{rir_number}-p{perspective_number}',
+                                                      too_close_codes=too_close_codes))
+        return perspectives
+
     @staticmethod
     def set_up_perspectives_per_rir_dict_from_file():
         resource_files = resources.files('tests.resources')
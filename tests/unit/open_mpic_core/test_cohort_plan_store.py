@@ -0,0 +1,99 @@
+import concurrent.futures
+import os
+import stat
+
+import pytest
+
+from open_mpic_core.common_domain.remote_perspective import RemotePerspective
+from open_mpic_core.mpic_coordinator.cohort_creator import CohortCreator
+from open_mpic_core.mpic_coordinator.cohort_plan_store import CohortPlanStore
+from open_mpic_core.mpic_coordinator.perspective_catalog import PerspectiveCatalog
+
+
+# noinspection PyMethodMayBeStatic
+class TestCohortPlanStore:
+    def get_cohorts__should_share_stored_cohorts_between_store_instances(self, tmp_path):
+        perspective_catalog = self.create_perspective_catalog()
+        database_path = tmp_path / 'cohort_plans.db'
+        first_store = CohortPlanStore(database_path)
+        second_store = CohortPlanStore(database_path)
+        expected_cohorts = self.create_cohorts(perspective_catalog, 'example.com', 2)
+        first_cohorts = first_store.get_cohorts(perspective_catalog, 'secret', 'example.com', 2,
+                                                lambda: self.create_cohorts(perspective_catalog, 'example.com', 2))
+        second_cohorts = second_store.get_cohorts(perspective_catalog, 'secret', 'EXAMPLE.com', 2,
+                                                  lambda: pytest.fail('cohorts should have been read from the store'))
+        assert first_cohorts == expected_cohorts
+        assert second_cohorts == expected_cohorts
+        assert all(perspective in perspective_catalog.perspectives for cohort in second_cohorts for perspective in cohort)
+        assert (first_store.miss_count, second_store.hit_count) == (1, 1)
+        first_store.close()
+        second_store.close()
+
+    @pytest.mark.skipif(os.name != 'posix', reason='file modes are POSIX-specific')
+    def get_cohorts__should_create_database_files_readable_by_owner_only(self, tmp_path):
+        perspective_catalog = self.create_perspective_catalog()
+        database_path = tmp_path / 'cohort_plans.db'
+        previous_umask = os.umask(0o022)
+        try:
+            cohort_plan_store = CohortPlanStore(database_path)
+            cohort_plan_store.get_cohorts(perspective_catalog, 'secret', 'example.com', 2,
+                                          lambda: self.create_cohorts(perspective_catalog, 'example.com', 2))
+            for path in [database_path, tmp_path / 'cohort_plans.db-wal', tmp_path / 'cohort_plans.db-shm']:
+                assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+            cohort_plan_store.close()
+        finally:
+            os.umask(previous_umask)
+
+    def get_cohorts__should_not_return_cohorts_stored_for_other_catalog_version(self, tmp_path):
+        perspective_catalog = self.create_perspective_catalog()
+        changed_perspectives = [perspective.model_copy(update={'too_close_codes': ['p4']}) if perspective.code == 'p1'
+                                else perspective for perspective in perspective_catalog.perspectives]
+        changed_catalog = PerspectiveCatalog(changed_perspectives)
+        assert changed_catalog.version != perspective_catalog.version
+        assert PerspectiveCatalog(list(reversed(perspective_catalog.perspectives))).version == perspective_catalog.version
+        cohort_plan_store = CohortPlanStore(tmp_path / 'cohort_plans.db')
+        cohort_plan_store.get_cohorts(perspective_catalog, 'secret', 'example.com', 2, lambda: [[]])
+        cohorts = cohort_plan_store.get_cohorts(changed_catalog, 'secret', 'example.com', 2,
+                                                lambda: self.create_cohorts(changed_catalog, 'example.com', 2))
+        assert cohorts == self.create_cohorts(changed_catalog, 'example.com', 2)
+        assert cohort_plan_store.miss_count == 2
+        cohort_plan_store.purge_other_catalog_versions(changed_catalog.version)
+        assert len(cohort_plan_store) == 1
+
+    def get_cohorts__should_key_cohorts_by_hash_secret_and_perspective_count(self, tmp_path):
+        perspective_catalog = self.create_perspective_catalog()
+        cohort_plan_store = CohortPlanStore(tmp_path / 'cohort_plans.db')
+        for hash_secret in ['secret', 'other_secret']:
+            for perspective_count in [2, 3]:
+                cohort_plan_store.get_cohorts(perspective_catalog, hash_secret, 'example.com', perspective_count,
+                                              lambda: [[perspective_catalog.perspectives[0]]])
+        assert cohort_plan_store.miss_count == 4
+        assert len(cohort_plan_store) == 4
+
+    def get_cohorts__should_be_usable_from_several_threads(self, tmp_path):
+        perspective_catalog = self.create_perspective_catalog()
+        cohort_plan_store = CohortPlanStore(tmp_path / 'cohort_plans.db')
+        targets = [f'domain{number % 10}.example.com' for number in range(100)]
+
+        def get_cohorts(target):
+            return cohort_plan_store.get_cohorts(perspective_catalog, 'secret', target, 2,
+                                                 lambda: self.create_cohorts(perspective_catalog, target, 2))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            all_cohorts = list(executor.map(get_cohorts, targets))
+        assert all(cohorts == self.create_cohorts(perspective_catalog, target, 2)
+                   for target, cohorts in zip(targets, all_cohorts))
+        assert len(cohort_plan_store) == 10
+
+    @staticmethod
+    def create_perspective_catalog() -> PerspectiveCatalog:
+        return PerspectiveCatalog([RemotePerspective(rir=f'rir{number % 3}', code=f'p{number}') for number in range(9)])
+
+    @staticmethod
+    def create_cohorts(perspective_catalog, target, perspective_count):
+        return CohortCreator.create_perspective_cohorts_per_target(perspective_catalog, [target], perspective_count,
+                                                                   'secret')[target]
+
+
+if __name__ == '__main__':
+    pytest.main()
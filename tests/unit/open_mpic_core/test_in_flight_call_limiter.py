@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+import pytest
+
+from open_mpic_core.mpic_coordinator.in_flight_call_limiter import InFlightCallLimiter
+
+
+# noinspection PyMethodMayBeStatic
+class TestInFlightCallLimiter:
+    def acquire__should_grant_slots_to_waiters_in_arrival_order(self):
+        in_flight_call_limiter = InFlightCallLimiter(1)
+        granted_order = []
+
+        async def call(number):
+            await in_flight_call_limiter.acquire()
+            granted_order.append(number)
+            await asyncio.sleep(0)
+            in_flight_call_limiter.release()
+
+        async def run_calls():
+            await in_flight_call_limiter.acquire()
+            tasks = [asyncio.create_task(call(number)) for number in range(5)]
+            await asyncio.sleep(0)  # let every call start waiting
+            in_flight_call_limiter.release()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run_calls())
+        assert granted_order == [0, 1, 2, 3, 4]
+        assert in_flight_call_limiter.available_slot_count == 1
+
+    def release__should_wake_waiter_on_other_event_loop(self):
+        in_flight_call_limiter = InFlightCallLimiter(1)
+        is_waiting = threading.Event()
+
+        async def wait_for_slot():
+            waiting_task = asyncio.create_task(in_flight_call_limiter.acquire())
+            await asyncio.sleep(0)
+            is_waiting.set()
+            await asyncio.wait_for(waiting_task, 5)
+
+        asyncio.run(in_flight_call_limiter.acquire())
+        waiting_thread = threading.Thread(target=lambda: asyncio.run(wait_for_slot()))
+        waiting_thread.start()
+        is_waiting.wait(5)
+        in_flight_call_limiter.release()  # from this thread, which runs no event loop
+        waiting_thread.join(5)
+        assert not waiting_thread.is_alive()
+        assert in_flight_call_limiter.available_slot_count == 0 and not in_flight_call_limiter.waiters
+
+    def acquire__should_not_lose_slot_given_cancelled_waiter(self):
+        in_flight_call_limiter = InFlightCallLimiter(1)
+
+        async def cancel_waiters():
+            await in_flight_call_limiter.acquire()
+            still_waiting_task = asyncio.create_task(in_flight_call_limiter.acquire())
+            handed_over_task = asyncio.create_task(in_flight_call_limiter.acquire())
+            await asyncio.sleep(0)
+            still_waiting_task.cancel()
+            in_flight_call_limiter.release()  # hands the slot to handed_over_task...
+            handed_over_task.cancel()  # ...which is cancelled before it gets to run
+            await asyncio.gather(still_waiting_task, handed_over_task, return_exceptions=True)
+            await asyncio.sleep(0)
+
+        asyncio.run(cancel_waiters())
+        assert in_flight_call_limiter.available_slot_count == 1
+        assert not in_flight_call_limiter.waiters
+
+
+if __name__ == '__main__':
+    pytest.main()
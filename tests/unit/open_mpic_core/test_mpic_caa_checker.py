@@ -1,12 +1,19 @@
+import asyncio
+import concurrent.futures
+import time
+
 import dns
+import dns.asyncresolver
 import pytest
 from open_mpic_core.common_domain.check_parameters import CaaCheckParameters
-from open_mpic_core.common_domain.check_request import CaaCheckRequest
+from open_mpic_core.common_domain.check_request import CaaBatchCheckRequest, CaaCheckRequest
 from open_mpic_core.common_domain.check_response import CaaCheckResponse, CaaCheckResponseDetails
 from open_mpic_core.common_domain.enum.certificate_type import CertificateType
 from open_mpic_core.common_domain.remote_perspective import RemotePerspective
 from open_mpic_core.common_domain.validation_error import MpicValidationError
 from open_mpic_core.common_domain.messages.ErrorMessages import ErrorMessages
+from open_mpic_core.mpic_caa_checker.caa_lookup_cache import CaaLookupCache
+from open_mpic_core.mpic_caa_checker.dns_resolver_configuration import DnsResolverConfiguration
 from open_mpic_core.mpic_caa_checker.mpic_caa_checker import MpicCaaChecker
 from dns.rrset import RRset
 
@@ -150,6 +157,235 @@ class TestMpicCaaChecker:
         assert answer_rrset is None
         assert isinstance(domain, dns.name.Name) and domain.to_text() == '.'  # try everything up to root domain
 
+    def constructor__should_build_resolver_from_dns_resolver_configuration(self):
+        dns_resolver_configuration = DnsResolverConfiguration(nameservers=['127.0.0.1'], port=5353, timeout_seconds=0.5,
+                                                              lifetime_seconds=2.0, edns_payload_size=1232)
+        caa_checker = MpicCaaChecker(['ca1.com'], RemotePerspective(rir='arin', code='us-east-4'),
+                                     dns_resolver_configuration=dns_resolver_configuration)
+        dns_resolver = caa_checker.dns_resolver
+        assert dns_resolver.nameservers == ['127.0.0.1']
+        assert dns_resolver.port == 5353
+        assert (dns_resolver.timeout, dns_resolver.lifetime) == (0.5, 2.0)
+        assert (dns_resolver.edns, dns_resolver.payload) == (0, 1232)
+        assert caa_checker.always_use_tcp is False
+
+    @pytest.mark.parametrize('always_use_tcp', [False, True])
+    def find_caa_record_and_domain__should_use_configured_resolver_for_every_lookup(self, set_env_variables, mocker,
+                                                                                    always_use_tcp):
+        test_dns_query_answer = MockDnsObjectCreator.create_caa_query_answer('example.com', 0, 'issue', 'ca1.org', mocker)
+        mocker.patch('dns.resolver.resolve', side_effect=lambda domain_name, rdtype: pytest.fail('default resolver used'))
+        dns_resolver = dns.resolver.Resolver(configure=False)
+        mocker.patch.object(dns_resolver, 'resolve', side_effect=lambda domain_name, rdtype, tcp: (
+            test_dns_query_answer if domain_name.to_text() == 'example.com.' else self.raise_(dns.resolver.NXDOMAIN)
+        ))
+        caa_checker = MpicCaaChecker(['ca1.com'], RemotePerspective(rir='arin', code='us-east-4'),
+                                     dns_resolver=dns_resolver,
+                                     dns_resolver_configuration=DnsResolverConfiguration(always_use_tcp=always_use_tcp))
+        caa_request = CaaCheckRequest(domain_or_ip_target='www.example.com', certificate_type=None, caa_domains=None)
+        answer_rrset, domain = caa_checker.find_caa_record_and_domain(caa_request)
+        assert domain.to_text() == 'example.com.'
+        assert dns_resolver.resolve.call_count == 2
+        assert all(call.kwargs['tcp'] is always_use_tcp for call in dns_resolver.resolve.call_args_list)
+
+    def check_caa__should_reuse_cached_lookups_given_caa_lookup_cache(self, set_env_variables, mocker):
+        test_dns_query_answer = MockDnsObjectCreator.create_caa_query_answer('example.com', 0, 'issue', 'ca111.com', mocker)
+        test_dns_query_answer.chaining_result.minimum_ttl = 3600
+        resolve_mock = mocker.patch('dns.resolver.resolve', side_effect=lambda domain_name, rdtype: (
+            test_dns_query_answer if domain_name.to_text() == 'example.com.' else self.raise_(dns.resolver.NXDOMAIN)
+        ))
+        caa_lookup_cache = CaaLookupCache(max_size=100, default_negative_ttl_seconds=60)
+        caa_checker = MpicCaaChecker(['ca111.com'], RemotePerspective(rir='arin', code='us-east-4'),
+                                     caa_lookup_cache=caa_lookup_cache)
+        for target in ['www.example.com', 'www.example.com', 'example.com']:
+            caa_response = caa_checker.check_caa(CaaCheckRequest(domain_or_ip_target=target))
+            assert caa_response.check_passed is True
+            assert caa_response.details.found_at == 'example.com'
+        assert resolve_mock.call_count == 2  # www.example.com and example.com, once each
+        assert (caa_lookup_cache.hit_count, caa_lookup_cache.miss_count) == (3, 2)
+
+    @pytest.mark.parametrize('target, caa_label, expected_found_at', [
+        ('a.b.c.example.com', 'example.com.', 'example.com.'),
+        ('a.b.c.example.com', 'b.c.example.com.', 'b.c.example.com.'),
+        ('a.b.c.example.com', 'a.b.c.example.com.', 'a.b.c.example.com.'),
+        ('a.b.c.example.com', 'example.org.', '.')
+    ])
+    def find_caa_record_and_domain__should_find_closest_caa_record_given_concurrent_tree_climb(
+            self, set_env_variables, mocker, target, caa_label, expected_found_at):
+        test_dns_query_answer = MockDnsObjectCreator.create_caa_query_answer('example.com', 0, 'issue', 'ca1.org', mocker)
+        mocker.patch('dns.resolver.resolve', side_effect=lambda domain_name, rdtype: (
+            test_dns_query_answer if domain_name.to_text() == caa_label else self.raise_(dns.resolver.NXDOMAIN)
+        ))
+        caa_checker = MpicCaaChecker(['ca1.com'], RemotePerspective(rir='arin', code='us-east-4'),
+                                     enable_concurrent_tree_climb=True)
+        try:
+            answer_rrset, domain = caa_checker.find_caa_record_and_domain(CaaCheckRequest(domain_or_ip_target=target))
+        finally:
+            caa_checker.shutdown()
+        assert domain.to_text() == expected_found_at
+        assert answer_rrset is (None if expected_found_at == '.' else test_dns_query_answer.rrset)
+
+    @pytest.mark.parametrize('failing_label, is_error_expected', [('c.example.com.', True), ('com.', False)])
+    def check_caa__should_surface_lookup_errors_below_found_label_given_concurrent_tree_climb(
+            self, set_env_variables, mocker, failing_label, is_error_expected):
+        test_dns_query_answer = MockDnsObjectCreator.create_caa_query_answer('example.com', 0, 'issue', 'ca111.com', mocker)
+
+        def resolve(domain_name, rdtype):
+            if domain_name.to_text() == failing_label:
+                raise dns.resolver.NoNameservers
+            if domain_name.to_text() == 'example.com.':
+                return test_dns_query_answer
+            raise dns.resolver.NoAnswer
+
+        mocker.patch('dns.resolver.resolve', side_effect=resolve)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            caa_checker = MpicCaaChecker(['ca111.com'], RemotePerspective(rir='arin', code='us-east-4'),
+                                         enable_concurrent_tree_climb=True, executor=executor)
+            caa_response = caa_checker.check_caa(CaaCheckRequest(domain_or_ip_target='a.b.c.example.com'))
+            caa_checker.shutdown()  # doesn't shut down the injected executor
+            assert executor.submit(lambda: True).result() is True
+        assert caa_response.check_passed is not is_error_expected
+        if is_error_expected:
+            assert caa_response.errors[0].error_type == ErrorMessages.CAA_LOOKUP_ERROR.key
+        else:
+            assert caa_response.details.found_at == 'example.com'
+
+    def find_caa_record_and_domain__should_look_up_labels_at_once_given_concurrent_tree_climb(self, set_env_variables,
+                                                                                             mocker):
+        def resolve(domain_name, rdtype):
+            time.sleep(0.2)
+            raise dns.resolver.NXDOMAIN
+
+        mocker.patch('dns.resolver.resolve', side_effect=resolve)
+        caa_checker = MpicCaaChecker(['ca1.com'], RemotePerspective(rir='arin', code='us-east-4'),
+                                     enable_concurrent_tree_climb=True)
+        started_at = time.perf_counter()
+        try:
+            answer_rrset, domain = caa_checker.find_caa_record_and_domain(
+                CaaCheckRequest(domain_or_ip_target='a.b.c.d.example.com'))
+        finally:
+            caa_checker.shutdown()
+        assert answer_rrset is None and domain == dns.name.root
+        assert time.perf_counter() - started_at < 0.2 * 6 / 2  # six labels, far less than sequentially
+
+    @pytest.mark.parametrize('enable_concurrent_tree_climb', [False, True])
+    @pytest.mark.parametrize('target, caa_label, failing_label, caa_value', [
+        ('www.example.com', 'example.com.', None, 'ca111.com'),
+        ('www.example.com', 'example.com.', None, 'ca222.com'),
+        ('www.example.com', None, None, 'ca111.com'),
+        ('a.b.example.com', 'example.com.', 'b.example.com.', 'ca111.com'),
+        ('a.b.example.com', 'a.b.example.com.', 'com.', 'ca111.com')
+    ])
+    def check_caa_async__should_return_same_response_as_check_caa(self, set_env_variables, mocker, target, caa_label,
+                                                                  failing_label, caa_value, enable_concurrent_tree_climb):
+        test_dns_query_answer = MockDnsObjectCreator.create_caa_query_answer('example.com', 0, 'issue', caa_value, mocker)
+
+        def resolve(domain_name, rdtype):
+            if domain_name.to_text() == failing_label:
+                raise dns.resolver.NoNameservers
+            if domain_name.to_text() == caa_label:
+                return test_dns_query_answer
+            raise dns.resolver.NXDOMAIN
+
+        mocker.patch('dns.resolver.resolve', side_effect=resolve)
+        mocker.patch('dns.asyncresolver.resolve', side_effect=resolve)
+        caa_checker = MpicCaaChecker(['ca111.com'], RemotePerspective(rir='arin', code='us-east-4'),
+                                     enable_concurrent_tree_climb=enable_concurrent_tree_climb)
+        caa_request = CaaCheckRequest(domain_or_ip_target=target)
+        try:
+            caa_response = caa_checker.check_caa(caa_request)
+            async_caa_response = asyncio.run(caa_checker.check_caa_async(caa_request))
+        finally:
+            caa_checker.shutdown()
+        caa_response.timestamp_ns = async_caa_response.timestamp_ns = None
+        assert async_caa_response == caa_response
+
+    def check_caa_async__should_run_many_checks_concurrently_on_one_event_loop(self, set_env_variables, mocker):
+        async def resolve(domain_name, rdtype):
+            await asyncio.sleep(0.1)
+            raise dns.resolver.NoAnswer
+
+        mocker.patch('dns.asyncresolver.resolve', side_effect=resolve)
+        caa_checker = MpicCaaChecker(['ca111.com'], RemotePerspective(rir='arin', code='us-east-4'),
+                                     enable_concurrent_tree_climb=True)
+
+        async def check_many_domains():
+            return await asyncio.gather(*[caa_checker.check_caa_async(
+                CaaCheckRequest(domain_or_ip_target=f'www.domain{number}.example.com')) for number in range(500)])
+
+        started_at = time.perf_counter()
+        try:
+            caa_responses = asyncio.run(check_many_domains())
+        finally:
+            caa_checker.shutdown()
+        assert all(caa_response.check_passed is True for caa_response in caa_responses)
+        assert time.perf_counter() - started_at < 2  # 500 checks of 4 labels each, 0.1 seconds per lookup
+
+    def check_caa_async__should_use_configured_async_resolver(self, set_env_variables, mocker):
+        caa_checker = MpicCaaChecker(['ca111.com'], RemotePerspective(rir='arin', code='us-east-4'),
+                                     dns_resolver_configuration=DnsResolverConfiguration(nameservers=['127.0.0.1'],
+                                                                                         always_use_tcp=True))
+        assert isinstance(caa_checker.dns_async_resolver, dns.asyncresolver.Resolver)
+        assert caa_checker.dns_async_resolver.nameservers == ['127.0.0.1']
+        mocker.patch('dns.asyncresolver.resolve', side_effect=lambda domain_name, rdtype: pytest.fail('default resolver used'))
+        resolve_mock = mocker.patch.object(caa_checker.dns_async_resolver, 'resolve',
+                                           side_effect=lambda domain_name, rdtype, tcp: self.raise_(dns.resolver.NXDOMAIN))
+        caa_response = asyncio.run(caa_checker.check_caa_async(CaaCheckRequest(domain_or_ip_target='example.com')))
+        assert caa_response.check_passed is True
+        assert resolve_mock.call_count == 2
+        assert all(call.kwargs['tcp'] is True for call in resolve_mock.call_args_list)
+
+    def check_caa_async__should_use_async_resolver_set_up_like_injected_resolver(self, set_env_variables, mocker):
+        dns_resolver = DnsResolverConfiguration(nameservers=['127.0.0.1'], port=5353, timeout_seconds=0.5,
+                                                lifetime_seconds=1.5, edns_payload_size=1232).build_resolver()
+        caa_checker = MpicCaaChecker(['ca111.com'], RemotePerspective(rir='arin', code='us-east-4'),
+                                     dns_resolver=dns_resolver)
+        dns_async_resolver = caa_checker.dns_async_resolver
+        assert isinstance(dns_async_resolver, dns.asyncresolver.Resolver)
+        assert dns_async_resolver.nameservers == ['127.0.0.1']
+        assert (dns_async_resolver.port, dns_async_resolver.timeout, dns_async_resolver.lifetime) == (5353, 0.5, 1.5)
+        assert (dns_async_resolver.edns, dns_async_resolver.payload) == (0, 1232)
+        mocker.patch('dns.asyncresolver.resolve', side_effect=lambda domain_name, rdtype: pytest.fail('default resolver used'))
+        resolve_mock = mocker.patch.object(dns_async_resolver, 'resolve',
+                                           side_effect=lambda domain_name, rdtype, tcp: self.raise_(dns.resolver.NXDOMAIN))
+        caa_response = asyncio.run(caa_checker.check_caa_async(CaaCheckRequest(domain_or_ip_target='example.com')))
+        assert caa_response.check_passed is True
+        assert resolve_mock.call_count == 2
+
+    @pytest.mark.parametrize('enable_concurrent_tree_climb', [False, True])
+    @pytest.mark.parametrize('failing_label', [None, 'api.a.example.com.', 'com.'])
+    def check_caa_batch__should_return_same_responses_as_check_caa_per_target(self, set_env_variables, mocker,
+                                                                              failing_label, enable_concurrent_tree_climb):
+        test_dns_query_answer = MockDnsObjectCreator.create_caa_query_answer('example.com', 0, 'issue', 'ca111.com', mocker)
+
+        def resolve(domain_name, rdtype):
+            if domain_name.to_text() == failing_label:
+                raise dns.resolver.NoNameservers
+            if domain_name.to_text() == 'example.com.':
+                return test_dns_query_answer
+            raise dns.resolver.NXDOMAIN
+
+        resolve_mock = mocker.patch('dns.resolver.resolve', side_effect=resolve)
+        caa_checker = MpicCaaChecker(['ca111.com'], RemotePerspective(rir='arin', code='us-east-4'),
+                                     enable_concurrent_tree_climb=enable_concurrent_tree_climb)
+        caa_check_parameters = CaaCheckParameters(certificate_type=CertificateType.TLS_SERVER, caa_domains=['ca111.com'])
+        targets = ['www.a.example.com', 'api.a.example.com', 'a.example.com']
+        try:
+            caa_responses = caa_checker.check_caa_batch(CaaBatchCheckRequest(domain_or_ip_targets=targets,
+                                                                             caa_check_parameters=caa_check_parameters))
+            looked_up_names = [call.args[0].to_text() for call in resolve_mock.call_args_list]
+            expected_caa_responses = [caa_checker.check_caa(CaaCheckRequest(domain_or_ip_target=target,
+                                                                            caa_check_parameters=caa_check_parameters))
+                                      for target in targets]
+        finally:
+            caa_checker.shutdown()
+        for caa_response in caa_responses + expected_caa_responses:
+            caa_response.timestamp_ns = None
+        assert caa_responses == expected_caa_responses
+        assert [caa_response.check_passed for caa_response in caa_responses] == [True, failing_label != 'api.a.example.com.', True]
+        assert len(looked_up_names) == len(set(looked_up_names))  # each name at most once
+        if not enable_concurrent_tree_climb:
+            assert sorted(looked_up_names) == ['a.example.com.', 'api.a.example.com.', 'example.com.', 'www.a.example.com.']
+
     @pytest.mark.parametrize('value_list, caa_domains', [
         (['ca111.org'], ['ca111.org']),
         (['ca111.org', 'ca222.com'], ['ca222.com']),
@@ -1,17 +1,28 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
 from itertools import cycle
 from unittest.mock import MagicMock
 
 import pytest
 
-from open_mpic_core.common_domain.check_response import CaaCheckResponse, CaaCheckResponseDetails
+from open_mpic_core.common_domain.check_response import CaaCheckResponse, CaaCheckResponseDetails, DcvCheckResponse
+from open_mpic_core.common_domain.check_response_details import DcvCheckResponseDetailsBuilder
 from open_mpic_core.common_domain.enum.dcv_validation_method import DcvValidationMethod
 from open_mpic_core.common_domain.enum.check_type import CheckType
+from open_mpic_core.common_domain.enum.perspective_call_outcome import PerspectiveCallOutcome
 from open_mpic_core.common_domain.messages.ErrorMessages import ErrorMessages
+from open_mpic_core.mpic_coordinator.domain.cohort_ranking_policy import CohortRankingPolicy
+from open_mpic_core.mpic_coordinator.domain.hedging_policy import HedgingPolicy
 from open_mpic_core.mpic_coordinator.domain.mpic_orchestration_parameters import MpicRequestOrchestrationParameters
 from open_mpic_core.common_domain.remote_perspective import RemotePerspective
 from open_mpic_core.mpic_coordinator.domain.mpic_request_validation_error import MpicRequestValidationError
 from open_mpic_core.mpic_coordinator.domain.mpic_response import MpicResponse
 from open_mpic_core.mpic_coordinator.mpic_coordinator import MpicCoordinator, MpicCoordinatorConfiguration
+from open_mpic_core.mpic_coordinator.mpic_coordinator_observer import MpicCoordinatorObserver
+from open_mpic_core.mpic_coordinator.cohort_plan_store import CohortPlanStore
+from open_mpic_core.mpic_coordinator.perspective_scoreboard import PerspectiveScoreboard
 
 from unit.test_util.valid_mpic_request_creator import ValidMpicRequestCreator
 
@@ -34,6 +45,25 @@ class TestMpicCoordinator:
         cohorts = mpic_coordinator.create_cohorts_of_randomly_selected_perspectives(target_perspectives, cohort_size, 'test_target')
         assert len(cohorts) == 2
 
+    def create_cohorts_of_randomly_selected_perspectives__should_return_same_cohorts_given_catalog_or_list(self):
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response, mpic_coordinator_config)
+        cohorts_from_list = mpic_coordinator.create_cohorts_of_randomly_selected_perspectives(
+            mpic_coordinator_config.target_perspectives, 2, 'example.com')
+        cohorts_from_catalog = mpic_coordinator.create_cohorts_of_randomly_selected_perspectives(
+            mpic_coordinator_config.perspective_catalog, 2, 'example.com')
+        assert cohorts_from_catalog == cohorts_from_list
+
+    def get_perspective_cohorts__should_create_cohorts_lazily_unless_every_cohort_is_needed(self):
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response,
+                                           self.create_mpic_coordinator_configuration())
+        expected_cohorts = mpic_coordinator.create_cohorts_of_randomly_selected_perspectives(
+            mpic_coordinator.target_perspectives, 2, 'example.com')
+        lazy_cohorts = mpic_coordinator.get_perspective_cohorts(2, 'example.com', is_every_cohort_needed=False)
+        assert not isinstance(lazy_cohorts, list)
+        assert list(lazy_cohorts) == expected_cohorts
+        assert mpic_coordinator.get_perspective_cohorts(2, 'example.com') == expected_cohorts
+
     @pytest.mark.parametrize('requested_perspective_count, expected_quorum_size', [(4, 3), (5, 4), (6, 4)])
     def determine_required_quorum_count__should_dynamically_set_required_quorum_count_given_no_quorum_specified(
             self, requested_perspective_count, expected_quorum_size):
@@ -106,6 +136,24 @@ class TestMpicCoordinator:
         mpic_response = mpic_coordinator.coordinate_mpic(mpic_request)
         assert mpic_response.is_valid is True
 
+    @pytest.mark.parametrize('is_transport_awaitable', [False, True])
+    def coordinate_mpic__should_complete_given_call_from_thread_running_event_loop(self, is_transport_awaitable):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        transport = (self.create_successful_remote_caa_check_response_async if is_transport_awaitable
+                     else self.create_successful_remote_caa_check_response)
+        mpic_coordinator = MpicCoordinator(transport, self.create_mpic_coordinator_configuration())
+
+        async def coordinate_from_event_loop():
+            return (mpic_coordinator.coordinate_mpic(mpic_request),
+                    mpic_coordinator.coordinate_mpic_batch([mpic_request, mpic_request]))
+
+        try:
+            mpic_response, mpic_batch_responses = asyncio.run(coordinate_from_event_loop())
+        finally:
+            mpic_coordinator.shutdown()
+        assert mpic_response.is_valid is True
+        assert [mpic_batch_response.is_valid for mpic_batch_response in mpic_batch_responses] == [True, True]
+
     def coordinate_mpic__should_fully_carry_out_caa_mpic_given_no_parameters_besides_target(self):
         mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
         mpic_request.orchestration_parameters = None
@@ -232,6 +280,833 @@ class TestMpicCoordinator:
             assert perspective.check_passed is False
             assert perspective.errors[0].error_type == ErrorMessages.COORDINATOR_COMMUNICATION_ERROR.key
 
+    def coordinate_mpic_async__should_return_check_success_given_awaitable_remote_perspective_call_function(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response_async, mpic_coordinator_config)
+        mpic_response = asyncio.run(mpic_coordinator.coordinate_mpic_async(mpic_request))
+        assert mpic_response.is_valid is True
+        assert len(mpic_response.perspectives) == 6
+
+    def coordinate_mpic_async__should_issue_awaitable_calls_concurrently_without_worker_threads(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        calls_in_progress = []
+        max_calls_in_progress = []
+        calling_threads = set()
+
+        async def call_remote_perspective(perspective, check_type, check_request):
+            calling_threads.add(threading.get_ident())
+            calls_in_progress.append(perspective.code)
+            max_calls_in_progress.append(len(calls_in_progress))
+            await asyncio.sleep(0.01)
+            calls_in_progress.remove(perspective.code)
+            return await self.create_successful_remote_caa_check_response_async(perspective, check_type, check_request)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, self.create_mpic_coordinator_configuration())
+        mpic_response = asyncio.run(mpic_coordinator.coordinate_mpic_async(mpic_request))
+        assert mpic_response.is_valid is True
+        assert max(max_calls_in_progress) == 6
+        assert calling_threads == {threading.get_ident()}
+
+    def coordinate_mpic_async__should_run_blocking_remote_perspective_call_function_in_worker_threads(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        calling_threads = set()
+
+        def call_remote_perspective(perspective, check_type, check_request):
+            calling_threads.add(threading.get_ident())
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, self.create_mpic_coordinator_configuration())
+        mpic_response = asyncio.run(mpic_coordinator.coordinate_mpic_async(mpic_request))
+        assert mpic_response.is_valid is True
+        assert threading.get_ident() not in calling_threads
+
+    def coordinate_mpic_async__should_return_check_failure_message_given_awaitable_remote_perspective_failure(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_coordinator = MpicCoordinator(self.create_failing_remote_response_with_exception_async,
+                                           self.create_mpic_coordinator_configuration())
+        mpic_response = asyncio.run(mpic_coordinator.coordinate_mpic_async(mpic_request))
+        assert mpic_response.is_valid is False
+        for perspective in mpic_response.perspectives:
+            assert perspective.errors[0].error_type == ErrorMessages.COORDINATOR_COMMUNICATION_ERROR.key
+
+    def coordinate_mpic_async__should_stop_waiting_once_quorum_is_reached_given_early_quorum_decision(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()  # 6 perspectives, quorum of 4
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.enable_early_quorum_decision = True
+        straggler_codes = {'us-east-1', 'eu-west-2'}
+
+        async def call_remote_perspective(perspective, check_type, check_request):
+            if perspective.code in straggler_codes:
+                await asyncio.sleep(60)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, mpic_coordinator_config)
+        mpic_response = asyncio.run(asyncio.wait_for(mpic_coordinator.coordinate_mpic_async(mpic_request), 5))
+        assert mpic_response.is_valid is True
+        assert len(mpic_response.perspectives) == 6
+        cancelled_responses = [response for response in mpic_response.perspectives
+                               if response.errors and response.errors[0].error_type == ErrorMessages.COORDINATOR_CALL_CANCELLED.key]
+        assert {response.perspective_code for response in cancelled_responses} == straggler_codes
+
+    def coordinate_mpic_async__should_stop_waiting_once_quorum_is_unreachable_given_early_quorum_decision(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()  # 6 perspectives, quorum of 4
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.enable_early_quorum_decision = True
+        failing_codes = {'us-east-1', 'eu-west-2', 'ap-south-2'}
+
+        async def call_remote_perspective(perspective, check_type, check_request):
+            if perspective.code in failing_codes:
+                return self.create_failing_remote_caa_check_response(perspective, check_type, check_request)
+            await asyncio.sleep(60)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, mpic_coordinator_config)
+        mpic_response = asyncio.run(asyncio.wait_for(mpic_coordinator.coordinate_mpic_async(mpic_request), 5))
+        assert mpic_response.is_valid is False
+        assert len(mpic_response.perspectives) == 6
+
+    def coordinate_mpic__should_abandon_blocking_calls_once_quorum_is_reached_given_early_quorum_decision(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()  # 6 perspectives, quorum of 4
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.enable_early_quorum_decision = True
+        release_stragglers = threading.Event()
+
+        def call_remote_perspective(perspective, check_type, check_request):
+            if perspective.code in {'us-west-1', 'ap-northeast-1'}:
+                release_stragglers.wait(10)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, mpic_coordinator_config)
+        try:
+            mpic_response = mpic_coordinator.coordinate_mpic(mpic_request)
+            assert not release_stragglers.is_set()  # returned while the stragglers were still blocked
+            assert mpic_response.is_valid is True
+        finally:
+            release_stragglers.set()
+
+    def coordinate_mpic_async__should_wait_for_all_perspectives_given_early_quorum_decision_disabled(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+
+        async def call_remote_perspective(perspective, check_type, check_request):
+            if perspective.code == 'us-east-1':
+                await asyncio.sleep(0.05)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, self.create_mpic_coordinator_configuration())
+        mpic_response = asyncio.run(mpic_coordinator.coordinate_mpic_async(mpic_request))
+        assert all(response.check_passed for response in mpic_response.perspectives)
+        assert len(mpic_response.perspectives) == 6
+
+    @pytest.mark.parametrize('validity, pending_call_count, quorum_count, expected_result', [
+        ([True, True, True, True], 2, 4, True),  # quorum reached
+        ([False, False, False], 3, 4, True),  # quorum out of reach
+        ([True, True, False], 3, 4, False),  # still undecided
+        ([False, False], 4, 4, False),  # still undecided, all remaining calls needed
+    ])
+    def is_quorum_outcome_decided__should_return_true_only_if_pending_calls_cannot_change_outcome(
+            self, validity, pending_call_count, quorum_count, expected_result):
+        validity_per_perspective = {f"p{i}": is_valid for i, is_valid in enumerate(validity)}
+        result = MpicCoordinator.is_quorum_outcome_decided(validity_per_perspective, pending_call_count, quorum_count)
+        assert result is expected_result
+
+    def coordinate_mpic_async__should_return_timeout_error_for_perspective_exceeding_call_timeout(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()  # 6 perspectives, quorum of 4
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.perspective_call_timeout_seconds = 0.05
+
+        async def call_remote_perspective(perspective, check_type, check_request):
+            if perspective.code == 'eu-central-2':
+                await asyncio.sleep(60)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, mpic_coordinator_config)
+        mpic_response = asyncio.run(asyncio.wait_for(mpic_coordinator.coordinate_mpic_async(mpic_request), 5))
+        assert mpic_response.is_valid is True
+        timed_out_response = next(response for response in mpic_response.perspectives if response.perspective_code == 'eu-central-2')
+        assert timed_out_response.check_passed is False
+        assert timed_out_response.errors[0].error_type == ErrorMessages.COORDINATOR_TIMEOUT_ERROR.key
+
+    def coordinate_mpic__should_not_hang_given_hung_blocking_call_and_call_timeout(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.perspective_call_timeout_seconds = 0.05
+        release_hung_call = threading.Event()
+
+        def call_remote_perspective(perspective, check_type, check_request):
+            if perspective.code == 'ap-south-2':
+                release_hung_call.wait(10)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, mpic_coordinator_config)
+        try:
+            mpic_response = mpic_coordinator.coordinate_mpic(mpic_request)
+            assert not release_hung_call.is_set()
+            assert mpic_response.is_valid is True
+        finally:
+            release_hung_call.set()
+
+    def coordinate_mpic_async__should_limit_call_timeout_to_time_left_before_request_deadline(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_request.orchestration_parameters.request_deadline_seconds = 0.05
+
+        async def call_remote_perspective(perspective, check_type, check_request):
+            await asyncio.sleep(60)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, self.create_mpic_coordinator_configuration())
+        mpic_response = asyncio.run(asyncio.wait_for(mpic_coordinator.coordinate_mpic_async(mpic_request), 5))
+        assert mpic_response.is_valid is False
+        assert all(response.errors[0].error_type == ErrorMessages.COORDINATOR_TIMEOUT_ERROR.key
+                   for response in mpic_response.perspectives)
+
+    def coordinate_mpic_async__should_not_start_another_attempt_that_cannot_finish_before_request_deadline(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_request.orchestration_parameters = MpicRequestOrchestrationParameters(
+            quorum_count=1, perspective_count=2, max_attempts=3, request_deadline_seconds=0.3)
+
+        async def call_remote_perspective(perspective, check_type, check_request):
+            await asyncio.sleep(0.2)
+            return self.create_failing_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, self.create_mpic_coordinator_configuration())
+        mpic_response = asyncio.run(mpic_coordinator.coordinate_mpic_async(mpic_request))
+        assert mpic_response.is_valid is False
+        assert mpic_response.actual_orchestration_parameters.attempt_count == 1
+
+    @pytest.mark.parametrize('configured_limits, requested_limits, expected_limits', [
+        ((None, None), (None, None), (None, None)),
+        ((2.0, 10.0), (None, None), (2.0, 10.0)),
+        ((2.0, 10.0), (1.0, 5.0), (1.0, 5.0)),
+        ((2.0, 10.0), (3.0, 20.0), (2.0, 10.0)),  # requested limits can't exceed configured ones
+        ((None, None), (3.0, 20.0), (3.0, 20.0)),
+    ])
+    def determine_timeouts__should_use_requested_limits_capped_by_configured_limits(self, configured_limits,
+                                                                                   requested_limits, expected_limits):
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.perspective_call_timeout_seconds, mpic_coordinator_config.request_deadline_seconds = configured_limits
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response, mpic_coordinator_config)
+        orchestration_parameters = MpicRequestOrchestrationParameters(perspective_call_timeout_seconds=requested_limits[0],
+                                                                      request_deadline_seconds=requested_limits[1])
+        assert mpic_coordinator.determine_timeouts(orchestration_parameters) == expected_limits
+
+    def coordinate_mpic__should_reuse_worker_threads_across_requests_given_blocking_transport(self):
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.executor_max_workers = 6
+        calling_threads = set()
+
+        def call_remote_perspective(perspective, check_type, check_request):
+            calling_threads.add(threading.get_ident())
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, mpic_coordinator_config)
+        try:
+            for _ in range(5):
+                assert mpic_coordinator.coordinate_mpic(ValidMpicRequestCreator.create_valid_caa_mpic_request()).is_valid is True
+            assert len(calling_threads) <= 6
+        finally:
+            mpic_coordinator.shutdown()
+
+    def coordinate_mpic__should_use_injected_executor_and_leave_it_running_on_shutdown(self):
+        injected_executor = concurrent.futures.ThreadPoolExecutor(max_workers=6, thread_name_prefix='injected')
+        calling_thread_names = set()
+
+        def call_remote_perspective(perspective, check_type, check_request):
+            calling_thread_names.add(threading.current_thread().name)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, self.create_mpic_coordinator_configuration(),
+                                           executor=injected_executor)
+        try:
+            mpic_coordinator.coordinate_mpic(ValidMpicRequestCreator.create_valid_caa_mpic_request())
+            mpic_coordinator.shutdown()
+            assert all(name.startswith('injected') for name in calling_thread_names)
+            assert injected_executor.submit(lambda: 'still running').result() == 'still running'
+        finally:
+            injected_executor.shutdown()
+
+    def shutdown__should_shut_down_owned_executor(self):
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response,
+                                           self.create_mpic_coordinator_configuration())
+        mpic_coordinator.shutdown()
+        with pytest.raises(RuntimeError):
+            mpic_coordinator.executor.submit(lambda: None)
+
+    def constructor__should_not_create_executor_given_awaitable_transport(self):
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response_async,
+                                           self.create_mpic_coordinator_configuration())
+        assert mpic_coordinator.executor is None
+        mpic_coordinator.shutdown()  # nothing to do, but should be safe to call
+
+    @pytest.mark.parametrize('is_transport_awaitable', [True, False])
+    def coordinate_mpic__should_cap_calls_in_flight_across_concurrent_requests(self, is_transport_awaitable):
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.max_in_flight_calls = 2
+        calls_in_progress = []
+        max_calls_in_progress = []
+        lock = threading.Lock()
+
+        def track_call(perspective):
+            with lock:
+                calls_in_progress.append(perspective.code)
+                max_calls_in_progress.append(len(calls_in_progress))
+
+        def untrack_call(perspective):
+            with lock:
+                calls_in_progress.remove(perspective.code)
+
+        async def call_remote_perspective_async(perspective, check_type, check_request):
+            track_call(perspective)
+            await asyncio.sleep(0.01)
+            untrack_call(perspective)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        def call_remote_perspective(perspective, check_type, check_request):
+            track_call(perspective)
+            time.sleep(0.01)
+            untrack_call(perspective)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        transport = call_remote_perspective_async if is_transport_awaitable else call_remote_perspective
+        mpic_coordinator = MpicCoordinator(transport, mpic_coordinator_config)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as request_executor:
+                requests = [ValidMpicRequestCreator.create_valid_caa_mpic_request() for _ in range(3)]
+                responses = list(request_executor.map(mpic_coordinator.coordinate_mpic, requests))
+            assert all(response.is_valid for response in responses)
+            assert max(max_calls_in_progress) == 2
+        finally:
+            mpic_coordinator.shutdown()
+
+    def coordinate_mpic__should_return_consistent_results_given_concurrent_requests_sharing_coordinator(self):
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.executor_max_workers = 8
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response, mpic_coordinator_config)
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=8) as request_executor:
+                requests = []
+                for target_index in range(16):
+                    request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+                    request.orchestration_parameters = MpicRequestOrchestrationParameters(perspective_count=2, quorum_count=2)
+                    request.domain_or_ip_target = f"target{target_index}.example.com"
+                    requests.append(request)
+                responses = list(request_executor.map(mpic_coordinator.coordinate_mpic, requests))
+            assert all(response.is_valid for response in responses)
+            assert all(len(response.perspectives) == 2 for response in responses)
+        finally:
+            mpic_coordinator.shutdown()
+
+    def coordinate_mpic_batch__should_send_one_combined_call_per_perspective_and_return_response_per_request(self):
+        mpic_requests = self.create_caa_mpic_requests_for_targets('a.example.com', 'b.example.com', 'c.example.com')
+        batch_calls = []
+
+        def call_remote_perspective(perspective, check_type, check_request):
+            batch_calls.append((perspective.code, [check_request.domain_or_ip_target]))
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        def call_remote_perspective_batch(perspective, check_calls):
+            batch_calls.append((perspective.code, [check_request.domain_or_ip_target for _, check_request in check_calls]))
+            return [self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+                    for check_type, check_request in check_calls]
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, self.create_mpic_coordinator_configuration(),
+                                           call_remote_perspective_batch_function=call_remote_perspective_batch)
+        try:
+            mpic_responses = mpic_coordinator.coordinate_mpic_batch(mpic_requests)
+        finally:
+            mpic_coordinator.shutdown()
+        assert len(mpic_responses) == 3
+        assert all(mpic_response.is_valid for mpic_response in mpic_responses)
+        assert all(len(mpic_response.perspectives) == 4 for mpic_response in mpic_responses)
+        assert len(batch_calls) <= 6  # one call per perspective, not per perspective and target
+        assert len({perspective_code for perspective_code, _ in batch_calls}) == len(batch_calls)
+        assert sum(len(targets) for _, targets in batch_calls) == 12
+
+    def coordinate_mpic_batch__should_hold_each_request_only_to_its_own_call_timeout(self):
+        mpic_requests = self.create_caa_mpic_requests_for_targets('strict.example.com', 'lenient.example.com')
+        mpic_requests[0].orchestration_parameters = MpicRequestOrchestrationParameters(
+            perspective_count=4, quorum_count=3, max_attempts=1, perspective_call_timeout_seconds=0.1)
+        mpic_requests[1].orchestration_parameters = MpicRequestOrchestrationParameters(
+            perspective_count=4, quorum_count=3, max_attempts=1)
+
+        async def call_remote_perspective(perspective, check_type, check_request):
+            await asyncio.sleep(0.3)  # slow, but valid
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        async def call_remote_perspective_batch(perspective, check_calls):
+            await asyncio.sleep(0.3)
+            return [self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+                    for check_type, check_request in check_calls]
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, self.create_mpic_coordinator_configuration(),
+                                           call_remote_perspective_batch_function=call_remote_perspective_batch)
+        strict_response, lenient_response = asyncio.run(mpic_coordinator.coordinate_mpic_batch_async(mpic_requests))
+        assert strict_response.is_valid is False
+        assert all(response.errors[0].error_type == ErrorMessages.COORDINATOR_TIMEOUT_ERROR.key
+                   for response in strict_response.perspectives)
+        assert lenient_response.is_valid is True
+        assert all(response.check_passed for response in lenient_response.perspectives)
+
+    def coordinate_mpic_batch__should_match_individual_coordination_given_no_batch_transport(self):
+        mpic_requests = self.create_caa_mpic_requests_for_targets('a.example.com', 'b.example.com')
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response_async,
+                                           self.create_mpic_coordinator_configuration())
+        mpic_responses = asyncio.run(mpic_coordinator.coordinate_mpic_batch_async(mpic_requests))
+        for mpic_request, mpic_response in zip(mpic_requests, mpic_responses):
+            individual_response = mpic_coordinator.coordinate_mpic(mpic_request)
+            assert mpic_response.is_valid is True
+            assert (sorted(response.perspective_code for response in mpic_response.perspectives) ==
+                    sorted(response.perspective_code for response in individual_response.perspectives))
+
+    def coordinate_mpic_batch__should_retry_only_requests_that_did_not_reach_quorum(self):
+        mpic_requests = self.create_caa_mpic_requests_for_targets('pass.example.com', 'retry.example.com')
+        for mpic_request in mpic_requests:
+            mpic_request.orchestration_parameters = MpicRequestOrchestrationParameters(
+                perspective_count=2, quorum_count=2, max_attempts=3)
+        checks_per_target = {'pass.example.com': 0, 'retry.example.com': 0}
+
+        def check_target(perspective, check_type, check_request):
+            checks_per_target[check_request.domain_or_ip_target] += 1
+            # the retry target fails both checks of its first attempt
+            if check_request.domain_or_ip_target == 'retry.example.com' and checks_per_target['retry.example.com'] <= 2:
+                return self.create_failing_remote_caa_check_response(perspective, check_type, check_request)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        async def call_remote_perspective(perspective, check_type, check_request):
+            return check_target(perspective, check_type, check_request)
+
+        async def call_remote_perspective_batch(perspective, check_calls):
+            return [check_target(perspective, check_type, check_request) for check_type, check_request in check_calls]
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, self.create_mpic_coordinator_configuration(),
+                                           call_remote_perspective_batch_function=call_remote_perspective_batch)
+        pass_response, retry_response = asyncio.run(mpic_coordinator.coordinate_mpic_batch_async(mpic_requests))
+        assert pass_response.is_valid is True
+        assert pass_response.actual_orchestration_parameters.attempt_count == 1
+        assert retry_response.is_valid is True
+        assert retry_response.actual_orchestration_parameters.attempt_count == 2
+        assert checks_per_target == {'pass.example.com': 2, 'retry.example.com': 4}
+
+    @pytest.mark.parametrize('batch_response_behavior', ['raise_exception', 'return_wrong_response_count'])
+    def coordinate_mpic_batch__should_return_error_response_for_every_check_in_failed_combined_call(self, batch_response_behavior):
+        mpic_requests = self.create_caa_mpic_requests_for_targets('a.example.com', 'b.example.com')
+
+        def call_remote_perspective_batch(perspective, check_calls):
+            if batch_response_behavior == 'raise_exception':
+                raise Exception("Something went wrong.")
+            return [self.create_successful_remote_caa_check_response(perspective, *check_calls[0])]
+
+        # checks for a perspective used by just one of the targets go through the regular transport
+        mpic_coordinator = MpicCoordinator(self.create_failing_remote_response_with_exception,
+                                           self.create_mpic_coordinator_configuration(),
+                                           call_remote_perspective_batch_function=call_remote_perspective_batch)
+        try:
+            mpic_responses = mpic_coordinator.coordinate_mpic_batch(mpic_requests)
+        finally:
+            mpic_coordinator.shutdown()
+        assert all(mpic_response.is_valid is False for mpic_response in mpic_responses)
+        for mpic_response in mpic_responses:
+            assert all(response.errors[0].error_type == ErrorMessages.COORDINATOR_COMMUNICATION_ERROR.key
+                       for response in mpic_response.perspectives)
+
+    def coordinate_mpic_batch__should_raise_exception_given_any_logically_invalid_mpic_request(self):
+        mpic_requests = self.create_caa_mpic_requests_for_targets('a.example.com', 'b.example.com')
+        mpic_requests[1].orchestration_parameters.quorum_count = 15
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response,
+                                           self.create_mpic_coordinator_configuration())
+        with pytest.raises(MpicRequestValidationError):
+            mpic_coordinator.coordinate_mpic_batch(mpic_requests)
+
+    def coordinate_mpic_async__should_hedge_slow_call_with_spare_perspective_from_next_cohort(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_request.orchestration_parameters = MpicRequestOrchestrationParameters(perspective_count=3, quorum_count=2)
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.hedging_policy = HedgingPolicy(latency_percentile=50, min_latency_samples=1)
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response_async, mpic_coordinator_config)
+        cohorts = mpic_coordinator.create_cohorts_of_randomly_selected_perspectives(
+            mpic_coordinator.target_perspectives, 3, mpic_request.domain_or_ip_target)
+        slow_perspective = cohorts[0][0]
+        for perspective in mpic_coordinator.target_perspectives:
+            mpic_coordinator.perspective_latency_tracker.record_latency(perspective.code, 0.01)
+
+        async def call_remote_perspective(perspective, check_type, check_request):
+            if perspective.code == slow_perspective.code:
+                await asyncio.sleep(60)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator.call_remote_perspective_function = call_remote_perspective
+        mpic_response = asyncio.run(asyncio.wait_for(mpic_coordinator.coordinate_mpic_async(mpic_request), 5))
+        assert mpic_response.is_valid is True
+        assert len(mpic_response.perspectives) == 4
+        responses_by_code = {response.perspective_code: response for response in mpic_response.perspectives}
+        assert responses_by_code[slow_perspective.code].errors[0].error_type == ErrorMessages.COORDINATOR_CALL_CANCELLED.key
+        hedge_codes = set(responses_by_code.keys()) - {perspective.code for perspective in cohorts[0]}
+        assert len(hedge_codes) == 1
+        assert hedge_codes.pop() in {perspective.code for perspective in cohorts[1]}
+
+    def coordinate_mpic_async__should_not_hedge_calls_to_perspectives_without_enough_latency_samples(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_request.orchestration_parameters = MpicRequestOrchestrationParameters(perspective_count=3, quorum_count=2)
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.hedging_policy = HedgingPolicy(latency_percentile=50, min_latency_samples=5)
+        mpic_coordinator_config.perspective_call_timeout_seconds = 0.2
+        called_codes = []
+
+        async def call_remote_perspective(perspective, check_type, check_request):
+            called_codes.append(perspective.code)
+            if len(called_codes) == 1:
+                await asyncio.sleep(60)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, mpic_coordinator_config)
+        for perspective in mpic_coordinator.target_perspectives:
+            mpic_coordinator.perspective_latency_tracker.record_latency(perspective.code, 0.01)
+        mpic_response = asyncio.run(mpic_coordinator.coordinate_mpic_async(mpic_request))
+        assert mpic_response.is_valid is True
+        assert len(called_codes) == 3
+        timed_out_response = next(response for response in mpic_response.perspectives
+                                  if response.perspective_code == called_codes[0])
+        assert timed_out_response.errors[0].error_type == ErrorMessages.COORDINATOR_TIMEOUT_ERROR.key
+
+    def collect_spare_perspectives__should_return_perspectives_of_following_cohorts_in_retry_order(self):
+        cohorts = [['a1', 'a2'], ['b1', 'b2'], ['c1', 'c2']]
+        assert MpicCoordinator.collect_spare_perspectives(cohorts, 1) == ['c1', 'c2', 'a1', 'a2']
+
+    def coordinate_mpic__should_keep_passing_perspectives_and_replace_only_failed_ones_given_partial_retries(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_request.orchestration_parameters = MpicRequestOrchestrationParameters(perspective_count=3, quorum_count=3,
+                                                                                   max_attempts=2)
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.enable_partial_retries = True
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response, mpic_coordinator_config)
+        cohorts = mpic_coordinator.create_cohorts_of_randomly_selected_perspectives(
+            mpic_coordinator.target_perspectives, 3, mpic_request.domain_or_ip_target)
+        failing_perspective = cohorts[0][0]
+        called_codes = []
+
+        def call_remote_perspective(perspective, check_type, check_request):
+            called_codes.append(perspective.code)
+            if perspective.code == failing_perspective.code:
+                return self.create_failing_remote_caa_check_response(perspective, check_type, check_request)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator.call_remote_perspective_function = call_remote_perspective
+        try:
+            mpic_response = mpic_coordinator.coordinate_mpic(mpic_request)
+        finally:
+            mpic_coordinator.shutdown()
+        assert mpic_response.is_valid is True
+        assert mpic_response.actual_orchestration_parameters.attempt_count == 2
+        assert len(called_codes) == 4
+        retained_codes = mpic_response.actual_orchestration_parameters.retained_perspective_codes
+        assert set(retained_codes) == {perspective.code for perspective in cohorts[0][1:]}
+        assert len(mpic_response.perspectives) == 3
+        final_perspectives = [mpic_coordinator.find_target_perspective(response.perspective_code)
+                              for response in mpic_response.perspectives]
+        assert failing_perspective not in final_perspectives
+        assert len({perspective.rir for perspective in final_perspectives}) >= 2
+
+    def coordinate_mpic_async__should_keep_rir_diversity_with_retained_perspectives_given_hedging_and_partial_retries(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_request.orchestration_parameters = MpicRequestOrchestrationParameters(perspective_count=3, quorum_count=3,
+                                                                                   max_attempts=2)
+        target_perspectives = ([RemotePerspective(rir='arin', code=f'arin-{number}') for number in range(1, 6)] +
+                               [RemotePerspective(rir='ripe', code=f'ripe-{number}') for number in range(1, 4)])
+        mpic_coordinator_config = MpicCoordinatorConfiguration(target_perspectives, 3, True, None, 'test_secret')
+        mpic_coordinator_config.hedging_policy = HedgingPolicy(latency_percentile=50, min_latency_samples=1)
+        mpic_coordinator_config.enable_partial_retries = True
+        mpic_coordinator_config.perspective_call_timeout_seconds = 0.3
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response_async, mpic_coordinator_config)
+        for perspective in target_perspectives:
+            mpic_coordinator.perspective_latency_tracker.record_latency(perspective.code, 0.01)
+        mpic_request.domain_or_ip_target, first_cohort = next(
+            (target, cohorts[0]) for target in [f'target{number}.example.com' for number in range(100)]
+            for cohorts in [mpic_coordinator.get_perspective_cohorts(3, target)]
+            if [perspective.rir for perspective in cohorts[0]].count('ripe') == 1)
+
+        # the RIPE perspective of the first cohort fails, and the others are too slow to substitute for it, so the two
+        # retained ARIN perspectives can only reach quorum with an ARIN hedge, which would break RIR diversity
+        async def call_remote_perspective(perspective, check_type, check_request):
+            if perspective.rir == 'ripe':
+                if perspective in first_cohort:
+                    return self.create_failing_remote_caa_check_response(perspective, check_type, check_request)
+                await asyncio.sleep(60)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator.call_remote_perspective_function = call_remote_perspective
+        mpic_response = asyncio.run(asyncio.wait_for(mpic_coordinator.coordinate_mpic_async(mpic_request), 5))
+        assert mpic_response.actual_orchestration_parameters.attempt_count == 2
+        assert mpic_response.is_valid is False
+        passing_codes = [response.perspective_code for response in mpic_response.perspectives if response.check_passed]
+        retained_codes = mpic_response.actual_orchestration_parameters.retained_perspective_codes
+        assert sorted(passing_codes) == sorted(retained_codes)  # no hedge passed, nor did a retained one pass twice
+
+    def coordinate_mpic__should_not_report_retained_perspectives_given_partial_retries_disabled(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_request.orchestration_parameters = MpicRequestOrchestrationParameters(perspective_count=3, quorum_count=3,
+                                                                                   max_attempts=2)
+        mpic_coordinator = MpicCoordinator(self.SideEffectForMockedPayloads(self.create_failing_remote_caa_check_response,
+                                                                            self.create_successful_remote_caa_check_response),
+                                           self.create_mpic_coordinator_configuration())
+        mpic_response = mpic_coordinator.coordinate_mpic(mpic_request)
+        assert mpic_response.actual_orchestration_parameters.attempt_count == 2
+        assert mpic_response.actual_orchestration_parameters.retained_perspective_codes is None
+
+    def select_substitute_perspectives__should_return_none_given_not_enough_unused_compatible_spares(self):
+        all_perspectives_by_code = self.create_all_perspectives_by_code()
+        retained_perspectives = [all_perspectives_by_code['us-east-1']]
+        spare_perspectives = [all_perspectives_by_code[code] for code in ['us-west-1', 'eu-west-2', 'ap-south-2']]
+        assert MpicCoordinator.select_substitute_perspectives(retained_perspectives, 2, spare_perspectives,
+                                                              {'eu-west-2', 'ap-south-2'}) is None
+        substitutes = MpicCoordinator.select_substitute_perspectives(retained_perspectives, 2, spare_perspectives, set())
+        assert [perspective.code for perspective in substitutes] == ['eu-west-2', 'us-west-1']
+
+    def coordinate_mpic__should_reuse_cached_cohorts_for_repeated_target_given_cohort_cache(self):
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.cohort_cache_size = 10
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response, mpic_coordinator_config)
+        uncached_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response,
+                                               self.create_mpic_coordinator_configuration())
+        try:
+            mpic_responses = [mpic_coordinator.coordinate_mpic(ValidMpicRequestCreator.create_valid_caa_mpic_request())
+                              for _ in range(3)]
+            uncached_mpic_response = uncached_coordinator.coordinate_mpic(ValidMpicRequestCreator.create_valid_caa_mpic_request())
+        finally:
+            mpic_coordinator.shutdown()
+            uncached_coordinator.shutdown()
+        assert mpic_coordinator.cohort_cache.miss_count == 1
+        assert mpic_coordinator.cohort_cache.hit_count == 2
+        expected_codes = {response.perspective_code for response in uncached_mpic_response.perspectives}
+        assert all({response.perspective_code for response in mpic_response.perspectives} == expected_codes
+                   for mpic_response in mpic_responses)
+
+    def update_target_perspectives__should_invalidate_cached_cohorts(self):
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.cohort_cache_size = 10
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response, mpic_coordinator_config)
+        mpic_coordinator.get_perspective_cohorts(2, 'example.com')
+        new_target_perspectives = mpic_coordinator.target_perspectives[2:]
+        mpic_coordinator.update_target_perspectives(new_target_perspectives)
+        cohorts = mpic_coordinator.get_perspective_cohorts(2, 'example.com')
+        assert mpic_coordinator.cohort_cache.miss_count == 2
+        assert all(perspective in new_target_perspectives for cohort in cohorts for perspective in cohort)
+
+    def coordinate_mpic__should_notify_observer_of_start_and_end_of_every_perspective_call(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_request.orchestration_parameters = MpicRequestOrchestrationParameters(perspective_count=3, quorum_count=3,
+                                                                                   max_attempts=2)
+        observer = self.RecordingObserver()
+        mpic_coordinator = MpicCoordinator(self.SideEffectForMockedPayloads(self.create_failing_remote_caa_check_response,
+                                                                            self.create_successful_remote_caa_check_response,
+                                                                            self.create_failing_remote_response_with_exception),
+                                           self.create_mpic_coordinator_configuration(), observer=observer)
+        mpic_coordinator.coordinate_mpic(mpic_request)
+        assert [event.attempt for event in observer.started_events] == [1, 1, 1, 2, 2, 2]
+        assert len(observer.ended_events) == 6
+        assert all(event.latency_ns is not None and event.latency_ns >= 0 for event in observer.ended_events)
+        outcomes = [event.outcome for event in observer.ended_events]
+        assert outcomes.count(PerspectiveCallOutcome.PASSED) == 2
+        assert outcomes.count(PerspectiveCallOutcome.FAILED) == 2
+        assert outcomes.count(PerspectiveCallOutcome.ERROR) == 2
+        assert all(event.exception is not None for event in observer.ended_events
+                   if event.outcome == PerspectiveCallOutcome.ERROR)
+
+    @pytest.mark.parametrize('timeout_or_early_decision, expected_straggler_outcome', [
+        ('timeout', PerspectiveCallOutcome.TIMED_OUT),
+        ('early_decision', PerspectiveCallOutcome.CANCELLED)
+    ])
+    def coordinate_mpic_async__should_notify_observer_of_timed_out_and_cancelled_calls(self, timeout_or_early_decision,
+                                                                                         expected_straggler_outcome):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()  # 6 perspectives, quorum of 4
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        if timeout_or_early_decision == 'timeout':
+            mpic_coordinator_config.perspective_call_timeout_seconds = 0.1
+        else:
+            mpic_coordinator_config.enable_early_quorum_decision = True
+        observer = self.RecordingObserver()
+
+        async def call_remote_perspective(perspective, check_type, check_request):
+            if perspective.code == 'us-east-1':
+                await asyncio.sleep(60)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, mpic_coordinator_config, observer=observer)
+        mpic_response = asyncio.run(asyncio.wait_for(mpic_coordinator.coordinate_mpic_async(mpic_request), 5))
+        assert mpic_response.is_valid is True
+        outcomes_by_code = {event.perspective_code: event.outcome for event in observer.ended_events}
+        assert outcomes_by_code.pop('us-east-1') == expected_straggler_outcome
+        assert set(outcomes_by_code.values()) == {PerspectiveCallOutcome.PASSED}
+
+    @pytest.mark.parametrize('check_type', [CheckType.CAA, CheckType.DCV])
+    def coordinate_mpic__should_send_same_serialized_check_request_to_every_perspective_given_serialized_transport(self, check_type):
+        if check_type == CheckType.CAA:
+            mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        else:
+            mpic_request = ValidMpicRequestCreator.create_valid_dcv_mpic_request()
+        serialized_check_requests = []
+
+        def call_remote_perspective(perspective, check_type, check_request_serialized):
+            serialized_check_requests.append(check_request_serialized)
+            if check_type == CheckType.CAA:
+                check_response = self.create_successful_remote_caa_check_response(perspective, check_type, check_request_serialized)
+            else:
+                check_response = self.create_successful_remote_dcv_check_response(perspective, mpic_request)
+            return check_response.model_dump_json().encode()
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, self.create_mpic_coordinator_configuration(),
+                                           is_transport_serialized=True)
+        try:
+            mpic_response = mpic_coordinator.coordinate_mpic(mpic_request)
+        finally:
+            mpic_coordinator.shutdown()
+        assert mpic_response.is_valid is True
+        assert all(response.check_type == check_type for response in mpic_response.perspectives)
+        assert all(isinstance(check_request, bytes) and check_request is serialized_check_requests[0]
+                   for check_request in serialized_check_requests)
+        assert mpic_request.domain_or_ip_target.encode() in serialized_check_requests[0]
+
+    def coordinate_mpic_batch__should_parse_serialized_responses_of_combined_calls_given_serialized_transport(self):
+        mpic_requests = self.create_caa_mpic_requests_for_targets('a.example.com', 'b.example.com')
+
+        def call_remote_perspective(perspective, check_type, check_request_serialized):  # for perspectives with one check
+            assert isinstance(check_request_serialized, bytes)
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request_serialized).model_dump_json()
+
+        def call_remote_perspective_batch(perspective, check_calls):
+            assert all(isinstance(check_request, bytes) for _, check_request in check_calls)
+            return [self.create_successful_remote_caa_check_response(perspective, check_type, check_request).model_dump_json()
+                    for check_type, check_request in check_calls]
+
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, self.create_mpic_coordinator_configuration(),
+                                           call_remote_perspective_batch_function=call_remote_perspective_batch,
+                                           is_transport_serialized=True)
+        try:
+            mpic_responses = mpic_coordinator.coordinate_mpic_batch(mpic_requests)
+        finally:
+            mpic_coordinator.shutdown()
+        assert all(mpic_response.is_valid is True for mpic_response in mpic_responses)
+
+    def coordinate_mpic__should_stop_choosing_unhealthy_perspective_for_first_cohort_given_scoreboard(self):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_request.orchestration_parameters = MpicRequestOrchestrationParameters(perspective_count=3, quorum_count=2)
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.perspective_scoreboard = PerspectiveScoreboard(min_call_count=2)
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response, mpic_coordinator_config)
+        healthy_cohorts = mpic_coordinator.get_perspective_cohorts(3, mpic_request.domain_or_ip_target)
+        unhealthy_perspective = healthy_cohorts[0][0]
+        called_codes = []
+
+        def call_remote_perspective(perspective, check_type, check_request):
+            called_codes.append(perspective.code)
+            if perspective.code == unhealthy_perspective.code:
+                raise TimeoutError('no response')
+            return self.create_successful_remote_caa_check_response(perspective, check_type, check_request)
+
+        mpic_coordinator.call_remote_perspective_function = call_remote_perspective
+        try:
+            for _ in range(3):
+                called_codes.clear()
+                mpic_coordinator.coordinate_mpic(mpic_request)
+        finally:
+            mpic_coordinator.shutdown()
+        assert unhealthy_perspective.code not in called_codes
+        first_cohort = mpic_coordinator.get_perspective_cohorts(3, mpic_request.domain_or_ip_target)[0]
+        assert len({perspective.rir for perspective in first_cohort}) >= 2
+
+    def get_perspective_cohorts__should_return_same_cohorts_as_without_scoreboard_given_all_perspectives_healthy(self):
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.perspective_scoreboard = PerspectiveScoreboard(min_call_count=1)
+        for perspective in mpic_coordinator_config.target_perspectives:
+            mpic_coordinator_config.perspective_scoreboard.record_call(perspective.code, is_success=True)
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response, mpic_coordinator_config)
+        plain_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response,
+                                            self.create_mpic_coordinator_configuration())
+        for target in ['a.example.com', 'b.example.com', 'c.example.com']:
+            assert (mpic_coordinator.get_perspective_cohorts(2, target) ==
+                    plain_coordinator.get_perspective_cohorts(2, target))
+
+    def get_perspective_cohorts__should_use_demoted_perspective_again_once_it_recovers_without_calls(self):
+        clock_seconds = [1000.0]
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.perspective_scoreboard = PerspectiveScoreboard(
+            min_call_count=1, recovery_half_life_seconds=60, clock=lambda: clock_seconds[0])
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response, mpic_coordinator_config)
+        plain_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response,
+                                            self.create_mpic_coordinator_configuration())
+        plain_cohorts = plain_coordinator.get_perspective_cohorts(2, 'a.example.com')
+        demoted_perspective = plain_cohorts[0][0]
+        mpic_coordinator_config.perspective_scoreboard.record_call(demoted_perspective.code, is_success=False)
+        assert demoted_perspective not in mpic_coordinator.get_perspective_cohorts(2, 'a.example.com')[0]
+        clock_seconds[0] += 60
+        assert mpic_coordinator.get_perspective_cohorts(2, 'a.example.com') == plain_cohorts
+
+    def get_perspective_cohorts__should_put_cohorts_without_slow_perspective_first_given_cohort_ranking_policy(self):
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.cohort_ranking_policy = CohortRankingPolicy(
+            latency_estimates_seconds={'us-east-1': 2.0, 'us-west-1': 0.1, 'eu-west-2': 0.1, 'eu-central-2': 0.1,
+                                       'ap-northeast-1': 0.1, 'ap-south-2': 0.1})
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response, mpic_coordinator_config)
+        plain_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response,
+                                            self.create_mpic_coordinator_configuration())
+        for target in ['a.example.com', 'b.example.com', 'c.example.com', 'd.example.com']:
+            ranked_cohorts = mpic_coordinator.get_perspective_cohorts(2, target)
+            assert 'us-east-1' not in [perspective.code for perspective in ranked_cohorts[0]]
+            assert sorted(ranked_cohorts, key=str) == sorted(plain_coordinator.get_perspective_cohorts(2, target), key=str)
+            assert mpic_coordinator.get_perspective_cohorts(2, target) == ranked_cohorts
+
+    def get_perspective_cohorts__should_rank_cohorts_by_live_latency_given_scoreboard(self):
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.perspective_scoreboard = PerspectiveScoreboard()
+        mpic_coordinator_config.cohort_ranking_policy = CohortRankingPolicy(latency_estimates_seconds={'ap-south-2': 5.0},
+                                                                            jitter_fraction=0)
+        for perspective in mpic_coordinator_config.target_perspectives:
+            latency_seconds = 3.0 if perspective.code == 'eu-west-2' else 0.2  # live stats override configured ones
+            mpic_coordinator_config.perspective_scoreboard.record_call(perspective.code, True, latency_seconds)
+        mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response, mpic_coordinator_config)
+        for target in ['a.example.com', 'b.example.com', 'c.example.com']:
+            ranked_cohorts = mpic_coordinator.get_perspective_cohorts(3, target)
+            assert 'eu-west-2' not in [perspective.code for perspective in ranked_cohorts[0]]
+            assert 'eu-west-2' in [perspective.code for perspective in ranked_cohorts[-1]]
+
+    def get_perspective_cohorts__should_share_cohorts_through_cohort_plan_store(self, tmp_path):
+        plain_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response,
+                                            self.create_mpic_coordinator_configuration())
+        cohort_plan_store = CohortPlanStore(tmp_path / 'cohort_plans.db')
+        for _ in range(2):  # e.g., two worker processes
+            mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+            mpic_coordinator_config.cohort_plan_store = cohort_plan_store
+            mpic_coordinator = MpicCoordinator(self.create_successful_remote_caa_check_response, mpic_coordinator_config)
+            assert (mpic_coordinator.get_perspective_cohorts(2, 'example.com', is_every_cohort_needed=False) ==
+                    plain_coordinator.get_perspective_cohorts(2, 'example.com'))
+        assert (cohort_plan_store.miss_count, cohort_plan_store.hit_count) == (1, 1)
+
+    @pytest.mark.parametrize('is_transport_awaitable', [False, True])
+    @pytest.mark.parametrize('is_batch', [False, True])
+    def coordinate_mpic_async__should_read_cohort_plan_store_in_coordinator_executor(self, tmp_path, is_batch,
+                                                                                     is_transport_awaitable):
+        mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        mpic_coordinator_config = self.create_mpic_coordinator_configuration()
+        mpic_coordinator_config.cohort_plan_store = CohortPlanStore(tmp_path / 'cohort_plans.db')
+        plan_store_thread_names = []
+        get_cohorts = mpic_coordinator_config.cohort_plan_store.get_cohorts
+
+        def get_cohorts_recording_thread(*args):
+            plan_store_thread_names.append(threading.current_thread().name)
+            return get_cohorts(*args)
+
+        mpic_coordinator_config.cohort_plan_store.get_cohorts = get_cohorts_recording_thread
+        call_remote_perspective = (self.create_successful_remote_caa_check_response_async if is_transport_awaitable
+                                   else self.create_successful_remote_caa_check_response)
+        mpic_coordinator = MpicCoordinator(call_remote_perspective, mpic_coordinator_config)
+        try:
+            if is_batch:
+                mpic_coordinator.coordinate_mpic_batch([mpic_request, mpic_request])
+            else:
+                mpic_coordinator.coordinate_mpic(mpic_request)
+        finally:
+            mpic_coordinator.shutdown()
+            mpic_coordinator_config.cohort_plan_store.close()
+        assert plan_store_thread_names
+        assert all(thread_name.startswith('mpic-coordinator_') for thread_name in plan_store_thread_names)
+
     def coordinate_mpic__should_raise_exception_given_logically_invalid_mpic_request(self):
         mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
         mpic_request.orchestration_parameters = MpicRequestOrchestrationParameters(quorum_count=15, perspective_count=5,
@@ -292,6 +1167,16 @@ class TestMpicCoordinator:
         ]
         return {perspective.code: perspective for perspective in perspectives}
 
+    @staticmethod
+    def create_caa_mpic_requests_for_targets(*targets):
+        mpic_requests = []
+        for target in targets:
+            mpic_request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+            mpic_request.domain_or_ip_target = target
+            mpic_request.orchestration_parameters = MpicRequestOrchestrationParameters(perspective_count=4, quorum_count=3)
+            mpic_requests.append(mpic_request)
+        return mpic_requests
+
     # This also can be used for call_remote_perspective
     # noinspection PyUnusedLocal
     def create_successful_remote_caa_check_response(self, perspective: RemotePerspective, check_type: CheckType,
@@ -299,6 +1184,12 @@ class TestMpicCoordinator:
         return CaaCheckResponse(perspective_code=perspective.code, check_passed=True,
                                 details=CaaCheckResponseDetails(caa_record_present=False))
 
+    @staticmethod
+    def create_successful_remote_dcv_check_response(perspective: RemotePerspective, mpic_request):
+        validation_method = mpic_request.dcv_check_parameters.validation_details.validation_method
+        return DcvCheckResponse(perspective_code=perspective.code, check_passed=True,
+                                details=DcvCheckResponseDetailsBuilder.build_response_details(validation_method))
+
     # noinspection PyUnusedLocal
     def create_failing_remote_caa_check_response(self, perspective: RemotePerspective, check_type: CheckType,
                                                  check_request_serialized: str):
@@ -310,6 +1201,25 @@ class TestMpicCoordinator:
                                                       check_request_serialized: str):
         raise Exception("Something went wrong.")
 
+    async def create_successful_remote_caa_check_response_async(self, perspective: RemotePerspective, check_type: CheckType,
+                                                                check_request_serialized: str):
+        return self.create_successful_remote_caa_check_response(perspective, check_type, check_request_serialized)
+
+    async def create_failing_remote_response_with_exception_async(self, perspective: RemotePerspective,
+                                                                  check_type: CheckType, check_request_serialized: str):
+        self.create_failing_remote_response_with_exception(perspective, check_type, check_request_serialized)
+
+    class RecordingObserver(MpicCoordinatorObserver):
+        def __init__(self):
+            self.started_events = []
+            self.ended_events = []
+
+        def on_perspective_call_started(self, event):
+            self.started_events.append(event)
+
+        def on_perspective_call_ended(self, event):
+            self.ended_events.append(event)
+
     class SideEffectForMockedPayloads:
         def __init__(self, *functions_to_call):
             self.functions_to_call = cycle(functions_to_call)
@@ -62,6 +62,30 @@ class TestMpicRequestValidator:
         invalid_quorum_count_issue = next(issue for issue in validation_issues if issue.issue_type == MpicRequestValidationMessages.INVALID_QUORUM_COUNT.key)
         assert str(quorum_count) in invalid_quorum_count_issue.message
 
+    @pytest.mark.parametrize('timeout_seconds', [0, -1, 'abc', True])
+    def is_request_valid__should_return_false_and_message_given_invalid_perspective_call_timeout(self, timeout_seconds):
+        request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        request.orchestration_parameters.perspective_call_timeout_seconds = timeout_seconds
+        is_request_valid, validation_issues = MpicRequestValidator.is_request_valid(request, self.known_perspectives)
+        assert is_request_valid is False
+        assert MpicRequestValidationMessages.INVALID_PERSPECTIVE_CALL_TIMEOUT.key in [issue.issue_type for issue in validation_issues]
+
+    @pytest.mark.parametrize('deadline_seconds', [0, -0.5, 'abc'])
+    def is_request_valid__should_return_false_and_message_given_invalid_request_deadline(self, deadline_seconds):
+        request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        request.orchestration_parameters.request_deadline_seconds = deadline_seconds
+        is_request_valid, validation_issues = MpicRequestValidator.is_request_valid(request, self.known_perspectives)
+        assert is_request_valid is False
+        invalid_deadline_issue = next(issue for issue in validation_issues if issue.issue_type == MpicRequestValidationMessages.INVALID_REQUEST_DEADLINE.key)
+        assert str(deadline_seconds) in invalid_deadline_issue.message
+
+    def is_request_valid__should_return_true_given_positive_timeouts(self):
+        request = ValidMpicRequestCreator.create_valid_caa_mpic_request()
+        request.orchestration_parameters.perspective_call_timeout_seconds = 2.5
+        request.orchestration_parameters.request_deadline_seconds = 10
+        is_request_valid, validation_issues = MpicRequestValidator.is_request_valid(request, self.known_perspectives)
+        assert is_request_valid is True
+
 
 if __name__ == '__main__':
     pytest.main()
@@ -0,0 +1,80 @@
+import pytest
+
+from open_mpic_core.common_domain.remote_perspective import RemotePerspective
+from open_mpic_core.mpic_coordinator.cohort_creator import CohortCreator
+from open_mpic_core.mpic_coordinator.perspective_catalog import PerspectiveCatalog
+
+
+# noinspection PyMethodMayBeStatic
+class TestPerspectiveCatalog:
+    def constructor__should_index_perspectives_in_code_order(self):
+        perspectives = [RemotePerspective(rir='ripe', code='eu-west-1'), RemotePerspective(rir='arin', code='us-east-1'),
+                        RemotePerspective(rir='apnic', code='ap-south-1')]
+        perspective_catalog = PerspectiveCatalog(perspectives)
+        assert [perspective.code for perspective in perspective_catalog.perspectives] == ['ap-south-1', 'eu-west-1', 'us-east-1']
+        assert perspective_catalog.get_index(perspectives[1]) == 2
+        assert len(perspective_catalog) == 3
+
+    def constructor__should_build_too_close_masks_ignoring_unknown_codes(self):
+        perspectives = [RemotePerspective(rir='arin', code='p0', too_close_codes=['p2', 'unknown']),
+                        RemotePerspective(rir='arin', code='p1'),
+                        RemotePerspective(rir='ripe', code='p2', too_close_codes=['p0', 'p1'])]
+        perspective_catalog = PerspectiveCatalog(perspectives)
+        assert perspective_catalog.too_close_masks == (0b100, 0b000, 0b011)
+
+    def too_close_masks__should_match_is_perspective_too_close_for_every_member_of_mask(self):
+        perspectives = [RemotePerspective(rir='arin', code='p0', too_close_codes=['p2']),
+                        RemotePerspective(rir='arin', code='p1'),
+                        RemotePerspective(rir='ripe', code='p2'),
+                        RemotePerspective(rir='ripe', code='p3', too_close_codes=['p1'])]
+        perspective_catalog = PerspectiveCatalog(perspectives)
+        for perspective in perspectives:
+            for members in ([perspectives[1]], [perspectives[2], perspectives[3]], [perspectives[0], perspectives[1]]):
+                mask = perspective_catalog.build_mask(members)
+                expected = any(perspective.is_perspective_too_close(member) for member in members)
+                too_close_mask = perspective_catalog.too_close_masks[perspective_catalog.get_index(perspective)]
+                assert (too_close_mask & mask != 0) == expected
+
+    def catalog__should_be_immutable(self):
+        perspective_catalog = PerspectiveCatalog([RemotePerspective(rir='arin', code='p0')])
+        with pytest.raises(AttributeError):
+            perspective_catalog.perspectives = ()
+        with pytest.raises(TypeError):
+            perspective_catalog.index_per_code['p1'] = 1
+
+    @pytest.mark.parametrize('random_seed', [b'seed1', b'seed2', b'seed3'])
+    def build_randomly_shuffled_perspectives_per_rir__should_shuffle_like_cohort_creator_given_same_seed(self, random_seed):
+        perspectives = [RemotePerspective(rir=f'rir{number % 3}', code=f'p{number:02d}') for number in range(20)]
+        expected_perspectives_per_rir = CohortCreator.build_randomly_shuffled_available_perspectives_per_rir(
+            list(reversed(perspectives)), random_seed)
+        perspectives_per_rir = PerspectiveCatalog(perspectives).build_randomly_shuffled_perspectives_per_rir(random_seed)
+        assert list(perspectives_per_rir.keys()) == list(expected_perspectives_per_rir.keys())
+        assert perspectives_per_rir == expected_perspectives_per_rir
+
+    def build_randomly_shuffled_perspectives_per_rir__should_shuffle_as_unweighted_given_equal_weights(self):
+        perspectives = [RemotePerspective(rir=f'rir{number % 3}', code=f'p{number:02d}') for number in range(20)]
+        weighted_perspectives = [perspective.model_copy(update={'weight': 2.5}) for perspective in perspectives]
+        perspectives_per_rir = PerspectiveCatalog(perspectives).build_randomly_shuffled_perspectives_per_rir(b'seed')
+        weighted_perspectives_per_rir = PerspectiveCatalog(weighted_perspectives).build_randomly_shuffled_perspectives_per_rir(b'seed')
+        assert PerspectiveCatalog(weighted_perspectives).is_weighted is False
+        assert ({rir: [perspective.code for perspective in rir_perspectives] for rir, rir_perspectives in perspectives_per_rir.items()} ==
+                {rir: [perspective.code for perspective in rir_perspectives] for rir, rir_perspectives in weighted_perspectives_per_rir.items()})
+
+    def build_randomly_shuffled_perspectives_per_rir__should_put_heavier_perspective_first_more_often(self):
+        perspectives = [RemotePerspective(rir='arin', code='p0', weight=4), RemotePerspective(rir='arin', code='p1'),
+                        RemotePerspective(rir='arin', code='p2', weight=1.0)]
+        perspective_catalog = PerspectiveCatalog(perspectives)
+        first_codes = [perspective_catalog.build_randomly_shuffled_perspectives_per_rir(f'seed{number}'.encode())['arin'][0].code
+                       for number in range(3000)]
+        # with weights 4:1:1, p0 should come first about two thirds of the time
+        assert 0.6 < first_codes.count('p0') / len(first_codes) < 0.73
+        assert perspective_catalog.build_randomly_shuffled_perspectives_per_rir(b'seed') == \
+            perspective_catalog.build_randomly_shuffled_perspectives_per_rir(b'seed')
+
+    def constructor__should_reject_non_positive_weight(self):
+        with pytest.raises(ValueError):
+            RemotePerspective(rir='arin', code='p0', weight=0)
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,31 @@
+import pytest
+
+from open_mpic_core.mpic_coordinator.perspective_latency_tracker import PerspectiveLatencyTracker
+
+
+# noinspection PyMethodMayBeStatic
+class TestPerspectiveLatencyTracker:
+    @pytest.mark.parametrize('percentile, expected_latency', [(50, 0.5), (90, 0.9), (100, 1.0), (0, 0.1)])
+    def get_latency_percentile__should_return_nearest_rank_percentile_of_recorded_latencies(self, percentile,
+                                                                                            expected_latency):
+        tracker = PerspectiveLatencyTracker()
+        for latency_tenths in [7, 2, 9, 1, 10, 4, 3, 8, 6, 5]:
+            tracker.record_latency('p1', latency_tenths / 10)
+        assert tracker.get_latency_percentile('p1', percentile) == expected_latency
+
+    def get_latency_percentile__should_return_none_given_too_few_samples(self):
+        tracker = PerspectiveLatencyTracker()
+        tracker.record_latency('p1', 0.1)
+        assert tracker.get_latency_percentile('p1', 50, min_sample_count=2) is None
+        assert tracker.get_latency_percentile('p2', 50) is None
+
+    def record_latency__should_keep_only_most_recent_latencies_given_window_size(self):
+        tracker = PerspectiveLatencyTracker(window_size=3)
+        for latency in [5.0, 0.1, 0.2, 0.3]:
+            tracker.record_latency('p1', latency)
+        assert tracker.get_latency_percentile('p1', 100, min_sample_count=4) is None
+        assert tracker.get_latency_percentile('p1', 100) == 0.3
+
+
+if __name__ == '__main__':
+    pytest.main()
@@ -0,0 +1,94 @@
+import pytest
+
+from open_mpic_core.common_domain.enum.perspective_call_outcome import PerspectiveCallOutcome
+from open_mpic_core.mpic_coordinator.domain.perspective_call_event import PerspectiveCallEvent
+from open_mpic_core.mpic_coordinator.perspective_scoreboard import PerspectiveScoreboard
+
+
+# noinspection PyMethodMayBeStatic
+class TestPerspectiveScoreboard:
+    def is_healthy__should_return_true_given_fewer_calls_than_min_call_count(self):
+        scoreboard = PerspectiveScoreboard(min_call_count=3)
+        scoreboard.record_call('p1', is_success=False)
+        scoreboard.record_call('p1', is_success=False)
+        assert scoreboard.is_healthy('p1') is True
+        assert scoreboard.is_healthy('unknown') is True
+
+    def is_healthy__should_return_false_given_success_rate_below_minimum(self):
+        scoreboard = PerspectiveScoreboard(smoothing_factor=0.5, min_success_rate=0.5, min_call_count=3)
+        for is_success in [True, False, False]:  # success rate: 1.0, 0.5, 0.25
+            scoreboard.record_call('p1', is_success)
+        assert scoreboard.is_healthy('p1') is False
+        assert scoreboard.get_unhealthy_perspective_codes() == frozenset({'p1'})
+
+    def is_healthy__should_return_true_again_once_perspective_recovers(self):
+        scoreboard = PerspectiveScoreboard(smoothing_factor=0.5, min_success_rate=0.5, min_call_count=1)
+        scoreboard.record_call('p1', is_success=False)
+        assert scoreboard.is_healthy('p1') is False
+        scoreboard.record_call('p1', is_success=True)
+        assert scoreboard.is_healthy('p1') is True
+
+    def is_healthy__should_return_true_again_over_time_given_no_further_calls(self):
+        clock = FakeClock()
+        scoreboard = PerspectiveScoreboard(min_success_rate=0.5, min_call_count=1, recovery_half_life_seconds=60,
+                                           clock=clock)
+        scoreboard.record_call('p1', is_success=False)  # success rate: 0.0
+        clock.now += 59
+        assert scoreboard.is_healthy('p1') is False
+        assert scoreboard.get_unhealthy_perspective_codes() == frozenset({'p1'})
+        clock.now += 1  # the failure rate has halved to 0.5
+        assert scoreboard.is_healthy('p1') is True
+        assert scoreboard.get_unhealthy_perspective_codes() == frozenset()
+
+    def record_call__should_average_with_decayed_success_rate(self):
+        clock = FakeClock()
+        scoreboard = PerspectiveScoreboard(smoothing_factor=0.5, recovery_half_life_seconds=60, clock=clock)
+        scoreboard.record_call('p1', is_success=False)
+        clock.now += 120  # success rate: 0.75
+        scoreboard.record_call('p1', is_success=False)
+        assert scoreboard.success_rate_per_perspective['p1'] == 0.375
+
+    @pytest.mark.parametrize('outcome, expected_success_rate', [
+        (PerspectiveCallOutcome.PASSED, 1.0), (PerspectiveCallOutcome.FAILED, 1.0),
+        (PerspectiveCallOutcome.ERROR, 0.0), (PerspectiveCallOutcome.TIMED_OUT, 0.0)
+    ])
+    def on_perspective_call_ended__should_count_responses_as_successes_and_errors_and_timeouts_as_failures(
+            self, outcome, expected_success_rate):
+        scoreboard = PerspectiveScoreboard()
+        scoreboard.on_perspective_call_ended(PerspectiveCallEvent('p1', 1, outcome=outcome, latency_ns=1_000_000))
+        assert scoreboard.success_rate_per_perspective['p1'] == expected_success_rate
+
+    def on_perspective_call_ended__should_ignore_cancelled_calls(self):
+        scoreboard = PerspectiveScoreboard()
+        scoreboard.on_perspective_call_ended(PerspectiveCallEvent('p1', 1, outcome=PerspectiveCallOutcome.CANCELLED,
+                                                                  latency_ns=1_000_000))
+        assert 'p1' not in scoreboard.call_count_per_perspective
+
+    def get_latency_estimate__should_return_moving_average_of_successful_call_latencies(self):
+        scoreboard = PerspectiveScoreboard(smoothing_factor=0.5)
+        assert scoreboard.get_latency_estimate('p1') is None
+        scoreboard.on_perspective_call_ended(PerspectiveCallEvent('p1', 1, outcome=PerspectiveCallOutcome.PASSED,
+                                                                  latency_ns=100_000_000))
+        scoreboard.on_perspective_call_ended(PerspectiveCallEvent('p1', 1, outcome=PerspectiveCallOutcome.FAILED,
+                                                                  latency_ns=300_000_000))
+        scoreboard.on_perspective_call_ended(PerspectiveCallEvent('p1', 1, outcome=PerspectiveCallOutcome.TIMED_OUT,
+                                                                  latency_ns=900_000_000))
+        assert scoreboard.get_latency_estimate('p1') == pytest.approx(0.2)
+
+    def get_latency_estimates__should_return_latency_per_perspective_with_successful_calls(self):
+        scoreboard = PerspectiveScoreboard()
+        scoreboard.record_call('p1', True, 0.5)
+        scoreboard.record_call('p2', False)
+        assert scoreboard.get_latency_estimates() == {'p1': 0.5}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+if __name__ == '__main__':
+    pytest.main()